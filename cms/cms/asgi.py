@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cms.settings")
+# long-lived server-sent event streams are served only by ASGI servers
+os.environ.setdefault("COURSE_EVENTS_ENABLED", "True")
 
 application = get_asgi_application()
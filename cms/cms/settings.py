@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 from decouple import config
@@ -28,6 +29,8 @@ SECRET_KEY = "django-insecure-%j$jmc7!taw1wrhd7g+_wp=my5-ld%th92ebf7x^jb6b%3=h9k
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
+# the debug toolbar can't be used with tests
+TESTING = "test" in sys.argv
 
 ALLOWED_HOSTS = []
 INTERNAL_IPS = [
@@ -49,16 +52,18 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "embed_video",
-    "debug_toolbar",
     "rest_framework",
+    "common",
+    "jobs",
     "courses",
     "students",
 ]
 
 MIDDLEWARE = [
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "common.slow_queries.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "common.cache.CacheLoaderMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -66,6 +71,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if not TESTING:
+    INSTALLED_APPS.insert(INSTALLED_APPS.index("rest_framework"), "debug_toolbar")
+    MIDDLEWARE.insert(0, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "cms.urls"
 
 TEMPLATES = [
@@ -141,6 +150,14 @@ STATIC_URL = "static/"
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Resized (WebP) variants of Image contents, served with `srcset`
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+
+# Resumable (chunked) uploads of File / Image contents
+CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 5 * 1024 * 1024 * 1024
+CHUNKED_UPLOAD_TTL = 24 * 60 * 60  # abandoned sessions are removed by `collect_garbage`
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -155,9 +172,76 @@ CACHES = {
     }
 }
 
+# Size of per-process cache of hot values, see `common.cache`
+LOCAL_CACHE_MAX_ENTRIES = 1000
+
+# Student progress events are buffered per process and written in bulk
+STUDENT_PROGRESS_FLUSH_INTERVAL_SECONDS = 5
+STUDENT_PROGRESS_FLUSH_MAX_EVENTS = 1000
+
+# Checkout of products (`courses.checkout`) - not purchased reservations
+# return their stock after TTL
+CHECKOUT_RESERVATION_TTL_SECONDS = 15 * 60
+CHECKOUT_MAX_PRODUCTS = 50
+
+# Quiz submissions are scored in batches, grading job is delayed to collect them
+QUIZ_GRADING_DELAY_SECONDS = 60
+
+# Sessions are read from memcached and written through to the database only when changed,
+# run `manage.py clearsessions` periodically to remove expired rows.
+# `django.contrib.sessions.backends.signed_cookies` is an alternative for small sessions.
+SESSION_ENGINE = "common.sessions"
+# expiry of sessions with unchanged data is moved only by at least this much
+SESSION_EXPIRY_REFRESH_SECONDS = 60
+
+# Server-sent events of course changes (`courses.events`), streams need an ASGI server -
+# WSGI servers buffer them and hold a worker thread for the whole connection.
+# Enabled by `cms.asgi`, pages open event streams only when enabled.
+COURSE_EVENTS_ENABLED = config("COURSE_EVENTS_ENABLED", default=False, cast=bool)
+# Heartbeats keep proxies from closing idle streams, streams are closed after
+# max connection time (clients reconnect and are authorized again).
+COURSE_EVENTS_HEARTBEAT_SECONDS = 15
+COURSE_EVENTS_MAX_CONNECTION_SECONDS = 10 * 60
+# pending events per stream, streams of slower clients are closed
+COURSE_EVENTS_QUEUE_SIZE = 100
+
+# Queries slower than the threshold are recorded with their view and call site
+# (`common.slow_queries`). A sample of recorded SELECTs is explained by background
+# jobs (the query is executed again). See `manage.py slow_query_report`.
+SLOW_QUERY_THRESHOLD_MS = 200
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 0.1
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = 30 * 1000
+
+# Background jobs, executed by `manage.py run_workers`
+JOBS_POLL_INTERVAL_SECONDS = 1
+JOBS_RETRY_DELAY_SECONDS = 10
+# running jobs refresh their heartbeat, jobs without one for `STALE_AFTER`
+# are of killed workers and are requeued (failed when out of attempts)
+JOBS_HEARTBEAT_INTERVAL_SECONDS = 30
+JOBS_STALE_AFTER_SECONDS = 5 * 60
+
 # DRF Settings
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly",
-    ]
+    ],
+    # token buckets (`courses.api.throttling`) - burst size / refill period
+    "DEFAULT_THROTTLE_RATES": {
+        "user": "120/min",
+        "ip": "600/min",
+        # password hash computations per IP and username (password guessing)
+        "authentication": "10/min",
+        # password hash computations per IP - all students of a classroom
+        # behind one NAT, raise for bigger sites behind shared IPs
+        "authentication_ip": "300/min",
+    },
+    # number of proxies in front of the app, client IP is taken from X-Forwarded-For
+    "NUM_PROXIES": None,
 }
+# API throttles can be disabled for load tests (`manage.py load_test`), where
+# all simulated clients share one IP
+API_THROTTLING_ENABLED = config("API_THROTTLING_ENABLED", default=True, cast=bool)
+# repeated Basic auth requests with the same credentials skip password hashing
+API_CREDENTIALS_CACHE_TIMEOUT_SECONDS = 5 * 60
+# fail API responses whose serializers trigger lazy loads (missing prefetches)
+API_ASSERT_NO_LAZY_LOADS = DEBUG
@@ -24,6 +24,8 @@ from django.urls import path
 from common.views import CommonLoginView
 from common.views import CommonLogoutView
 from courses.views import CourseListView
+from courses.views import sitemap_index
+from courses.views import sitemap_page
 
 urlpatterns = [
     path("accounts/login/", CommonLoginView.as_view(), name="login"),
@@ -31,11 +33,13 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("course/", include("courses.urls")),
     path("", CourseListView.as_view(), name="course_list"),
+    path("sitemap.xml", sitemap_index, name="sitemap"),
+    path("sitemap-<int:page>.xml", sitemap_page, name="sitemap_page"),
     path("students/", include("students.urls")),
     path("api/", include("courses.api.urls", namespace="api")),
 ]
 
-if settings.DEBUG:
+if settings.DEBUG and not settings.TESTING:
     urlpatterns += [
         path("__debug__", include("debug_toolbar.urls")),
     ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
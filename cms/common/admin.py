@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from common.models import SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = [
+        SlowQuery.Keys.id,
+        SlowQuery.Keys.fingerprint,
+        SlowQuery.Keys.duration_ms,
+        SlowQuery.Keys.view,
+        SlowQuery.Keys.call_site,
+        SlowQuery.Keys.created,
+    ]
+    list_filter = [SlowQuery.Keys.view]
+    search_fields = [SlowQuery.Keys.fingerprint, SlowQuery.Keys.sql]
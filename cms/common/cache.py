@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Per-process LRU cache with expiring entries, for small and hot values
+    which may be a few seconds stale (e.g. subjects list).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self.lock:
+            expires, value = self.entries.get(key, (0.0, default))
+            if expires < time.monotonic():
+                self.entries.pop(key, None)
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, timeout: float) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LocalCache(settings.LOCAL_CACHE_MAX_ENTRIES)
+
+
+@dataclass
+class CacheEntry:
+    fill: Callable[[], Any]
+    timeout: int | None
+    local_timeout: float | None
+
+
+class CacheLoader:
+    """
+    Request-scoped batching of cache reads. Views and template tags `register`
+    keys and get lazy values back - on first use of any of them, all pending keys
+    are fetched with a single `get_many` (after the per-process `local_cache`),
+    misses are computed and stored with `set_many`.
+    """
+
+    def __init__(self):
+        self.pending: dict[str, CacheEntry] = {}
+        self.values: dict[str, Any] = {}
+
+    def register(
+        self,
+        key: str,
+        fill: Callable[[], Any],
+        timeout: int | None = None,
+        local_timeout: float | None = None,
+    ) -> SimpleLazyObject:
+        """
+        `fill` computes the value on a miss, it must not return `None`.
+        `None` timeout means the default one of the cache. With `local_timeout`
+        the value is also kept in the process memory.
+        """
+        if key not in self.values:
+            self.pending[key] = CacheEntry(fill, timeout, local_timeout)
+        return SimpleLazyObject(lambda: self.get(key))
+
+    def get(self, key: str):
+        if key not in self.values:
+            self.load()
+        return self.values[key]
+
+    def load(self) -> None:
+        pending, self.pending = self.pending, {}
+
+        remote_keys: list[str] = []
+        for key, entry in pending.items():
+            value = local_cache.get(key, _MISSING) if entry.local_timeout else _MISSING
+            if value is _MISSING:
+                remote_keys.append(key)
+            else:
+                self.values[key] = value
+
+        found: dict[str, Any] = cache.get_many(remote_keys) if remote_keys else {}
+        # `set_many` takes a single timeout
+        missed: dict[int | None, dict[str, Any]] = defaultdict(dict)
+        for key in remote_keys:
+            entry: CacheEntry = pending[key]
+            value = found.get(key)
+            if value is None:
+                value = entry.fill()
+                missed[entry.timeout][key] = value
+            if entry.local_timeout:
+                local_cache.set(key, value, entry.local_timeout)
+            self.values[key] = value
+
+        for timeout, values in missed.items():
+            if timeout is None:
+                cache.set_many(values)
+            else:
+                cache.set_many(values, timeout)
+
+
+def get_cache_loader(request: HttpRequest | None) -> CacheLoader:
+    """
+    Loader of the current request (template tags take the request
+    from the context), a new one outside of requests.
+    """
+    loader: CacheLoader | None = getattr(request, "cache_loader", None)
+    return loader if loader is not None else CacheLoader()
+
+
+class CacheLoaderMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        request.cache_loader = CacheLoader()
+        return self.get_response(request)
@@ -0,0 +1,361 @@
+import asyncio
+import base64
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+from django.urls import Resolver404
+from django.urls import resolve
+from django.urls import reverse
+
+REQUEST_ERRORS = (
+    OSError,
+    EOFError,
+    ValueError,
+    asyncio.TimeoutError,
+    asyncio.IncompleteReadError,
+)
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self):
+        return json.loads(self.body)
+
+
+@dataclass
+class UrlStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    # 429 responses - limits of the server, not failures
+    throttled: int = 0
+
+    def percentile(self, percent: int) -> float:
+        """
+        Nearest-rank percentile of latencies, in milliseconds.
+        """
+        if not self.latencies:
+            return 0.0
+        latencies: list[float] = sorted(self.latencies)
+        rank: int = max(math.ceil(percent / 100 * len(latencies)), 1)
+        return latencies[rank - 1] * 1000
+
+
+class Stats:
+    """
+    Latencies and errors of requests grouped by URL name.
+    """
+
+    def __init__(self):
+        self.urls: dict[str, UrlStats] = defaultdict(UrlStats)
+
+    def record(self, name: str, seconds: float, status: int | None) -> None:
+        url_stats: UrlStats = self.urls[name]
+        url_stats.latencies.append(seconds)
+        # redirects are expected answers to form posts
+        if status == 429:
+            url_stats.throttled += 1
+        elif status is None or status >= 400:
+            url_stats.errors += 1
+
+    def report(self, elapsed: float) -> list[dict]:
+        return [
+            dict(
+                name=name,
+                requests=len(url_stats.latencies),
+                throughput=len(url_stats.latencies) / elapsed,
+                error_rate=url_stats.errors / len(url_stats.latencies),
+                throttled_rate=url_stats.throttled / len(url_stats.latencies),
+                p50=url_stats.percentile(50),
+                p95=url_stats.percentile(95),
+                p99=url_stats.percentile(99),
+            )
+            for name, url_stats in sorted(self.urls.items())
+        ]
+
+
+def get_url_name(path: str) -> str:
+    try:
+        return resolve(urlsplit(path).path).view_name
+    except Resolver404:
+        return path
+
+
+class HttpClient:
+    """
+    Minimal asyncio HTTP/1.1 client - one keep-alive connection and a cookie
+    jar, like a single browser tab. Each request is recorded in `stats`.
+    """
+
+    def __init__(self, base_url: str, stats: Stats, timeout: float):
+        url = urlsplit(base_url)
+        self.host: str = url.hostname
+        self.port: int = url.port or 80
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies: dict[str, str] = {}
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    @property
+    def csrf_token(self) -> str:
+        return self.cookies.get("csrftoken", "")
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except REQUEST_ERRORS:
+                pass
+        self.reader = self.writer = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        data: dict | None = None,
+        json_data: dict | None = None,
+        headers: dict | None = None,
+    ) -> Response | None:
+        """
+        Sends the request, returns `None` on connection errors and timeouts.
+        """
+        body = b""
+        request_headers: dict[str, str] = {
+            "Host": f"{self.host}:{self.port}",
+            "User-Agent": "cms-load-test",
+            "Accept": "*/*",
+        }
+        if data is not None:
+            body = urlencode(data).encode()
+            request_headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif json_data is not None:
+            body = json.dumps(json_data).encode()
+            request_headers["Content-Type"] = "application/json"
+        if method != "GET":
+            request_headers["Content-Length"] = str(len(body))
+            request_headers["X-CSRFToken"] = self.csrf_token
+        if self.cookies:
+            request_headers["Cookie"] = "; ".join(
+                f"{name}={value}" for name, value in self.cookies.items()
+            )
+        request_headers.update(headers or {})
+        head: str = f"{method} {path} HTTP/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in request_headers.items()
+        )
+        raw_request: bytes = head.encode() + b"\r\n" + body
+
+        response: Response | None = None
+        start: float = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self._send(raw_request), self.timeout)
+        except REQUEST_ERRORS:
+            await self.close()
+        self.stats.record(
+            get_url_name(path),
+            time.perf_counter() - start,
+            response.status if response else None,
+        )
+        return response
+
+    async def _send(self, raw_request: bytes) -> Response:
+        reused: bool = self.writer is not None
+        try:
+            return await self._exchange(raw_request)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if not reused:
+                raise
+            # server closed idle keep-alive connection, retry on a new one
+            await self.close()
+            return await self._exchange(raw_request)
+
+    async def _exchange(self, raw_request: bytes) -> Response:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        self.writer.write(raw_request)
+        await self.writer.drain()
+
+        status_line: bytes = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers: dict[str, str] = {}
+        while (line := await self.reader.readuntil(b"\r\n")) != b"\r\n":
+            name, value = line.decode("latin-1").split(":", 1)
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                self._store_cookie(value)
+            headers[name] = value
+
+        if "content-length" in headers:
+            body: bytes = await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding") == "chunked":
+            body = await self._read_chunked()
+        else:
+            body = await self.reader.read()
+            headers["connection"] = "close"
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return Response(status=status, headers=headers, body=body)
+
+    async def _read_chunked(self) -> bytes:
+        chunks: list[bytes] = []
+        while size := int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16):
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+        # trailers
+        while await self.reader.readuntil(b"\r\n") != b"\r\n":
+            pass
+        return b"".join(chunks)
+
+    def _store_cookie(self, header: str) -> None:
+        name, _, value = header.split(";", 1)[0].partition("=")
+        value = value.strip('"')
+        if value:
+            self.cookies[name.strip()] = value
+        else:
+            self.cookies.pop(name.strip(), None)
+
+
+@dataclass
+class LoadTest:
+    """
+    Simulates concurrent students (register -> enroll -> browse modules
+    -> API contents) and instructors (reorder modules -> dashboard).
+    Courses are given as `{course_id: [module_id, ...]}`.
+    """
+
+    base_url: str
+    courses: dict[int, list[int]]
+    students: int
+    iterations: int = 3
+    ramp_up: float = 0.0
+    think_time: float = 0.0
+    timeout: float = 30.0
+    username_prefix: str = "load-test"
+    password: str = "load-test-Pa55word"
+    instructors: dict[tuple[str, str], dict[int, list[int]]] = field(
+        default_factory=dict
+    )
+    stats: Stats = field(default_factory=Stats)
+
+    async def run(self) -> float:
+        """
+        Runs all sessions concurrently, returns elapsed seconds.
+        """
+        sessions = [self.student_session(index) for index in range(self.students)] + [
+            self.instructor_session(index, username, password, courses)
+            for index, ((username, password), courses) in enumerate(
+                self.instructors.items()
+            )
+        ]
+        start: float = time.perf_counter()
+        await asyncio.gather(*sessions)
+        return time.perf_counter() - start
+
+    async def pause(self) -> None:
+        if self.think_time:
+            await asyncio.sleep(random.uniform(0, 2 * self.think_time))
+
+    async def start_delay(self, index: int, total: int) -> None:
+        # with no ramp up all sessions start at once, e.g. enrollment stampede
+        if self.ramp_up and total:
+            await asyncio.sleep(self.ramp_up * index / total)
+
+    async def student_session(self, index: int) -> None:
+        await self.start_delay(index, self.students)
+        client = HttpClient(self.base_url, self.stats, self.timeout)
+        username = f"{self.username_prefix}-{index}"
+        try:
+            registration_url: str = reverse("student_registration")
+            await client.request("GET", registration_url)
+            response = await client.request(
+                "POST",
+                registration_url,
+                data=dict(
+                    username=username,
+                    password1=self.password,
+                    password2=self.password,
+                    csrfmiddlewaretoken=client.csrf_token,
+                ),
+            )
+            if response is None or response.status != 302:
+                return
+
+            course_id: int = random.choice(list(self.courses))
+            response = await client.request(
+                "POST",
+                reverse("student_enroll_course"),
+                data=dict(course=course_id, csrfmiddlewaretoken=client.csrf_token),
+            )
+            if response is None or response.status != 302:
+                return
+
+            credentials: str = base64.b64encode(
+                f"{username}:{self.password}".encode()
+            ).decode()
+            for _ in range(self.iterations):
+                for module_id in self.courses[course_id]:
+                    await client.request(
+                        "GET",
+                        reverse(
+                            "student_course_detail_module", args=[course_id, module_id]
+                        ),
+                    )
+                    await self.pause()
+                await client.request(
+                    "GET",
+                    reverse("api:course-contents", args=[course_id]),
+                    headers={"Authorization": f"Basic {credentials}"},
+                )
+                await self.pause()
+        finally:
+            await client.close()
+
+    async def instructor_session(
+        self, index: int, username: str, password: str, courses: dict[int, list[int]]
+    ) -> None:
+        await self.start_delay(index, len(self.instructors))
+        client = HttpClient(self.base_url, self.stats, self.timeout)
+        try:
+            login_url: str = reverse("login")
+            await client.request("GET", login_url)
+            response = await client.request(
+                "POST",
+                login_url,
+                data=dict(
+                    username=username,
+                    password=password,
+                    csrfmiddlewaretoken=client.csrf_token,
+                ),
+            )
+            if response is None or response.status != 302 or not courses:
+                return
+
+            for _ in range(self.iterations):
+                module_ids: list[int] = list(random.choice(list(courses.values())))
+                random.shuffle(module_ids)
+                await client.request(
+                    "POST",
+                    reverse("module_order"),
+                    json_data={
+                        module_id: order for order, module_id in enumerate(module_ids)
+                    },
+                )
+                await self.pause()
+                await client.request("GET", reverse("manage_course_list"))
+                await self.pause()
+        finally:
+            await client.close()
@@ -0,0 +1,80 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+ENGINES = [
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+    "common.sessions",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares per-request session database work of session engines. "
+        "Runs in a transaction which is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--url", default=None, help="Defaults to students list.")
+
+    def handle(self, *args, requests: int, url: str | None, **options):
+        url = url or reverse("student_course_list")
+        self.stdout.write(f"{requests} requests per scenario, url: {url}")
+        self.stdout.write(
+            f"{'engine':<45} {'scenario':<16} {'session queries/req':>20} {'ms/req':>8}"
+        )
+        for engine in ENGINES:
+            with override_settings(SESSION_ENGINE=engine):
+                for scenario, run in [
+                    ("page view", self.bench_page_views),
+                    ("unchanged save", self.bench_unchanged_saves),
+                ]:
+                    queries, seconds = self.run_rolled_back(run, url, requests)
+                    self.stdout.write(
+                        f"{engine:<45} {scenario:<16} "
+                        f"{queries / requests:>20.2f} {1000 * seconds / requests:>8.2f}"
+                    )
+
+    def run_rolled_back(self, run, url: str, requests: int) -> tuple[int, float]:
+        with transaction.atomic():
+            user = User.objects.create_user(username="bench-sessions-user")
+            client = Client(HTTP_HOST="localhost")
+            client.force_login(user)
+
+            with CaptureQueriesContext(connection) as queries:
+                start: float = time.perf_counter()
+                run(client, url, requests)
+                seconds: float = time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        session_queries = [q for q in queries if "django_session" in q["sql"]]
+        return len(session_queries), seconds
+
+    def bench_page_views(self, client: Client, url: str, requests: int) -> None:
+        for _ in range(requests):
+            client.get(url)
+
+    def bench_unchanged_saves(self, client: Client, url: str, requests: int) -> None:
+        """
+        Request that marks the session as modified without changing its data,
+        e.g. `request.session["last_page"] = url` on every page view.
+        """
+        engine = import_module(settings.SESSION_ENGINE)
+        session_key: str = client.session.session_key
+        for _ in range(requests):
+            session = engine.SessionStore(session_key)
+            session["last_page"] = url
+            session.save()
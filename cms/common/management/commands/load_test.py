@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from common.loadtest import LoadTest
+from courses.models import Course
+from courses.models import Module
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates concurrent student and instructor sessions against "
+        "a running server and reports latency, throughput and errors per URL name. "
+        "Uses the configured database only to pick courses and to remove "
+        "registered students afterwards. All clients share one IP - run the server "
+        "with API_THROTTLING_ENABLED=False, otherwise API requests are throttled "
+        "(reported as 429)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--students", type=int, default=50, help="Concurrent student sessions."
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=3,
+            help="Passes through course modules per session.",
+        )
+        parser.add_argument(
+            "--ramp-up",
+            type=float,
+            default=0.0,
+            help="Seconds over which sessions are started, 0 starts all at once.",
+        )
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=0.0,
+            help="Average pause between requests of a session, in seconds.",
+        )
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument(
+            "--course", type=int, action="append", default=[], dest="course_ids"
+        )
+        parser.add_argument(
+            "--instructor",
+            action="append",
+            default=[],
+            dest="instructors",
+            metavar="USERNAME:PASSWORD",
+            help="Instructor reordering modules of own courses during the test.",
+        )
+        parser.add_argument(
+            "--keep-users",
+            action="store_true",
+            help="Does not remove registered students after the test.",
+        )
+
+    def handle(
+        self,
+        *args,
+        base_url: str,
+        students: int,
+        iterations: int,
+        ramp_up: float,
+        think_time: float,
+        timeout: float,
+        course_ids: list[int],
+        instructors: list[str],
+        keep_users: bool,
+        **options,
+    ):
+        courses = Course.objects.filter(published_snapshot__isnull=False)
+        if course_ids:
+            courses = courses.filter(id__in=course_ids)
+        # students browse modules they see - the published ones
+        published: dict[int, list[int]] = {
+            course.id: [module["id"] for module in course.published_snapshot.outline]
+            for course in courses.select_related(Course.Keys.published_snapshot).only(
+                Course.Keys.id,
+                f"{Course.Keys.published_snapshot}__outline",
+            )
+        }
+        published = {course_id: ids for course_id, ids in published.items() if ids}
+        if not published:
+            raise CommandError("There are no published courses with modules.")
+
+        instructor_courses: dict[tuple[str, str], dict[int, list[int]]] = {}
+        for credentials in instructors:
+            username, _, password = credentials.partition(":")
+            own_courses: dict[int, list[int]] = {}
+            for course_id, module_id in Module.objects.filter(
+                course__owner__username=username
+            ).values_list(Module.Keys.course, Module.Keys.id):
+                own_courses.setdefault(course_id, []).append(module_id)
+            instructor_courses[(username, password)] = own_courses
+
+        load_test = LoadTest(
+            base_url=base_url,
+            courses=published,
+            students=students,
+            iterations=iterations,
+            ramp_up=ramp_up,
+            think_time=think_time,
+            timeout=timeout,
+            username_prefix=f"load-test-{int(time.time())}",
+            instructors=instructor_courses,
+        )
+        self.stdout.write(
+            f"{students} students, {len(instructor_courses)} instructors, "
+            f"{len(published)} courses, target: {base_url}"
+        )
+        try:
+            elapsed: float = asyncio.run(load_test.run())
+        finally:
+            if not keep_users:
+                User.objects.filter(
+                    username__startswith=load_test.username_prefix
+                ).delete()
+
+        self.stdout.write(
+            f"{'url name':<40} {'requests':>9} {'req/s':>8} {'errors':>7} "
+            f"{'429':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        total_requests = 0
+        for row in load_test.stats.report(elapsed):
+            total_requests += row["requests"]
+            self.stdout.write(
+                f"{row['name']:<40} {row['requests']:>9} {row['throughput']:>8.1f} "
+                f"{row['error_rate']:>7.1%} {row['throttled_rate']:>7.1%} "
+                f"{row['p50']:>8.1f} {row['p95']:>8.1f} {row['p99']:>8.1f}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total_requests} requests in {elapsed:.1f}s, "
+                f"{total_requests / elapsed:.1f} req/s"
+            )
+        )
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg
+from django.db.models import Count
+from django.db.models import Max
+from django.db.models import Sum
+from django.utils import timezone
+
+from common.models import SlowQuery
+from common.slow_queries import normalize
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports slow queries recorded by `SlowQueryMiddleware`, grouped by "
+        "normalized statement (fingerprint), ordered by total time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--purge-days",
+            type=int,
+            default=None,
+            help="Deletes records older than given number of days first.",
+        )
+
+    def handle(self, *args, hours: int, limit: int, purge_days: int | None, **options):
+        if purge_days is not None:
+            purged, _ = SlowQuery.objects.filter(
+                created__lt=timezone.now() - timedelta(days=purge_days)
+            ).delete()
+            self.stdout.write(f"{purged} records purged")
+
+        recorded = SlowQuery.objects.filter(
+            created__gte=timezone.now() - timedelta(hours=hours)
+        )
+        groups = list(
+            recorded.order_by()
+            .values(SlowQuery.Keys.fingerprint)
+            .annotate(
+                count=Count(SlowQuery.Keys.id),
+                total_ms=Sum(SlowQuery.Keys.duration_ms),
+                avg_ms=Avg(SlowQuery.Keys.duration_ms),
+                max_ms=Max(SlowQuery.Keys.duration_ms),
+            )
+            .order_by("-total_ms")[:limit]
+        )
+        fingerprints: list[str] = [
+            group[SlowQuery.Keys.fingerprint] for group in groups
+        ]
+        # (fingerprint, view, call site) -> number of slow executions
+        sources = (
+            recorded.filter(fingerprint__in=fingerprints)
+            .order_by()
+            .values_list(
+                SlowQuery.Keys.fingerprint,
+                SlowQuery.Keys.view,
+                SlowQuery.Keys.call_site,
+            )
+            .annotate(Count(SlowQuery.Keys.id))
+            .order_by(f"-{SlowQuery.Keys.id}__count")
+        )
+
+        self.stdout.write(f"{len(groups)} slow queries in the last {hours} hours")
+        for group in groups:
+            fingerprint: str = group[SlowQuery.Keys.fingerprint]
+            example: SlowQuery = recorded.filter(fingerprint=fingerprint).latest(
+                SlowQuery.Keys.created
+            )
+            self.stdout.write(
+                f"\n{fingerprint}: {group['count']} times, "
+                f"total {group['total_ms']:.0f} ms, avg {group['avg_ms']:.0f} ms, "
+                f"max {group['max_ms']:.0f} ms"
+            )
+            self.stdout.write(f"  {normalize(example.sql)[:1000]}")
+            for source_fingerprint, view, call_site, count in sources:
+                if source_fingerprint == fingerprint:
+                    self.stdout.write(f"  {count:>6}x {view} at {call_site}")
+
+            explained: SlowQuery | None = (
+                SlowQuery.objects.filter(fingerprint=fingerprint)
+                .exclude(plan="")
+                .order_by(f"-{SlowQuery.Keys.created}")
+                .first()
+            )
+            if explained is not None:
+                self.stdout.write(f"  plan ({explained.duration_ms:.0f} ms execution):")
+                for line in explained.plan.splitlines():
+                    self.stdout.write(f"    {line}")
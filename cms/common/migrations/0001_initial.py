@@ -0,0 +1,46 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:26
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=16)),
+                ("sql", models.TextField()),
+                ("params", models.JSONField(blank=True, null=True)),
+                ("duration_ms", models.FloatField()),
+                ("database", models.CharField(max_length=32)),
+                ("view", models.CharField(blank=True, max_length=256)),
+                ("call_site", models.CharField(blank=True, max_length=512)),
+                ("plan", models.TextField(blank=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-created"],
+                "indexes": [
+                    models.Index(
+                        fields=["created", "fingerprint"],
+                        name="common_slow_created_d6fb3c_idx",
+                    )
+                ],
+            },
+        ),
+    ]
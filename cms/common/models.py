@@ -0,0 +1,44 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """
+    Database query which took longer than `SLOW_QUERY_THRESHOLD_MS`,
+    recorded by `common.slow_queries.SlowQueryMiddleware`.
+    `params` are kept only for queries sampled for EXPLAIN, until it runs.
+    """
+
+    class Keys:
+        id = "id"
+        fingerprint = "fingerprint"
+        sql = "sql"
+        params = "params"
+        duration_ms = "duration_ms"
+        database = "database"
+        view = "view"
+        call_site = "call_site"
+        plan = "plan"
+        created = "created"
+
+    # hash of the normalized statement - same query with different values
+    fingerprint = models.CharField(max_length=16)
+    sql = models.TextField()
+    params = models.JSONField(null=True, blank=True)
+    duration_ms = models.FloatField()
+    database = models.CharField(max_length=32)
+    # view name (or path) of the request and the project code line
+    # which executed the query
+    view = models.CharField(max_length=256, blank=True)
+    call_site = models.CharField(max_length=512, blank=True)
+    # output of EXPLAIN (ANALYZE, BUFFERS) of sampled queries
+    plan = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created"]
+        indexes = [
+            models.Index(fields=["created", "fingerprint"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.fingerprint} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,44 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Model
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+# below that exact count is cheap enough (and estimates of small tables are off)
+ESTIMATED_COUNT_THRESHOLD = 10_000
+
+
+def get_estimated_count(model: type[Model], using: str = "default") -> int | None:
+    """
+    Number of rows of the model table from planner statistics
+    (`pg_class.reltuples`, updated by VACUUM / ANALYZE). `None` when unknown.
+    """
+    if connections[using].vendor != "postgresql":
+        return None
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row: tuple | None = cursor.fetchone()
+    # -1 for tables which were never vacuumed or analyzed
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator of big tables - unfiltered querysets are counted with planner
+    statistics instead of `COUNT(*)`, which has to scan the whole table.
+    Last pages may be empty or missing when the estimate is off.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate: int | None = get_estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
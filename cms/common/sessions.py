@@ -0,0 +1,73 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.utils import timezone
+
+
+class SessionStore(cached_db.SessionStore):
+    """
+    Sessions read from memcached with write-through to the database.
+
+    Session data is written only when it actually differs from the loaded
+    (or last saved) one - e.g. re-assigning the same value marks the session
+    as modified, but does not cause a full write. Expiry of unchanged sessions
+    is still moved (the cookie gets a new max age), with a cheap UPDATE
+    skipped when it would move by less than `SESSION_EXPIRY_REFRESH_SECONDS`.
+    """
+
+    CLEAR_EXPIRED_BATCH_SIZE = 1000
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._saved_digest: str | None = None
+
+    def _get_digest(self, data: dict) -> str:
+        return hashlib.sha256(self.serializer().dumps(data)).hexdigest()
+
+    def load(self) -> dict:
+        data: dict = super().load()
+        self._saved_digest = self._get_digest(data)
+        return data
+
+    def save(self, must_create: bool = False) -> None:
+        if (
+            not must_create
+            and self.session_key
+            and self._saved_digest is not None
+            and self._saved_digest == self._get_digest(self._get_session())
+        ):
+            self.refresh_expiry()
+            return
+
+        super().save(must_create)
+        self._saved_digest = self._get_digest(self._get_session())
+
+    def refresh_expiry(self) -> None:
+        expire_date = self.get_expiry_date()
+        refreshed: int = self.model.objects.filter(
+            session_key=self.session_key,
+            expire_date__lt=expire_date
+            - timedelta(seconds=settings.SESSION_EXPIRY_REFRESH_SECONDS),
+        ).update(expire_date=expire_date)
+        if refreshed:
+            self._cache.touch(self.cache_key, self.get_expiry_age())
+
+    @classmethod
+    def clear_expired(cls) -> None:
+        """
+        Used by `manage.py clearsessions`. Deletes expired rows in small batches
+        to avoid long running statements on big session tables.
+        Cached entries expire on their own.
+        """
+        model = cls.get_model_class()
+        while True:
+            session_keys = list(
+                model.objects.filter(expire_date__lt=timezone.now()).values_list(
+                    "session_key", flat=True
+                )[: cls.CLEAR_EXPIRED_BATCH_SIZE]
+            )
+            if not session_keys:
+                break
+            model.objects.filter(session_key__in=session_keys).delete()
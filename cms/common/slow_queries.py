@@ -0,0 +1,166 @@
+import contextlib
+import hashlib
+import json
+import logging
+import random
+import re
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
+from django.db import connections
+from django.db import transaction
+from django.http import HttpRequest
+from django.http import HttpResponse
+
+from common.models import SlowQuery
+from common.tasks import explain_slow_query
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_DIR = str(settings.BASE_DIR)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|%\(\w+\)s")
+_WHITESPACE = re.compile(r"\s+")
+# IN lists and multi-row VALUES of any length
+_LIST = re.compile(r"\(\?(?:, \?)*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:, \(\.\.\.\))+")
+
+
+def normalize(sql: str) -> str:
+    """
+    Replaces values of the statement with `?` and lists of them with `(...)`,
+    so executions with different values are the same query.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _LIST.sub("(...)", sql)
+    return _ROWS.sub("(...)", sql)
+
+
+def get_fingerprint(sql: str) -> str:
+    return hashlib.sha1(normalize(sql).encode()).hexdigest()[:16]
+
+
+def get_call_site() -> str:
+    """
+    Returns the innermost project code line of the current stack
+    (outside of this module and installed packages).
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename: str = frame.f_code.co_filename
+        if (
+            filename.startswith(_PROJECT_DIR)
+            and filename != __file__
+            and "site-packages" not in filename
+        ):
+            path: str = Path(filename).relative_to(_PROJECT_DIR).as_posix()
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ""
+
+
+def _should_explain(sql: str, many: bool, alias: str) -> bool:
+    # ANALYZE executes the statement, only reads are repeated
+    return (
+        not many
+        and connections[alias].vendor == "postgresql"
+        and sql.lstrip()[:6].upper() == "SELECT"
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+    )
+
+
+def _to_json(params) -> list | dict | None:
+    try:
+        return json.loads(json.dumps(params, cls=DjangoJSONEncoder))
+    except (TypeError, ValueError):
+        return None
+
+
+class SlowQueryRecorder:
+    """
+    Execute wrapper (see `connection.execute_wrapper`) timing queries
+    of a request. Slow queries are buffered and saved by `flush`,
+    outside of the request transaction.
+    """
+
+    def __init__(self, request: HttpRequest):
+        self.request = request
+        self.records: list[SlowQuery] = []
+
+    def __call__(self, execute, sql: str, params, many: bool, context: dict):
+        started: float = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms: float = (time.perf_counter() - started) * 1000
+            if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.record(sql, params, many, context["connection"].alias, duration_ms)
+
+    def record(
+        self, sql: str, params, many: bool, alias: str, duration_ms: float
+    ) -> None:
+        match = self.request.resolver_match
+        self.records.append(
+            SlowQuery(
+                fingerprint=get_fingerprint(sql),
+                sql=sql,
+                params=_to_json(params) if _should_explain(sql, many, alias) else None,
+                duration_ms=duration_ms,
+                database=alias,
+                view=(match.view_name or match.route) if match else self.request.path,
+                call_site=get_call_site(),
+            )
+        )
+
+    @contextlib.contextmanager
+    def installed(self) -> Iterator[None]:
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield
+
+    def flush(self) -> None:
+        if not self.records:
+            return
+        # recording must never break the response
+        try:
+            with transaction.atomic():
+                records: list[SlowQuery] = SlowQuery.objects.bulk_create(self.records)
+                for record in records:
+                    if record.params is not None:
+                        explain_slow_query.enqueue(record.id)
+        except DatabaseError:
+            logger.exception("Slow queries of %s not recorded.", self.request.path)
+        self.records = []
+
+    def record_streaming(self, content: Iterator[bytes]) -> Iterator[bytes]:
+        # streamed responses (e.g. sitemaps) query the database while streaming
+        with self.installed():
+            yield from content
+        self.flush()
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        recorder = SlowQueryRecorder(request)
+        with recorder.installed():
+            response: HttpResponse = self.get_response(request)
+        recorder.flush()
+        if response.streaming and not response.is_async:
+            response.streaming_content = recorder.record_streaming(
+                response.streaming_content
+            )
+        return response
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import DatabaseError
+from django.db import connections
+from django.db import transaction
+
+from common.models import SlowQuery
+from jobs.queue import task
+
+
+def explain(slow_query: SlowQuery) -> str:
+    """
+    Returns plan of the query executed again with EXPLAIN (ANALYZE, BUFFERS),
+    in a transaction which is rolled back.
+    """
+    alias: str = slow_query.database
+    with transaction.atomic(using=alias):
+        with connections[alias].cursor() as cursor:
+            timeout = int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)
+            cursor.execute(f"SET LOCAL statement_timeout = {timeout}")
+            cursor.execute(
+                f"EXPLAIN (ANALYZE, BUFFERS) {slow_query.sql}", slow_query.params
+            )
+            plan: str = "\n".join(row[0] for row in cursor.fetchall())
+        transaction.set_rollback(True, using=alias)
+    return plan
+
+
+@task(priority=-10, max_attempts=1)
+def explain_slow_query(slow_query_id: int) -> None:
+    slow_query: SlowQuery | None = SlowQuery.objects.filter(id=slow_query_id).first()
+    if slow_query is None or slow_query.params is None:
+        return
+    try:
+        plan: str = explain(slow_query)
+    except DatabaseError as e:
+        plan = f"EXPLAIN failed: {e}"
+    # parameters may contain personal data, kept only until explained
+    SlowQuery.objects.filter(id=slow_query_id).update(plan=plan, params=None)
@@ -0,0 +1,138 @@
+import asyncio
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from common.loadtest import HttpClient
+from common.loadtest import Stats
+from common.sessions import SessionStore
+
+
+class SessionStoreTest(TestCase):
+    def create_session(self) -> SessionStore:
+        session = SessionStore()
+        session["cart"] = [1, 2]
+        session.save(must_create=True)
+        return SessionStore(session.session_key)
+
+    def test_unchanged_data_is_not_written(self):
+        session = self.create_session()
+        session["cart"] = [1, 2]
+        with self.assertNumQueries(1):
+            # expiry refresh only, skipped by its condition
+            session.save()
+
+    def test_unchanged_session_expiry_is_moved(self):
+        session = self.create_session()
+        stale = timezone.now() + timedelta(minutes=5)
+        Session.objects.filter(session_key=session.session_key).update(
+            expire_date=stale
+        )
+        session["cart"] = [1, 2]
+        session.save()
+        self.assertGreater(
+            Session.objects.get(session_key=session.session_key).expire_date,
+            stale + timedelta(days=1),
+        )
+
+    def test_changed_data_is_written(self):
+        session = self.create_session()
+        session["cart"] = [3]
+        session.save()
+        self.assertEqual(SessionStore(session.session_key).load(), {"cart": [3]})
+
+
+class StatsTest(SimpleTestCase):
+    def test_report(self):
+        stats = Stats()
+        for seconds, status in [(0.1, 200), (0.2, 302), (0.3, 429), (0.4, 500)]:
+            stats.record("login", seconds, status)
+        stats.record("login", 0.5, None)
+
+        [row] = stats.report(elapsed=2)
+        self.assertEqual(row["requests"], 5)
+        self.assertEqual(row["throughput"], 2.5)
+        # throttled responses are not errors
+        self.assertEqual(row["error_rate"], 0.4)
+        self.assertEqual(row["throttled_rate"], 0.2)
+        self.assertAlmostEqual(row["p50"], 300)
+        self.assertAlmostEqual(row["p99"], 500)
+
+
+class HttpClientTest(SimpleTestCase):
+    """
+    Client against a scripted server - each connection answers
+    the given responses, one per request, and is closed afterwards.
+    """
+
+    async def serve(self, *connections: list[bytes]) -> str:
+        self.requests: list[bytes] = []
+        scripts = iter(connections)
+
+        async def handle(reader, writer):
+            for response in next(scripts):
+                head: bytes = await reader.readuntil(b"\r\n\r\n")
+                length: int = 0
+                for line in head.decode().split("\r\n"):
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":")[1])
+                self.requests.append(head + await reader.readexactly(length))
+                writer.write(response)
+                await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        self.addCleanup(server.close)
+        host, port = server.sockets[0].getsockname()
+        return f"http://{host}:{port}"
+
+    async def test_keep_alive(self):
+        base_url: str = await self.serve(
+            [
+                b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n"
+                b"Set-Cookie: csrftoken=abc; Path=/\r\n\r\nok",
+                b"HTTP/1.1 302 Found\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"3\r\nfoo\r\n3;ext=1\r\nbar\r\n0\r\n\r\n",
+            ]
+        )
+        stats = Stats()
+        client = HttpClient(base_url, stats, timeout=5)
+        url: str = reverse("student_registration")
+
+        response = await client.request("GET", url)
+        self.assertEqual((response.status, response.body), (200, b"ok"))
+        self.assertEqual(client.csrf_token, "abc")
+
+        response = await client.request("POST", url, data=dict(username="student"))
+        self.assertEqual((response.status, response.body), (302, b"foobar"))
+        await client.close()
+
+        self.assertIn(b"Cookie: csrftoken=abc\r\n", self.requests[1])
+        self.assertIn(b"X-CSRFToken: abc\r\n", self.requests[1])
+        self.assertTrue(self.requests[1].endswith(b"\r\n\r\nusername=student"))
+        self.assertEqual(len(stats.urls["student_registration"].latencies), 2)
+
+    async def test_closed_keep_alive_connection(self):
+        ok = b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n"
+        # the first connection is closed after one response
+        base_url: str = await self.serve([ok], [ok])
+        stats = Stats()
+        client = HttpClient(base_url, stats, timeout=5)
+
+        for _ in range(2):
+            response = await client.request("GET", "/")
+            self.assertEqual(response.status, 200)
+        await client.close()
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(stats.report(elapsed=1)[0]["error_rate"], 0)
+
+    async def test_connection_error(self):
+        base_url: str = await self.serve([])
+        stats = Stats()
+        client = HttpClient(base_url, stats, timeout=5)
+        self.assertIsNone(await client.request("GET", "/"))
+        self.assertEqual(stats.report(elapsed=1)[0]["error_rate"], 1)
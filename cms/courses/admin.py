@@ -1,5 +1,9 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.forms import BaseInlineFormSet
 
+from common.paginators import EstimatedCountPaginator
+from courses.models import Content
 from courses.models import Course
 from courses.models import Module
 from courses.models import Product
@@ -17,14 +21,86 @@ class ProductAdmin(admin.ModelAdmin):
     list_display = ["name", "quantity", "price"]
 
 
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+    Inline formset showing a single page of related objects,
+    page number is taken from `page_param` query parameter.
+    """
+
+    per_page = 20
+    page_param = "p"
+    query_params = None
+
+    def get_queryset(self):
+        if not hasattr(self, "page"):
+            paginator = Paginator(super().get_queryset(), self.per_page)
+            self.page = paginator.get_page(self.query_params.get(self.page_param))
+            self._queryset = self.page.object_list
+        return self._queryset
+
+    def get_page_query(self, number: int) -> str:
+        query_params = self.query_params.copy()
+        query_params[self.page_param] = number
+        return query_params.urlencode()
+
+    @property
+    def previous_page_query(self) -> str | None:
+        page = self.page
+        return self.get_page_query(page.number - 1) if page.has_previous() else None
+
+    @property
+    def next_page_query(self) -> str | None:
+        page = self.page
+        return self.get_page_query(page.number + 1) if page.has_next() else None
+
+
 class ModuleInLine(admin.StackedInline):
     model = Module
+    formset = PaginatedInlineFormSet
+    template = "admin/courses/edit_inline/paginated_stacked.html"
+    per_page = 10
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_param = "modules_page"
+        formset.query_params = request.GET
+        return formset
 
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
     list_display = [Course.Keys.title, Course.Keys.subject, Course.Keys.created]
     list_filter = [Course.Keys.created, Course.Keys.subject]
-    search_fields = [Course.Keys.title, Course.Keys.overview]
+    list_select_related = [Course.Keys.subject]
+    # prefix search of titles, `icontains` over long overviews was the slowest part
+    search_fields = [f"^{Course.Keys.title}"]
     prepopulated_fields = {Course.Keys.slug: (Course.Keys.title,)}
+    raw_id_fields = [Course.Keys.owner, Course.Keys.students]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = [ModuleInLine]
+
+
+@admin.register(Content)
+class ContentAdmin(admin.ModelAdmin):
+    list_display = [
+        Content.Keys.id,
+        Content.Keys.module,
+        Content.Keys.order,
+        Content.Keys.content_type,
+        "item_title",
+    ]
+    list_select_related = [Content.Keys.module, Content.Keys.content_type]
+    list_filter = [Content.Keys.content_type]
+    raw_id_fields = [Content.Keys.module]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # items are fetched with one query per content type, for the current page
+        return super().get_queryset(request).prefetch_related(Content.Keys.item)
+
+    @admin.display(description="item")
+    def item_title(self, obj: Content) -> str:
+        return str(obj.item)
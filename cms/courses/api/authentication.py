@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.crypto import salted_hmac
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.exceptions import Throttled
+
+from courses.api.throttling import AuthenticationIPThrottle
+from courses.api.throttling import AuthenticationThrottle
+
+User = get_user_model()
+
+CACHE_KEY = "courses:api_credentials:{digest}"
+KEY_SALT = "courses.api.authentication.CachedBasicAuthentication"
+
+
+def get_credentials_digest(userid: str, password: str) -> str:
+    # keyed with SECRET_KEY - cache keys do not allow guessing passwords offline
+    return salted_hmac(KEY_SALT, f"{userid}\0{password}").hexdigest()
+
+
+def get_password_digest(user: User) -> str:
+    # changes with the password, invalidating cached credentials
+    return salted_hmac(KEY_SALT, user.password).hexdigest()
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    Basic authentication verifying the password hash (PBKDF2) only once per
+    `API_CREDENTIALS_CACHE_TIMEOUT_SECONDS` for the same credentials.
+    Hash computations are limited per IP and username by `AuthenticationThrottle`
+    and per IP by `AuthenticationIPThrottle`, checked before hashing - view throttles run only after authentication.
+    Failed attempts are never cached.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        cache_key: str = CACHE_KEY.format(
+            digest=get_credentials_digest(userid, password)
+        )
+        cached: tuple[int, str] | None = cache.get(cache_key)
+        if cached is not None:
+            user_id, password_digest = cached
+            user: User | None = User.objects.filter(id=user_id, is_active=True).first()
+            if user is not None and constant_time_compare(
+                get_password_digest(user), password_digest
+            ):
+                return user, None
+
+        if request is not None:
+            for throttle in [
+                AuthenticationThrottle(userid),
+                AuthenticationIPThrottle(),
+            ]:
+                if not throttle.allow_request(request, None):
+                    raise Throttled(throttle.wait())
+
+        user, auth = super().authenticate_credentials(userid, password, request)
+        cache.set(
+            cache_key,
+            (user.id, get_password_digest(user)),
+            settings.API_CREDENTIALS_CACHE_TIMEOUT_SECONDS,
+        )
+        return user, auth
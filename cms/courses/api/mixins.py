@@ -0,0 +1,108 @@
+import contextlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import Prefetch
+from rest_framework import permissions
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+@lru_cache
+def get_serializer_prefetches(serializer_class: type[serializers.Serializer]) -> tuple:
+    """
+    Walks declared (nested) serializer fields and returns prefetch lookups
+    required to serialize instances without lazy loads.
+    """
+    return tuple(_collect_prefetches(serializer_class(), prefix=""))
+
+
+def _collect_prefetches(serializer: serializers.Serializer, prefix: str) -> list:
+    model = serializer.Meta.model
+    prefetches = []
+    for field in serializer.fields.values():
+        if field.source == "*" or "." in field.source:
+            continue
+
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+
+        lookup = f"{prefix}{field.source}"
+        if isinstance(field, serializers.ListSerializer):
+            # nested `many=True` serializer, e.g. course -> modules -> contents
+            prefetches.append(Prefetch(lookup))
+            prefetches.extend(_collect_prefetches(field.child, prefix=f"{lookup}__"))
+        elif isinstance(field, serializers.ModelSerializer):
+            prefetches.append(Prefetch(lookup))
+            prefetches.extend(_collect_prefetches(field, prefix=f"{lookup}__"))
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetches.append(Prefetch(lookup))
+        elif isinstance(field, serializers.RelatedField):
+            if isinstance(model_field, GenericForeignKey):
+                # generic item prefetch - one query per content type
+                prefetches.append(Prefetch(lookup))
+            elif not field.use_pk_only_optimization():
+                prefetches.append(Prefetch(lookup))
+    return prefetches
+
+
+class LazyLoadError(AssertionError):
+    pass
+
+
+def _forbid_queries(execute, sql, params, many, context):
+    raise LazyLoadError(f"Lazy load triggered during serialization: {sql}")
+
+
+class PrefetchSerializerMixin:
+    """
+    Builds queryset prefetches from the serializer used by the current action,
+    only for `prefetch_actions` - other actions (e.g. `enroll`) don't serialize
+    the instance. Views without actions prefetch for safe methods.
+    With `settings.API_ASSERT_NO_LAZY_LOADS` enabled any query executed
+    while serializing the response data raises `LazyLoadError`.
+    """
+
+    prefetch_actions: tuple[str, ...] = ("list", "retrieve")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        action: str | None = getattr(self, "action", None)
+        if action is None:
+            prefetch: bool = self.request.method in permissions.SAFE_METHODS
+        else:
+            prefetch = action in self.prefetch_actions
+        if not prefetch:
+            return queryset
+        return queryset.prefetch_related(
+            *get_serializer_prefetches(self.get_serializer_class())
+        )
+
+    def serialize(self, serializer: serializers.Serializer):
+        guard = contextlib.nullcontext()
+        if getattr(settings, "API_ASSERT_NO_LAZY_LOADS", False):
+            guard = connection.execute_wrapper(_forbid_queries)
+        with guard:
+            return serializer.data
+
+    def list(self, request, *args, **kwargs) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(self.serialize(serializer))
+
+        # evaluate (and prefetch) outside of the guarded serialization
+        serializer = self.get_serializer(list(queryset), many=True)
+        return Response(self.serialize(serializer))
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(self.serialize(serializer))
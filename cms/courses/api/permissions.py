@@ -10,3 +10,12 @@ class IsEnrolled(BasePermission):
             return False
 
         return obj.students.filter(id=request.user.id).exists()
+
+
+class CanAddContent(BasePermission):
+    """
+    Instructors - users allowed to add contents to modules of their courses.
+    """
+
+    def has_permission(self, request, view) -> bool:
+        return request.user.has_perm("courses.add_content")
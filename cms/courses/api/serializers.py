@@ -1,11 +1,17 @@
+from django.conf import settings
 from django.db.models import Count
 from rest_framework import serializers
 
+from courses.models import ChunkedUpload
 from courses.models import Content
 from courses.models import Course
+from courses.models import CourseRecommendation
 from courses.models import ItemBase
 from courses.models import Module
+from courses.models import Reservation
+from courses.models import ReservationItem
 from courses.models import Subject
+from courses.uploads import get_received_chunks
 
 
 class ItemRelatedField(serializers.RelatedField):
@@ -40,10 +46,26 @@ class ModuleSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+COURSE_FIELDS = [
+    Course.Keys.id,
+    Course.Keys.title,
+    Course.Keys.slug,
+    Course.Keys.overview,
+    Course.Keys.created,
+    Course.Keys.updated,
+    Course.Keys.outline,
+    Course.Keys.owner,
+    Course.Keys.subject,
+    Course.Keys.published_snapshot,
+    Course.Keys.modules,
+]
+
+
 class CourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
-        fields = "__all__"
+        # without students - not public, and prefetched for each course
+        fields = COURSE_FIELDS
 
     modules = ModuleSerializer(many=True, read_only=True)
 
@@ -74,4 +96,114 @@ class CourseWithContentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Course
-        fields = "__all__"
+        # published content only - snapshots are served to students as they are
+        fields = [
+            Course.Keys.id,
+            Course.Keys.title,
+            Course.Keys.slug,
+            Course.Keys.overview,
+            Course.Keys.owner,
+            Course.Keys.subject,
+            Course.Keys.modules,
+        ]
+
+
+class CourseRecommendationSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="recommended.id")
+    title = serializers.CharField(source="recommended.title")
+    slug = serializers.CharField(source="recommended.slug")
+
+    class Meta:
+        model = CourseRecommendation
+        fields = [
+            "id",
+            "title",
+            "slug",
+            CourseRecommendation.Keys.score,
+            CourseRecommendation.Keys.common_students,
+        ]
+
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            ChunkedUpload.Keys.id,
+            ChunkedUpload.Keys.kind,
+            ChunkedUpload.Keys.filename,
+            ChunkedUpload.Keys.size,
+            ChunkedUpload.Keys.sha256,
+            ChunkedUpload.Keys.status,
+            ChunkedUpload.Keys.chunk_size,
+            ChunkedUpload.Keys.proof_chunk,
+            "total_chunks",
+            "received_chunks",
+        ]
+        read_only_fields = [
+            ChunkedUpload.Keys.id,
+            ChunkedUpload.Keys.status,
+            ChunkedUpload.Keys.chunk_size,
+            ChunkedUpload.Keys.proof_chunk,
+        ]
+
+    def get_received_chunks(self, obj: ChunkedUpload) -> list[int]:
+        if obj.status == ChunkedUpload.Status.COMPLETE:
+            return list(range(obj.total_chunks))
+        return get_received_chunks(obj)
+
+    def validate_size(self, value: int) -> int:
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError("File is too big.")
+        return value
+
+
+class ChunkedUploadCompleteSerializer(serializers.Serializer):
+    module = serializers.PrimaryKeyRelatedField(queryset=Module.objects.none())
+    title = serializers.CharField(max_length=256)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context["request"]
+        self.fields["module"].queryset = Module.objects.filter(
+            course__owner=request.user
+        )
+
+
+class ReservationItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReservationItem
+        fields = [
+            ReservationItem.Keys.product,
+            ReservationItem.Keys.quantity,
+            ReservationItem.Keys.price,
+        ]
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    items = ReservationItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Reservation
+        fields = [
+            Reservation.Keys.id,
+            Reservation.Keys.status,
+            Reservation.Keys.total_price,
+            Reservation.Keys.created,
+            Reservation.Keys.expires,
+            Reservation.Keys.items,
+        ]
+
+
+class ReservationCreateSerializer(serializers.Serializer):
+    # product name -> quantity
+    products = serializers.DictField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+    def validate_products(self, value: dict[str, int]) -> dict[str, int]:
+        if len(value) > settings.CHECKOUT_MAX_PRODUCTS:
+            raise serializers.ValidationError("Too many products.")
+        return value
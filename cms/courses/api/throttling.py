@@ -0,0 +1,90 @@
+import hashlib
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket kept in the cache: allows bursts of up to `num_requests`,
+    refilled at `num_requests` per `duration` (rates as in
+    `DEFAULT_THROTTLE_RATES`, e.g. "60/min").
+    Bucket is read and written without a lock - concurrent requests of one
+    client may let a few extra requests through, which is fine for abuse protection.
+    All buckets are disabled by `settings.API_THROTTLING_ENABLED`.
+    """
+
+    wait_seconds: float = 0.0
+
+    def allow_request(self, request, view) -> bool:
+        if self.rate is None or not settings.API_THROTTLING_ENABLED:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        refill_rate: float = self.num_requests / self.duration
+        tokens, updated = self.cache.get(self.key, (self.num_requests, self.now))
+        tokens = min(self.num_requests, tokens + (self.now - updated) * refill_rate)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill_rate
+            return False
+
+        self.cache.set(self.key, (tokens - 1, self.now), self.duration)
+        return True
+
+    def wait(self) -> float:
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    scope = "ip"
+
+    def get_cache_key(self, request, view) -> str:
+        return self.cache_format % dict(scope=self.scope, ident=self.get_ident(request))
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Per user bucket, anonymous requests are limited per IP.
+    """
+
+    scope = "user"
+
+    def get_cache_key(self, request, view) -> str:
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % dict(scope=self.scope, ident=ident)
+
+
+class AuthenticationThrottle(TokenBucketThrottle):
+    """
+    Limits password hash computations per IP and username - password guessing
+    of one account, see `CachedBasicAuthentication`. Students of a classroom
+    behind one NAT do not share the bucket.
+    """
+
+    scope = "authentication"
+
+    def __init__(self, username: str):
+        super().__init__()
+        self.username = username
+
+    def get_cache_key(self, request, view) -> str:
+        # usernames may contain characters not allowed in cache keys
+        username: str = hashlib.sha256(self.username.encode()).hexdigest()
+        ident = f"{self.get_ident(request)}:{username}"
+        return self.cache_format % dict(scope=self.scope, ident=ident)
+
+
+class AuthenticationIPThrottle(IPTokenBucketThrottle):
+    """
+    Limits password hash computations per IP for all usernames together,
+    loose enough for a classroom behind one NAT.
+    """
+
+    scope = "authentication_ip"
@@ -10,6 +10,8 @@ app_name = "courses"
 router = routers.DefaultRouter()
 router.register("courses", views.CourseViewSet)
 router.register("subjects", views.SubjectViewSet)
+router.register("uploads", views.ChunkedUploadViewSet, basename="upload")
+router.register("reservations", views.ReservationViewSet)
 
 
 urlpatterns = [
@@ -1,21 +1,64 @@
+import io
+import secrets
+import shutil
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.models import Count
-from rest_framework.authentication import BasicAuthentication
+from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.generics import get_object_or_404
+from rest_framework.mixins import CreateModelMixin
+from rest_framework.mixins import RetrieveModelMixin
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.viewsets import GenericViewSet
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from courses.api.authentication import CachedBasicAuthentication
+from courses.api.mixins import PrefetchSerializerMixin
 from courses.api.pagination import StandardPagination
+from courses.api.permissions import CanAddContent
 from courses.api.permissions import IsEnrolled
+from courses.api.serializers import ChunkedUploadCompleteSerializer
+from courses.api.serializers import ChunkedUploadSerializer
+from courses.api.serializers import CourseRecommendationSerializer
 from courses.api.serializers import CourseSerializer
-from courses.api.serializers import CourseWithContentSerializer
+from courses.api.serializers import ReservationCreateSerializer
+from courses.api.serializers import ReservationSerializer
 from courses.api.serializers import SubjectSerializer
+from courses.api.throttling import IPTokenBucketThrottle
+from courses.api.throttling import UserTokenBucketThrottle
+from courses.checkout import OutOfStock
+from courses.checkout import purchase
+from courses.checkout import release
+from courses.checkout import reserve
+from courses.models import ChunkedUpload
+from courses.models import Content
 from courses.models import Course
+from courses.models import CourseRecommendation
+from courses.models import CourseSnapshot
+from courses.models import File
+from courses.models import Image
+from courses.models import MediaBlob
+from courses.models import Reservation
 from courses.models import Subject
+from courses.tasks import release_expired_reservations
+from courses.uploads import assemble
+from courses.uploads import find_blob
+from courses.uploads import get_or_create_file_item
+from courses.uploads import get_upload_dir
+from courses.uploads import matches_blob
+from courses.uploads import write_chunk
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
 
 
 class SubjectListView(ListAPIView):
@@ -35,20 +78,21 @@ class SubjectViewSet(ReadOnlyModelViewSet):
     pagination_class = StandardPagination
 
 
-class CourseListView(ListAPIView):
-    queryset = Course.objects.prefetch_related(Course.Keys.modules).all()
+class CourseListView(PrefetchSerializerMixin, ListAPIView):
+    queryset = Course.objects.all()
     serializer_class = CourseSerializer
 
 
-class CourseViewSet(ReadOnlyModelViewSet):
-    queryset = Course.objects.prefetch_related(Course.Keys.modules)
+class CourseViewSet(PrefetchSerializerMixin, ReadOnlyModelViewSet):
+    queryset = Course.objects.all()
     serializer_class = CourseSerializer
     pagination_class = StandardPagination
 
     @action(
         detail=True,
         methods=["post"],
-        authentication_classes=[BasicAuthentication],
+        authentication_classes=[CachedBasicAuthentication],
+        throttle_classes=[IPTokenBucketThrottle, UserTokenBucketThrottle],
         permission_classes=[IsAuthenticated],
     )
     def enroll(self, request, *args, **kwargs) -> Response:
@@ -56,22 +100,228 @@ class CourseViewSet(ReadOnlyModelViewSet):
         course.students.add(request.user)
         return Response()
 
+    def get_queryset(self):
+        if self.action == "contents":
+            # served from the published snapshot, nothing to prefetch
+            return Course.objects.select_related(Course.Keys.published_snapshot).only(
+                Course.Keys.id,
+                f"{Course.Keys.published_snapshot}__{CourseSnapshot.Keys.data}",
+            )
+        return super().get_queryset()
+
     @action(
         detail=True,
         methods=["get"],
-        serializer_class=CourseWithContentSerializer,
-        authentication_classes=[BasicAuthentication],
+        authentication_classes=[CachedBasicAuthentication],
+        throttle_classes=[IPTokenBucketThrottle, UserTokenBucketThrottle],
         permission_classes=[IsAuthenticated, IsEnrolled],
     )
     def contents(self, request, *args, **kwargs):
-        return self.retrieve(request, *args, **kwargs)
+        course: Course = self.get_object()
+        if course.published_snapshot is None:
+            raise NotFound("Course has not been published yet.")
+        # serialized with `CourseWithContentSerializer` when published
+        return Response(course.published_snapshot.data)
+
+    @action(detail=True, methods=["get"])
+    def recommendations(self, request, *args, **kwargs) -> Response:
+        # single lookup by the (course, rank) index, empty for unknown courses
+        recommendations = CourseRecommendation.objects.filter(
+            course_id=kwargs["pk"]
+        ).select_related(CourseRecommendation.Keys.recommended)
+        serializer = CourseRecommendationSerializer(recommendations, many=True)
+        return Response(serializer.data)
 
 
 class CourseEnrollView(APIView):
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [CachedBasicAuthentication]
     permission_classes = [IsAuthenticated]
+    throttle_classes = [IPTokenBucketThrottle, UserTokenBucketThrottle]
 
     def post(self, request, pk: int, format=None) -> Response:
         course: Course = get_object_or_404(Course, id=pk)
         course.students.add(request.user)
         return Response()
+
+
+class ChunkedUploadViewSet(CreateModelMixin, RetrieveModelMixin, GenericViewSet):
+    """
+    Resumable upload of big `File` / `Image` contents, for instructors:
+      1. `POST uploads/` - start upload session,
+      2. `PUT uploads/<id>/chunks/<index>/` - raw chunk bytes, in any order,
+         can be retried; `GET uploads/<id>/` lists received chunks. When `sha256`
+         of an already stored file of the same kind was given, the response
+         of step 1. holds a randomly chosen `proof_chunk` - the session
+         is complete as soon as that chunk matches the stored file,
+      3. `POST uploads/<id>/complete/` - assembles the file and adds it to module.
+    """
+
+    ITEM_MODELS = {
+        ChunkedUpload.Kind.FILE: File,
+        ChunkedUpload.Kind.IMAGE: Image,
+    }
+
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [IsAuthenticated, CanAddContent]
+
+    def get_queryset(self):
+        return ChunkedUpload.objects.filter(owner=self.request.user)
+
+    def perform_create(self, serializer: ChunkedUploadSerializer) -> None:
+        size: int = serializer.validated_data[ChunkedUpload.Keys.size]
+        blob: MediaBlob | None = None
+        proof_chunk: int | None = None
+        if sha256 := serializer.validated_data.get(ChunkedUpload.Keys.sha256):
+            blob = find_blob(
+                sha256,
+                ChunkedUpload.UPLOAD_DIRS[
+                    serializer.validated_data[ChunkedUpload.Keys.kind]
+                ],
+            )
+        if blob is not None and blob.size == size:
+            # candidate only, the client has to send the chosen chunk
+            proof_chunk = secrets.randbelow(
+                ChunkedUpload(
+                    size=size, chunk_size=settings.CHUNKED_UPLOAD_CHUNK_SIZE
+                ).total_chunks
+            )
+        else:
+            blob = None
+
+        serializer.save(
+            owner=self.request.user,
+            chunk_size=settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+            blob=blob,
+            proof_chunk=proof_chunk,
+        )
+
+    @action(detail=True, methods=["put"], url_path=r"chunks/(?P<index>\d+)")
+    def chunk(self, request, index: str, *args, **kwargs) -> Response:
+        upload: ChunkedUpload = self.get_object()
+        if upload.status == ChunkedUpload.Status.UPLOADING:
+            try:
+                # stream request body straight to disk, without parsing it
+                write_chunk(upload, int(index), request.stream or io.BytesIO())
+            except DjangoValidationError as e:
+                raise ValidationError(e.messages)
+            if upload.blob is not None and int(index) == upload.proof_chunk:
+                self.match_blob(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def match_blob(self, upload: ChunkedUpload) -> None:
+        # stored file is reused, other chunks are not needed
+        if matches_blob(upload, upload.blob):
+            upload.status = ChunkedUpload.Status.COMPLETE
+            shutil.rmtree(get_upload_dir(upload), ignore_errors=True)
+        else:
+            upload.blob = None
+        ChunkedUpload.objects.filter(
+            id=upload.id, status=ChunkedUpload.Status.UPLOADING
+        ).update(status=upload.status, blob=upload.blob)
+
+    @action(detail=True, methods=["post"])
+    def complete(self, request, *args, **kwargs) -> Response:
+        serializer = ChunkedUploadCompleteSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            upload: ChunkedUpload = get_object_or_404(
+                self.get_queryset().select_for_update(), pk=kwargs["pk"]
+            )
+            if upload.status == ChunkedUpload.Status.UPLOADING:
+                try:
+                    upload.blob = assemble(upload)
+                except DjangoValidationError as e:
+                    raise ValidationError(e.messages)
+                upload.status = ChunkedUpload.Status.COMPLETE
+                upload.save(
+                    update_fields=[ChunkedUpload.Keys.status, ChunkedUpload.Keys.blob]
+                )
+
+            item, _ = get_or_create_file_item(
+                self.ITEM_MODELS[upload.kind],
+                owner=request.user,
+                title=serializer.validated_data["title"],
+                blob=upload.blob,
+            )
+            content = Content.objects.create(
+                module=serializer.validated_data["module"], item=item
+            )
+        return Response(
+            dict(content=content.id, item=item.id, file=item.file.url),
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class ReservationViewSet(PrefetchSerializerMixin, RetrieveModelMixin, GenericViewSet):
+    """
+    Checkout of products:
+      1. `POST reservations/` - reserves stock of all products (or none of them)
+         for `CHECKOUT_RESERVATION_TTL_SECONDS`, retried requests with the same
+         `Idempotency-Key` header return the original reservation,
+      2. `POST reservations/<id>/purchase/` - confirms the reservation,
+      3. `POST reservations/<id>/cancel/` - releases the stock.
+    Not purchased reservations are released when they expire.
+    """
+
+    queryset = Reservation.objects.all()
+    serializer_class = ReservationSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [IPTokenBucketThrottle, UserTokenBucketThrottle]
+    prefetch_actions = ("retrieve", "create", "purchase", "cancel")
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs) -> Response:
+        serializer = ReservationCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        idempotency_key: str = (
+            request.headers.get("Idempotency-Key") or uuid.uuid4().hex
+        )
+        if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise ValidationError("Idempotency key is too long.")
+
+        try:
+            reservation, created = reserve(
+                request.user, serializer.validated_data["products"], idempotency_key
+            )
+        except OutOfStock as e:
+            return Response(
+                dict(detail=str(e), available=e.products),
+                status=status.HTTP_409_CONFLICT,
+            )
+        if created:
+            release_expired_reservations.enqueue(
+                run_after=reservation.expires, unique=True
+            )
+        # with prefetched items
+        reservation = self.get_queryset().get(id=reservation.id)
+        return Response(
+            self.serialize(self.get_serializer(reservation)),
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["post"])
+    def purchase(self, request, *args, **kwargs) -> Response:
+        reservation: Reservation = self.get_object()
+        if not purchase(reservation):
+            return Response(
+                dict(detail="Reservation has expired or has been cancelled."),
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(self.serialize(self.get_serializer(reservation)))
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, *args, **kwargs) -> Response:
+        reservation: Reservation = self.get_object()
+        release(Reservation.objects.filter(id=reservation.id))
+        reservation.refresh_from_db(fields=[Reservation.Keys.status])
+        if reservation.status == Reservation.Status.PURCHASED:
+            return Response(
+                dict(detail="Reservation has been purchased."),
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(self.serialize(self.get_serializer(reservation)))
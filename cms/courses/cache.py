@@ -0,0 +1,70 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils.functional import SimpleLazyObject
+
+from common.cache import CacheLoader
+from common.cache import local_cache
+from courses.models import Course
+from courses.models import Subject
+
+# lists of the catalog page (`CourseListView`), also filled by cache warming
+SUBJECTS_KEY = "courses:all_subjects"
+SUBJECTS_TIMEOUT_SECONDS = 60 * 60
+SUBJECTS_LOCAL_TIMEOUT_SECONDS = 10
+
+SUBJECT_COURSES_KEY = "courses:subject:{subject_id}"
+SUBJECT_COURSES_TIMEOUT_SECONDS = 60
+
+ALL_COURSES_KEY = "courses:all_courses"
+ALL_COURSES_TIMEOUT_SECONDS = 60
+
+
+def get_subjects() -> list[Subject]:
+    return list(Subject.objects.annotate(total_courses=Count(Subject.Keys.courses)))
+
+
+def get_courses(subject_id: int | None = None) -> list[Course]:
+    courses = Course.objects.annotate(
+        total_modules=Count(Course.Keys.modules)
+    ).select_related(Course.Keys.subject, Course.Keys.owner)
+    if subject_id is not None:
+        courses = courses.filter(subject_id=subject_id)
+    return list(courses)
+
+
+def register_subjects(loader: CacheLoader, fill=get_subjects) -> SimpleLazyObject:
+    """
+    Subjects with their numbers of courses, usually from the process memory.
+    """
+    return loader.register(
+        SUBJECTS_KEY,
+        fill,
+        timeout=SUBJECTS_TIMEOUT_SECONDS,
+        local_timeout=SUBJECTS_LOCAL_TIMEOUT_SECONDS,
+    )
+
+
+def register_courses(
+    loader: CacheLoader, subject_id: int | None = None, fill=get_courses
+) -> SimpleLazyObject:
+    """
+    All courses or courses of the subject, with their numbers of modules.
+    `fill` is called with `subject_id` on a miss.
+    """
+    if subject_id is None:
+        return loader.register(
+            ALL_COURSES_KEY, fill, timeout=ALL_COURSES_TIMEOUT_SECONDS
+        )
+    return loader.register(
+        SUBJECT_COURSES_KEY.format(subject_id=subject_id),
+        partial(fill, subject_id),
+        timeout=SUBJECT_COURSES_TIMEOUT_SECONDS,
+    )
+
+
+def delete_cached_subjects() -> None:
+    cache.delete(SUBJECTS_KEY)
+    # local caches of other processes expire in seconds
+    local_cache.delete(SUBJECTS_KEY)
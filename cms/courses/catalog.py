@@ -0,0 +1,259 @@
+import hashlib
+import json
+import time
+from collections.abc import Iterator
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from courses.models import Course
+from courses.models import Subject
+
+CATALOG_VERSION_KEY = "courses:catalog_version"
+# outputs embed absolute URLs - origin is `<scheme>://<host>` of the request,
+# hashed with the output name (e.g. a subject slug), memcached keys are limited
+# to 250 characters
+CATALOG_OUTPUT_KEY = "courses:catalog:{version}:{output}"
+# outputs of old versions are never read again, they just expire
+CATALOG_OUTPUT_TIMEOUT_SECONDS = 24 * 60 * 60
+# memcached limits size of items (1MB by default)
+CATALOG_OUTPUT_PART_SIZE = 512 * 1024
+
+# limit of the sitemap protocol
+SITEMAP_MAX_URLS = 50_000
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def get_catalog_version() -> int:
+    version: int | None = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # never reuses versions of outputs which may still be cached
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version() -> None:
+    """
+    Called when courses or subjects change, cached sitemaps and feeds
+    are regenerated on next request.
+    """
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+
+
+def get_output_cache_key(origin: str, name: str) -> str:
+    # key of the number of parts, parts are stored under `<key>:<part>`
+    output: str = hashlib.sha256(f"{origin}\n{name}".encode()).hexdigest()
+    return CATALOG_OUTPUT_KEY.format(version=get_catalog_version(), output=output)
+
+
+def stream_cached(origin: str, name: str, chunks: Iterator[str]) -> Iterator[bytes]:
+    """
+    Streams output of the current catalog version from the cache, when missing
+    streams `chunks` while storing them in the cache in parts (bounded memory).
+    Number of parts is stored last - incomplete outputs are never read.
+    """
+    key: str = get_output_cache_key(origin, name)
+    total_parts: int | None = cache.get(key)
+    if total_parts is not None:
+        part_keys: list[str] = [f"{key}:{part}" for part in range(total_parts)]
+        parts: dict[str, bytes] = cache.get_many(part_keys)
+        if len(parts) == total_parts:
+            for part_key in part_keys:
+                yield parts[part_key]
+            return
+
+    buffer: list[bytes] = []
+    buffered, total_parts = 0, 0
+    for chunk in chunks:
+        data: bytes = chunk.encode()
+        yield data
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= CATALOG_OUTPUT_PART_SIZE:
+            cache.set(
+                f"{key}:{total_parts}",
+                b"".join(buffer),
+                CATALOG_OUTPUT_TIMEOUT_SECONDS,
+            )
+            buffer, buffered, total_parts = [], 0, total_parts + 1
+    if buffer:
+        cache.set(
+            f"{key}:{total_parts}", b"".join(buffer), CATALOG_OUTPUT_TIMEOUT_SECONDS
+        )
+        total_parts += 1
+    cache.set(key, total_parts, CATALOG_OUTPUT_TIMEOUT_SECONDS)
+
+
+def _get_course_url_format() -> str:
+    # reversed once instead of for every course
+    return reverse("course_detail", args=["__slug__"]).replace("__slug__", "{slug}")
+
+
+def _format_date(value: datetime) -> str:
+    return value.isoformat(timespec="seconds")
+
+
+def _count_sitemap_pages() -> int:
+    # catalog page and subject pages come before courses
+    total_urls: int = 1 + Subject.objects.count() + Course.objects.count()
+    return max(1, -(-total_urls // SITEMAP_MAX_URLS))
+
+
+def get_sitemap_pages() -> int:
+    key: str = get_output_cache_key(origin="", name="sitemap_pages")
+    return cache.get_or_set(key, _count_sitemap_pages, CATALOG_OUTPUT_TIMEOUT_SECONDS)
+
+
+def iter_sitemap_index(base_url: str) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for page in range(1, get_sitemap_pages() + 1):
+        url: str = base_url + reverse("sitemap_page", args=[page])
+        yield f"<sitemap><loc>{escape(url)}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def iter_sitemap_page(base_url: str, page: int) -> Iterator[str]:
+    """
+    Page of up to `SITEMAP_MAX_URLS` URLs of catalog, subject and course pages.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+
+    offset: int = (page - 1) * SITEMAP_MAX_URLS
+    limit: int = SITEMAP_MAX_URLS
+    if offset == 0:
+        yield f"<url><loc>{escape(base_url + reverse('course_list'))}</loc></url>\n"
+        limit -= 1
+    else:
+        offset -= 1
+
+    subject_slugs = Subject.objects.order_by(Subject.Keys.id).values_list(
+        Subject.Keys.slug, flat=True
+    )[offset : offset + limit]
+    for slug in subject_slugs.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        url: str = base_url + reverse("course_list_subject", args=[slug])
+        yield f"<url><loc>{escape(url)}</loc></url>\n"
+        limit -= 1
+    offset = max(0, offset - Subject.objects.count())
+
+    url_format: str = base_url + _get_course_url_format()
+    courses = Course.objects.order_by(Course.Keys.id).values_list(
+        Course.Keys.slug, Course.Keys.updated
+    )[offset : offset + limit]
+    for slug, updated in courses.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield (
+            f"<url><loc>{escape(url_format.format(slug=slug))}</loc>"
+            f"<lastmod>{_format_date(updated)}</lastmod></url>\n"
+        )
+    yield "</urlset>\n"
+
+
+def _iter_subject_courses(subject_id: int) -> Iterator[tuple]:
+    courses = (
+        Course.objects.filter(subject_id=subject_id)
+        .order_by(f"-{Course.Keys.created}")
+        .values_list(
+            Course.Keys.slug,
+            Course.Keys.title,
+            Course.Keys.overview,
+            Course.Keys.created,
+            Course.Keys.updated,
+            f"{Course.Keys.owner}__first_name",
+            f"{Course.Keys.owner}__last_name",
+        )
+    )
+    return courses.iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+
+def iter_atom_feed(base_url: str, subject: Subject, feed_url: str) -> Iterator[str]:
+    """
+    Atom feed of all courses of the subject, newest first.
+    `subject` needs only id, title and slug.
+    """
+    subject_url: str = base_url + reverse("course_list_subject", args=[subject.slug])
+    latest_update: datetime | None = (
+        Course.objects.filter(subject_id=subject.id)
+        .order_by(f"-{Course.Keys.updated}")
+        .values_list(Course.Keys.updated, flat=True)
+        .first()
+    )
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    yield f"<id>{escape(feed_url)}</id>\n"
+    yield f"<title>{escape(subject.title)} courses</title>\n"
+    yield f'<link rel="self" href="{escape(feed_url)}"/>\n'
+    yield f'<link rel="alternate" href="{escape(subject_url)}"/>\n'
+    if latest_update is not None:
+        yield f"<updated>{_format_date(latest_update)}</updated>\n"
+
+    url_format: str = base_url + _get_course_url_format()
+    for (
+        slug,
+        title,
+        overview,
+        created,
+        updated,
+        first_name,
+        last_name,
+    ) in _iter_subject_courses(subject.id):
+        url: str = escape(url_format.format(slug=slug))
+        author: str = f"{first_name} {last_name}".strip()
+        yield (
+            f"<entry><id>{url}</id><title>{escape(title)}</title>"
+            f'<link href="{url}"/>'
+            f"<published>{_format_date(created)}</published>"
+            f"<updated>{_format_date(updated)}</updated>"
+            f"<author><name>{escape(author)}</name></author>"
+            f"<summary>{escape(overview)}</summary></entry>\n"
+        )
+    yield "</feed>\n"
+
+
+def iter_json_feed(base_url: str, subject: Subject, feed_url: str) -> Iterator[str]:
+    """
+    JSON Feed (https://jsonfeed.org/version/1.1) of all courses of the subject,
+    newest first. `subject` needs only id, title and slug.
+    """
+    subject_url: str = base_url + reverse("course_list_subject", args=[subject.slug])
+    header: str = json.dumps(
+        dict(
+            version="https://jsonfeed.org/version/1.1",
+            title=f"{subject.title} courses",
+            home_page_url=subject_url,
+            feed_url=feed_url,
+        )
+    )
+    # items are appended to the header object
+    yield header[:-1] + ', "items": ['
+
+    url_format: str = base_url + _get_course_url_format()
+    separator = ""
+    for (
+        slug,
+        title,
+        overview,
+        created,
+        updated,
+        first_name,
+        last_name,
+    ) in _iter_subject_courses(subject.id):
+        url: str = url_format.format(slug=slug)
+        item = dict(
+            id=url,
+            url=url,
+            title=title,
+            content_text=overview,
+            date_published=_format_date(created),
+            date_modified=_format_date(updated),
+            authors=[dict(name=f"{first_name} {last_name}".strip())],
+        )
+        yield separator + json.dumps(item)
+        separator = ",\n"
+    yield "]}\n"
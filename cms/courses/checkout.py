@@ -0,0 +1,176 @@
+from datetime import datetime
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import F
+from django.db.models import IntegerField
+from django.db.models import Min
+from django.db.models import QuerySet
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models import When
+from django.utils import timezone
+
+from courses.models import Product
+from courses.models import Reservation
+from courses.models import ReservationItem
+
+User = get_user_model()
+
+# reservations released by a single sweeper transaction
+RELEASE_BATCH_SIZE = 500
+
+
+class OutOfStock(Exception):
+    def __init__(self, products: dict[str, int]):
+        super().__init__(f"Not enough stock of: {', '.join(sorted(products))}")
+        # name -> available quantity, 0 for unknown products
+        self.products = products
+
+
+def _per_product(quantities: dict[str, int]) -> Case:
+    return Case(
+        *(
+            When(name=name, then=Value(quantity))
+            for name, quantity in quantities.items()
+        ),
+        output_field=IntegerField(),
+    )
+
+
+def reserve(
+    user: User, quantities: dict[str, int], idempotency_key: str
+) -> tuple[Reservation, bool]:
+    """
+    Reserves stock of all products (name -> quantity) or none of them.
+    Stock is taken with a single conditional UPDATE
+    (`quantity = quantity - n WHERE quantity >= n`) - no rows are read with
+    SELECT FOR UPDATE, product rows are locked only from the update to the commit.
+    Returns the reservation and whether it was created - repeated calls with
+    the same `idempotency_key` return the original reservation.
+    """
+    existing: Reservation | None = Reservation.objects.filter(
+        user=user, idempotency_key=idempotency_key
+    ).first()
+    if existing is not None:
+        return existing, False
+
+    prices: dict[str, int] = dict(
+        Product.objects.filter(name__in=quantities).values_list(
+            Product.Keys.name, Product.Keys.price
+        )
+    )
+    if len(prices) != len(quantities):
+        raise OutOfStock({name: 0 for name in quantities if name not in prices})
+
+    try:
+        with transaction.atomic():
+            reservation = Reservation.objects.create(
+                user=user,
+                idempotency_key=idempotency_key,
+                total_price=sum(
+                    prices[name] * quantity for name, quantity in quantities.items()
+                ),
+                expires=timezone.now()
+                + timedelta(seconds=settings.CHECKOUT_RESERVATION_TTL_SECONDS),
+            )
+            ReservationItem.objects.bulk_create(
+                ReservationItem(
+                    reservation=reservation,
+                    product_id=name,
+                    quantity=quantity,
+                    price=prices[name],
+                )
+                for name, quantity in quantities.items()
+            )
+            requested = _per_product(quantities)
+            updated: int = Product.objects.filter(
+                name__in=quantities, quantity__gte=requested
+            ).update(quantity=F(Product.Keys.quantity) - requested)
+            if updated != len(quantities):
+                # rolls back the reservation and stock of other products
+                transaction.set_rollback(True)
+    except IntegrityError:
+        # concurrent request with the same idempotency key has won
+        existing = Reservation.objects.filter(
+            user=user, idempotency_key=idempotency_key
+        ).first()
+        if existing is None:
+            raise
+        return existing, False
+
+    if updated != len(quantities):
+        raise OutOfStock(
+            {
+                name: available
+                for name, available in Product.objects.filter(
+                    name__in=quantities
+                ).values_list(Product.Keys.name, Product.Keys.quantity)
+                if available < quantities[name]
+            }
+        )
+    return reservation, True
+
+
+def purchase(reservation: Reservation) -> bool:
+    """
+    Confirms the reservation unless it has been released or has expired,
+    repeated purchases succeed.
+    """
+    purchased: int = Reservation.objects.filter(
+        id=reservation.id,
+        status=Reservation.Status.RESERVED,
+        expires__gt=timezone.now(),
+    ).update(status=Reservation.Status.PURCHASED)
+    reservation.refresh_from_db(fields=[Reservation.Keys.status])
+    return bool(purchased) or reservation.status == Reservation.Status.PURCHASED
+
+
+def release(reservations: QuerySet[Reservation], limit: int | None = None) -> int:
+    """
+    Releases not purchased reservations and returns their stock, with a few
+    set based statements. Reservations locked by concurrent purchases
+    are skipped.
+    """
+    with transaction.atomic():
+        pending = reservations.filter(
+            status=Reservation.Status.RESERVED
+        ).select_for_update(skip_locked=True)
+        if limit is not None:
+            pending = pending[:limit]
+        ids: list[int] = list(pending.values_list(Reservation.Keys.id, flat=True))
+        if not ids:
+            return 0
+        Reservation.objects.filter(id__in=ids).update(
+            status=Reservation.Status.RELEASED
+        )
+        returned: dict[str, int] = dict(
+            ReservationItem.objects.filter(reservation_id__in=ids)
+            .order_by(ReservationItem.Keys.product)
+            .values_list(ReservationItem.Keys.product)
+            .annotate(Sum(ReservationItem.Keys.quantity))
+        )
+        Product.objects.filter(name__in=returned).update(
+            quantity=F(Product.Keys.quantity) + _per_product(returned)
+        )
+    return len(ids)
+
+
+def release_expired() -> int:
+    expired = Reservation.objects.filter(expires__lte=timezone.now()).order_by(
+        Reservation.Keys.expires
+    )
+    released = 0
+    while batch := release(expired, limit=RELEASE_BATCH_SIZE):
+        released += batch
+    return released
+
+
+def get_next_expiry() -> datetime | None:
+    return Reservation.objects.filter(status=Reservation.Status.RESERVED).aggregate(
+        Min(Reservation.Keys.expires)
+    )[f"{Reservation.Keys.expires}__min"]
@@ -0,0 +1,220 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError
+from django.db import transaction
+
+from courses.models import Content
+from courses.models import Course
+from courses.models import File
+from courses.models import Image
+from courses.models import ItemBase
+from courses.models import Module
+from courses.models import Quiz
+from courses.models import QuizQuestion
+from courses.models import Text
+from courses.models import Video
+from courses.outline import schedule_outline_refresh
+
+User = get_user_model()
+
+ITEM_MODELS: list[type[ItemBase]] = [Text, Video, Image, File, Quiz]
+BATCH_SIZE = 1000
+SLUG_MAX_LENGTH: int = Course._meta.get_field(Course.Keys.slug).max_length
+# candidate slugs checked per query
+SLUG_CANDIDATES = 20
+# concurrent clones of the course taking the same free slug
+SLUG_ATTEMPTS = 5
+
+# set for the copies instead of copied
+_NOT_COPIED_ITEM_FIELDS = {
+    ItemBase.Keys.id,
+    ItemBase.Keys.created,
+    ItemBase.Keys.updated,
+    ItemBase.Keys.ref_count,
+    f"{ItemBase.Keys.owner}_id",
+}
+
+
+def _get_copy_slug(slug: str, number: int) -> str:
+    suffix: str = "-copy" if number == 1 else f"-copy-{number}"
+    # long slugs are truncated to fit the suffix
+    return slug[: SLUG_MAX_LENGTH - len(suffix)] + suffix
+
+
+def get_clone_slug(slug: str) -> str:
+    """
+    Returns first free slug of form `<slug>-copy`, `<slug>-copy-2`, ...
+    """
+    number = 1
+    while True:
+        candidates: list[str] = [
+            _get_copy_slug(slug, number + i) for i in range(SLUG_CANDIDATES)
+        ]
+        taken: set[str] = set(
+            Course.objects.filter(slug__in=candidates).values_list(
+                Course.Keys.slug, flat=True
+            )
+        )
+        for candidate in candidates:
+            if candidate not in taken:
+                return candidate
+        number += SLUG_CANDIDATES
+
+
+def _create_clone(course: Course, owner: User, title: str) -> Course:
+    """
+    Creates the copy of the course row with a free clone slug, the slug is
+    looked up again when a concurrent clone took it first.
+    """
+    for attempt in range(SLUG_ATTEMPTS):
+        try:
+            # savepoint, the outer transaction stays usable after the conflict
+            with transaction.atomic():
+                return Course.objects.create(
+                    owner=owner,
+                    subject_id=course.subject_id,
+                    title=title,
+                    slug=get_clone_slug(course.slug),
+                    overview=course.overview,
+                )
+        except IntegrityError:
+            if attempt == SLUG_ATTEMPTS - 1:
+                raise
+
+
+def _clone_items(
+    model: type[ItemBase], references: Counter, owner: User
+) -> dict[int, int]:
+    """
+    Copies referenced items (id -> number of references) with batched inserts,
+    returns mapping of old to new ids.
+    Items shared by many contents of the course are copied once and stay shared.
+    """
+    fields: list[str] = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname not in _NOT_COPIED_ITEM_FIELDS
+    ]
+    rows: list[tuple] = list(
+        model.objects.filter(id__in=references)
+        .order_by(ItemBase.Keys.id)
+        .values_list(ItemBase.Keys.id, *fields)
+    )
+    copies: list[ItemBase] = model.objects.bulk_create(
+        (
+            model(owner=owner, ref_count=references[id], **dict(zip(fields, values)))
+            for id, *values in rows
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return {row[0]: copy.id for row, copy in zip(rows, copies)}
+
+
+def _clone_questions(quiz_ids: dict[int, int]) -> None:
+    questions = (
+        QuizQuestion.objects.filter(quiz_id__in=quiz_ids)
+        .order_by(QuizQuestion.Keys.id)
+        .values_list(
+            f"{QuizQuestion.Keys.quiz}_id",
+            QuizQuestion.Keys.text,
+            QuizQuestion.Keys.choices,
+            QuizQuestion.Keys.answer,
+            QuizQuestion.Keys.points,
+            QuizQuestion.Keys.order,
+        )
+    )
+    QuizQuestion.objects.bulk_create(
+        (
+            QuizQuestion(
+                quiz_id=quiz_ids[quiz_id],
+                text=text,
+                choices=choices,
+                answer=answer,
+                points=points,
+                order=order,
+            )
+            for quiz_id, text, choices, answer, points, order in questions
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def clone_course(course: Course, owner: User, title: str) -> Course:
+    """
+    Copies the course with its modules, contents and their items in a single
+    transaction - a batched INSERT per model instead of a save per row,
+    ids of copies are remapped in memory. Files are not copied,
+    copied items point at the same (content addressed) files.
+    Students and published versions are not copied.
+    The copy gets the first free slug, see `get_clone_slug`.
+    """
+    with transaction.atomic():
+        clone: Course = _create_clone(course, owner, title)
+
+        modules: list[tuple] = list(
+            course.modules.order_by(Module.Keys.order).values_list(
+                Module.Keys.id,
+                Module.Keys.title,
+                Module.Keys.description,
+                Module.Keys.order,
+            )
+        )
+        module_copies: list[Module] = Module.objects.bulk_create(
+            (
+                Module(
+                    course=clone,
+                    title=module_title,
+                    description=description,
+                    order=order,
+                )
+                for _, module_title, description, order in modules
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        module_ids: dict[int, int] = {
+            module[0]: copy.id for module, copy in zip(modules, module_copies)
+        }
+
+        contents: list[tuple] = list(
+            Content.objects.filter(module__course=course)
+            .order_by(Content.Keys.id)
+            .values_list(
+                f"{Content.Keys.module}_id",
+                f"{Content.Keys.content_type}_id",
+                Content.Keys.object_id,
+                Content.Keys.order,
+            )
+        )
+        # content type id -> old item id -> new item id
+        item_ids: dict[int, dict[int, int]] = {}
+        for model in ITEM_MODELS:
+            content_type_id: int = ContentType.objects.get_for_model(model).id
+            references = Counter(
+                object_id
+                for _, type_id, object_id, _ in contents
+                if type_id == content_type_id
+            )
+            if references:
+                item_ids[content_type_id] = _clone_items(model, references, owner)
+        if quiz_ids := item_ids.get(ContentType.objects.get_for_model(Quiz).id):
+            _clone_questions(quiz_ids)
+
+        Content.objects.bulk_create(
+            (
+                Content(
+                    module_id=module_ids[module_id],
+                    content_type_id=content_type_id,
+                    object_id=item_ids[content_type_id][object_id],
+                    order=order,
+                )
+                for module_id, content_type_id, object_id, order in contents
+                # skips contents of removed items
+                if object_id in item_ids.get(content_type_id, ())
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        # bulk inserts do not send signals
+        schedule_outline_refresh(course_id=clone.id)
+    return clone
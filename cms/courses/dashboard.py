@@ -0,0 +1,88 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import IntegerField
+from django.db.models import OuterRef
+from django.db.models import QuerySet
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models.expressions import Window
+from django.db.models.functions import Coalesce
+from django.db.models.functions import RowNumber
+
+from courses.models import Course
+
+CACHE_VERSION_KEY = "courses:owner:{owner_id}:dashboard_version"
+CACHE_PAGE_KEY = "courses:owner:{owner_id}:dashboard:{version}:{page}"
+DASHBOARD_CACHE_TIMEOUT_SECONDS = 60
+
+LATEST_ENROLLMENTS = 3
+
+# auto created `Course.students` M2M table, its ids grow with enrollments
+Enrollment = Course.students.through
+
+
+def annotate_dashboard(queryset: QuerySet[Course]) -> QuerySet[Course]:
+    """
+    Adds number of enrolled students. Modules and contents counts
+    come from the denormalized `Course.outline`.
+    """
+    total_students = (
+        Enrollment.objects.filter(course=OuterRef("pk"))
+        .order_by()
+        .values("course")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return queryset.annotate(
+        total_students=Coalesce(
+            Subquery(total_students, output_field=IntegerField()), Value(0)
+        )
+    )
+
+
+def attach_latest_enrollments(courses: list[Course]) -> list[Course]:
+    """
+    Sets `latest_students` of each course (display names) using a single query
+    over enrollments of all given courses. Courses are cached with them,
+    user instances (with password hashes) are not.
+    """
+    enrollments = (
+        Enrollment.objects.filter(course__in=courses)
+        .annotate(
+            rank=Window(
+                RowNumber(), partition_by=F("course_id"), order_by=F("id").desc()
+            )
+        )
+        .filter(rank__lte=LATEST_ENROLLMENTS)
+        .order_by("course_id", "rank")
+        .values_list(
+            "course_id", "user__username", "user__first_name", "user__last_name"
+        )
+    )
+    students = defaultdict(list)
+    for course_id, username, first_name, last_name in enrollments:
+        # as `User.get_full_name`, the username when empty
+        students[course_id].append(f"{first_name} {last_name}".strip() or username)
+
+    for course in courses:
+        course.latest_students = students[course.id]
+    return courses
+
+
+def get_dashboard_page_cache_key(owner_id: int, page: int) -> str:
+    version: int = cache.get_or_set(
+        CACHE_VERSION_KEY.format(owner_id=owner_id), 1, timeout=None
+    )
+    return CACHE_PAGE_KEY.format(owner_id=owner_id, version=version, page=page)
+
+
+def invalidate_dashboards(owner_ids: set[int]) -> None:
+    for owner_id in owner_ids:
+        try:
+            cache.incr(CACHE_VERSION_KEY.format(owner_id=owner_id))
+        except ValueError:
+            # no cached pages yet
+            pass
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import partial
+
+import psycopg
+from django.conf import settings
+from django.db import connections
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "course_events"
+# delay of reconnects of the listener (and of clients, sent as SSE `retry`)
+RECONNECT_DELAY_SECONDS = 3
+
+
+class EventType:
+    MODULE_ADDED = "module_added"
+    MODULE_UPDATED = "module_updated"
+    MODULE_DELETED = "module_deleted"
+    MODULES_REORDERED = "modules_reordered"
+    CONTENT_ADDED = "content_added"
+    CONTENT_DELETED = "content_deleted"
+    CONTENTS_REORDERED = "contents_reordered"
+    ITEM_UPDATED = "item_updated"
+    COURSE_PUBLISHED = "course_published"
+
+
+def publish_event(course_id: int, type: str, **data) -> None:
+    """
+    Notifies streams of the course once the current transaction commits,
+    `data` holds ids of changed objects.
+    With Postgres events are sent with `NOTIFY` (transactional, identical
+    notifications of one transaction are delivered once) to streams of all
+    processes, with other databases only to streams of the current process.
+    """
+    payload: str = json.dumps(dict(course=course_id, type=type, **data))
+    connection = connections["default"]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+    else:
+        transaction.on_commit(partial(broker.dispatch_threadsafe, payload))
+
+
+class EventBroker:
+    """
+    Per-process fan-out of course events to SSE streams (`asyncio` queues).
+    A single connection, started with the first stream, LISTENs to notifications
+    for all of them. Streams of slow clients and all streams after the listener
+    failure (events may have been missed) are closed - clients reconnect
+    and refetch.
+    """
+
+    def __init__(self):
+        self.queues: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.listener: asyncio.Task | None = None
+
+    @asynccontextmanager
+    async def subscribe(self, course_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Queue of JSON payloads of course events, `None` when the stream
+        should be closed.
+        """
+        self.start()
+        queue = asyncio.Queue(settings.COURSE_EVENTS_QUEUE_SIZE)
+        self.queues[course_id].add(queue)
+        try:
+            yield queue
+        finally:
+            queues: set[asyncio.Queue] = self.queues[course_id]
+            queues.discard(queue)
+            if not queues:
+                del self.queues[course_id]
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.loop is loop and (self.listener is None or not self.listener.done()):
+            return
+        self.loop = loop
+        self.listener = None
+        if connections["default"].vendor == "postgresql":
+            self.listener = loop.create_task(self.listen())
+
+    async def listen(self) -> None:
+        params: dict = connections["default"].get_connection_params()
+        # Django cursor classes are synchronous
+        params.pop("cursor_factory", None)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    **params, autocommit=True
+                ) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    async for notify in conn.notifies():
+                        self.dispatch(notify.payload)
+            except (psycopg.Error, OSError):
+                logger.exception("Listening to course events failed, reconnecting")
+                self.close_all()
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    def dispatch(self, payload: str) -> None:
+        course_id: int = json.loads(payload)["course"]
+        for queue in self.queues.get(course_id, ()):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self.close(queue)
+
+    def dispatch_threadsafe(self, payload: str) -> None:
+        # events are published from sync code (threads of `sync_to_async`)
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.dispatch, payload)
+
+    def close(self, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def close_all(self) -> None:
+        for queues in self.queues.values():
+            for queue in queues:
+                self.close(queue)
+
+
+broker = EventBroker()
+
+
+async def stream_events(course_id: int) -> AsyncIterator[str]:
+    """
+    Server-sent events of the course, with comments sent as heartbeats
+    (keep proxies from closing idle connections). Ends after
+    `COURSE_EVENTS_MAX_CONNECTION_SECONDS`, clients reconnect.
+    """
+    loop = asyncio.get_running_loop()
+    deadline: float = loop.time() + settings.COURSE_EVENTS_MAX_CONNECTION_SECONDS
+    async with broker.subscribe(course_id) as queue:
+        yield f"retry: {RECONNECT_DELAY_SECONDS * 1000}\n\n"
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                payload: str | None = await asyncio.wait_for(
+                    queue.get(),
+                    min(settings.COURSE_EVENTS_HEARTBEAT_SECONDS, remaining),
+                )
+            except TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if payload is None:
+                break
+            yield f"data: {payload}\n\n"
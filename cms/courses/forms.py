@@ -1,12 +1,130 @@
+from django import forms
+from django.db import transaction
+from django.db.models import Max
+from django.forms import BaseInlineFormSet
 from django.forms import inlineformset_factory
 
+from courses.events import EventType
+from courses.events import publish_event
 from courses.models import Course
 from courses.models import Module
+from courses.models import Quiz
+from courses.models import QuizQuestion
+from courses.outline import schedule_outline_refresh
+
+
+class BaseModuleFormSet(BaseInlineFormSet):
+    """
+    Saves modules with bulk queries in a single transaction - one UPDATE
+    for changed modules, one DELETE and one INSERT, untouched forms are skipped.
+    """
+
+    def save(self, commit: bool = True) -> list[Module]:
+        if not commit:
+            return super().save(commit=False)
+
+        changed: list[Module] = []
+        created: list[Module] = []
+        deleted_ids: list[int] = []
+        for form in self.forms:
+            if self.can_delete and self._should_delete_form(form):
+                if form.instance.pk is not None:
+                    deleted_ids.append(form.instance.pk)
+            elif form.has_changed():
+                if form.instance.pk is None:
+                    created.append(form.instance)
+                else:
+                    changed.append(form.instance)
+
+        with transaction.atomic():
+            if changed:
+                Module.objects.bulk_update(
+                    changed, [Module.Keys.title, Module.Keys.description]
+                )
+            if deleted_ids:
+                self.instance.modules.filter(id__in=deleted_ids).delete()
+            if created:
+                last_order: int | None = self.instance.modules.aggregate(
+                    Max(Module.Keys.order)
+                )[f"{Module.Keys.order}__max"]
+                for order, module in enumerate(created, start=(last_order or -1) + 1):
+                    module.course = self.instance
+                    module.order = order
+                Module.objects.bulk_create(created)
+
+            # bulk queries do not send signals (deletes do)
+            if changed or created:
+                schedule_outline_refresh(course_id=self.instance.id)
+            for module in changed:
+                publish_event(
+                    self.instance.id, EventType.MODULE_UPDATED, module=module.id
+                )
+            for module in created:
+                publish_event(
+                    self.instance.id, EventType.MODULE_ADDED, module=module.id
+                )
+        return changed + created
+
 
 ModuleFormSet = inlineformset_factory(
     parent_model=Course,
     model=Module,
+    formset=BaseModuleFormSet,
     fields=[Module.Keys.title, Module.Keys.description],
     extra=2,
     can_delete=True,
 )
+
+
+class QuizQuestionForm(forms.ModelForm):
+    """
+    Choices are edited one per line, the correct one by its (1-based) number.
+    """
+
+    choices = forms.CharField(
+        widget=forms.Textarea(attrs=dict(rows=4)), help_text="One choice per line."
+    )
+    answer = forms.IntegerField(min_value=1, help_text="Number of the correct choice.")
+
+    class Meta:
+        model = QuizQuestion
+        fields = [
+            QuizQuestion.Keys.text,
+            QuizQuestion.Keys.choices,
+            QuizQuestion.Keys.answer,
+            QuizQuestion.Keys.points,
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial[QuizQuestion.Keys.choices] = "\n".join(self.instance.choices)
+            self.initial[QuizQuestion.Keys.answer] = self.instance.answer + 1
+
+    def clean(self) -> dict:
+        cleaned_data: dict = super().clean()
+        choices: list[str] = [
+            line.strip()
+            for line in cleaned_data.get(QuizQuestion.Keys.choices, "").splitlines()
+            if line.strip()
+        ]
+        answer: int | None = cleaned_data.get(QuizQuestion.Keys.answer)
+        if len(choices) < 2:
+            self.add_error(
+                QuizQuestion.Keys.choices, "At least two choices are required."
+            )
+        elif answer is not None and answer > len(choices):
+            self.add_error(QuizQuestion.Keys.answer, "There is no such choice.")
+        elif answer is not None:
+            cleaned_data[QuizQuestion.Keys.choices] = choices
+            cleaned_data[QuizQuestion.Keys.answer] = answer - 1
+        return cleaned_data
+
+
+QuizQuestionFormSet = inlineformset_factory(
+    parent_model=Quiz,
+    model=QuizQuestion,
+    form=QuizQuestionForm,
+    extra=2,
+    can_delete=True,
+)
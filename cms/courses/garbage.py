@@ -0,0 +1,218 @@
+import os
+import shutil
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.utils import timezone
+from students.models import QuizSubmission
+
+from courses.images import get_derivative_name
+from courses.images import get_legacy_derivative_name
+from courses.models import ChunkedUpload
+from courses.models import Content
+from courses.models import File
+from courses.models import Image
+from courses.models import ItemBase
+from courses.models import MediaBlob
+from courses.models import Quiz
+from courses.models import Text
+from courses.models import Video
+from courses.publishing import get_published_files
+from courses.publishing import get_published_item_ids
+from courses.uploads import UPLOADS_DIR
+from courses.uploads import get_upload_dir
+
+ITEM_MODELS: list[type[ItemBase]] = [Text, Video, Image, File, Quiz]
+FILE_ITEM_MODELS: list[type[ItemBase]] = [File, Image]
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_GRACE = timedelta(hours=1)
+
+
+@dataclass
+class CollectionReport:
+    items: dict[str, int] = field(default_factory=dict)
+    blobs: int = 0
+    uploads: int = 0
+    files: int = 0
+    reclaimed_bytes: int = 0
+
+
+class GarbageCollector:
+    """
+    Removes content items not referenced by any `Content`, media files
+    not referenced by any item, blob or published snapshot and abandoned
+    upload sessions.
+    Everything younger than `grace` is kept - it may be in the middle of creation.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        grace: timedelta = DEFAULT_GRACE,
+        dry_run: bool = False,
+    ):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.cutoff: datetime = timezone.now() - grace
+        self.media_root = Path(settings.MEDIA_ROOT)
+        self.report = CollectionReport()
+        self.published_item_ids: dict[str, set[int]] = {}
+
+    def collect(self) -> CollectionReport:
+        # removed from modules, but still shown to students
+        self.published_item_ids = get_published_item_ids()
+        for model in ITEM_MODELS:
+            self.collect_items(model)
+        self.collect_uploads()
+        self.collect_blobs()
+        self.collect_files()
+        return self.report
+
+    def _delete_in_batches(self, queryset) -> int:
+        """
+        Deletes rows of `queryset` in id ordered batches, each batch
+        in its own short transaction. Queryset is re-evaluated for each batch.
+        """
+        deleted = 0
+        last_id = None
+        while True:
+            batch = queryset.order_by("pk")
+            if last_id is not None:
+                batch = batch.filter(pk__gt=last_id)
+            ids = list(batch.values_list("pk", flat=True)[: self.batch_size])
+            if not ids:
+                return deleted
+
+            last_id = ids[-1]
+            if self.dry_run:
+                deleted += len(ids)
+                continue
+            with transaction.atomic():
+                # conditions are checked again on locked rows, rows changed
+                # concurrently (e.g. an item added to a module) are re-checked
+                locked: list = list(
+                    queryset.filter(pk__in=ids)
+                    .select_for_update(of=("self",))
+                    .values_list("pk", flat=True)
+                )
+                count, _ = queryset.model.objects.filter(pk__in=locked).delete()
+            deleted += count
+
+    def collect_items(self, model: type[ItemBase]) -> None:
+        content_type = ContentType.objects.get_for_model(model)
+        orphans = model.objects.filter(
+            ~Exists(
+                Content.objects.filter(
+                    content_type=content_type, object_id=OuterRef("pk")
+                )
+            ),
+            # adding contents updates the (locked) item row
+            ref_count=0,
+            updated__lt=self.cutoff,
+        ).exclude(pk__in=self.published_item_ids.get(model._meta.model_name, ()))
+        if model is Quiz:
+            # removed quizzes keep grades of students
+            orphans = orphans.exclude(
+                Exists(QuizSubmission.objects.filter(quiz=OuterRef("pk")))
+            )
+        self.report.items[model._meta.model_name] = self._delete_in_batches(orphans)
+
+    def collect_uploads(self) -> None:
+        expired = ChunkedUpload.objects.filter(
+            created__lt=self.cutoff - timedelta(seconds=settings.CHUNKED_UPLOAD_TTL)
+        )
+        for upload in expired.only("id").iterator():
+            self._remove(get_upload_dir(upload))
+        self.report.uploads = self._delete_in_batches(expired)
+
+        # chunk directories without upload session rows
+        uploads_dir: Path = self.media_root / UPLOADS_DIR
+        if uploads_dir.is_dir():
+            existing = {
+                str(id) for id in ChunkedUpload.objects.values_list("id", flat=True)
+            }
+            for path in uploads_dir.iterdir():
+                if path.name not in existing and self._is_expired(path):
+                    self._remove(path)
+
+    def collect_blobs(self) -> None:
+        referenced = Q()
+        for model in FILE_ITEM_MODELS:
+            referenced |= Q(Exists(model.objects.filter(file=OuterRef("path"))))
+        # blobs of not expired upload sessions may still be added to modules
+        unreferenced = MediaBlob.objects.filter(
+            ~referenced, uploads__isnull=True, created__lt=self.cutoff
+        )
+        # files are removed by `collect_files`
+        self.report.blobs = self._delete_in_batches(unreferenced)
+
+    def get_referenced_files(self) -> set[str]:
+        """
+        Files of items, of remaining blobs (upload sessions may still hand them
+        out) and files linked by published snapshots, with image derivatives.
+        """
+        files: dict[str, set[str]] = get_published_files()
+        for model in FILE_ITEM_MODELS:
+            files[model._meta.model_name].update(
+                model.objects.values_list("file", flat=True).iterator()
+            )
+        # in a dry run also blobs which would be removed, they still exist
+        for path in MediaBlob.objects.values_list("path", flat=True).iterator():
+            if path.startswith(f"{Image.UPLOAD_DIR}/"):
+                files[Image._meta.model_name].add(path)
+            else:
+                files[File._meta.model_name].add(path)
+
+        referenced = set()
+        for model_name, names in files.items():
+            referenced.update(names)
+            if model_name == Image._meta.model_name:
+                for width in settings.IMAGE_DERIVATIVE_WIDTHS:
+                    referenced.update(
+                        get_derivative_name(name, width) for name in names
+                    )
+                    referenced.update(
+                        get_legacy_derivative_name(name, width) for name in names
+                    )
+        return referenced
+
+    def collect_files(self) -> None:
+        referenced: set[str] = self.get_referenced_files()
+        for upload_dir in [File.UPLOAD_DIR, Image.UPLOAD_DIR]:
+            for root, _, files in os.walk(self.media_root / upload_dir):
+                for file_name in files:
+                    path = Path(root) / file_name
+                    name: str = path.relative_to(self.media_root).as_posix()
+                    if name not in referenced and self._is_expired(path):
+                        self._remove(path)
+
+    def _is_expired(self, path: Path) -> bool:
+        try:
+            modified: float = path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return modified < self.cutoff.timestamp()
+
+    def _remove(self, path: Path) -> None:
+        if path.is_dir():
+            size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+            if not self.dry_run:
+                shutil.rmtree(path, ignore_errors=True)
+        elif path.is_file():
+            size = path.stat().st_size
+            if not self.dry_run:
+                path.unlink(missing_ok=True)
+        else:
+            return
+        self.report.files += 1
+        self.report.reclaimed_bytes += size
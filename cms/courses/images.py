@@ -0,0 +1,114 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from PIL import Image as PILImage
+from PIL import ImageOps
+
+from courses.models import Image
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_DIR = "derivatives"
+DERIVATIVE_FORMAT = "WEBP"
+DERIVATIVE_QUALITY = 80
+
+CACHE_LOCK_KEY = "courses:image_derivative_lock:{name}"
+LOCK_TIMEOUT_SECONDS = 60
+LOCK_POLL_SECONDS = 0.1
+
+
+def _get_relative_path(name: str) -> Path:
+    path = Path(name)
+    if path.parts and path.parts[0] == Image.UPLOAD_DIR:
+        path = path.relative_to(Image.UPLOAD_DIR)
+    return path
+
+
+def get_derivative_name(name: str, width: int) -> str:
+    """
+    Deterministic storage name of resized variant of the `name` image, e.g.
+    `images/photo.jpg` -> `images/derivatives/photo.jpg.640w.webp`.
+    The suffix is kept - `photo.jpg` and `photo.png` are different images.
+    """
+    path: Path = _get_relative_path(name)
+    return f"{Image.UPLOAD_DIR}/{DERIVATIVES_DIR}/{path}.{width}w.webp"
+
+
+def get_legacy_derivative_name(name: str, width: int) -> str:
+    """
+    Name of the variant used before the suffix was kept, e.g.
+    `images/derivatives/photo.640w.webp` - still linked by HTML
+    of previously published snapshots.
+    """
+    path: Path = _get_relative_path(name).with_suffix("")
+    return f"{Image.UPLOAD_DIR}/{DERIVATIVES_DIR}/{path}.{width}w.webp"
+
+
+def get_media_path(name: str) -> Path:
+    return Path(settings.MEDIA_ROOT) / name
+
+
+def derivative_exists(name: str, width: int) -> bool:
+    return get_media_path(get_derivative_name(name, width)).is_file()
+
+
+def _resize(name: str, width: int) -> None:
+    target: Path = get_media_path(get_derivative_name(name, width))
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_target: Path = target.with_name(
+        f"{target.name}.tmp-{os.getpid()}-{threading.get_ident()}"
+    )
+
+    with PILImage.open(get_media_path(name)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        # never upscales, keeps aspect ratio
+        image.thumbnail((width, width * 10), PILImage.Resampling.LANCZOS)
+        image.save(tmp_target, DERIVATIVE_FORMAT, quality=DERIVATIVE_QUALITY)
+    os.replace(tmp_target, target)
+
+
+def generate_derivative(name: str, width: int) -> bool:
+    """
+    Creates `width` variant of the image, only one process does that at a time.
+    Others wait for the result. Returns whether the derivative exists.
+    """
+    if derivative_exists(name, width):
+        return True
+
+    lock_key: str = CACHE_LOCK_KEY.format(name=get_derivative_name(name, width))
+    if cache.add(lock_key, 1, LOCK_TIMEOUT_SECONDS):
+        try:
+            if not derivative_exists(name, width):
+                _resize(name, width)
+                # changes render cache key of the items, cached HTML
+                # links the fallback view instead of the created variant
+                Image.objects.filter(file=name).update(updated=timezone.now())
+        except Exception:
+            logger.exception("Failed to create %s derivative of %s.", width, name)
+            return False
+        finally:
+            cache.delete(lock_key)
+        return True
+
+    deadline: float = time.monotonic() + LOCK_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if derivative_exists(name, width):
+            return True
+        if not cache.get(lock_key):
+            # holder failed or finished without the result
+            break
+        time.sleep(LOCK_POLL_SECONDS)
+    return derivative_exists(name, width)
+
+
+def generate_derivatives(name: str) -> None:
+    for width in settings.IMAGE_DERIVATIVE_WIDTHS:
+        generate_derivative(name, width)
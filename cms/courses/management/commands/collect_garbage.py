@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from courses.garbage import DEFAULT_BATCH_SIZE
+from courses.garbage import DEFAULT_GRACE
+from courses.garbage import CollectionReport
+from courses.garbage import GarbageCollector
+
+
+class Command(BaseCommand):
+    help = (
+        "Removes content items without contents, unreferenced media files "
+        "and abandoned upload sessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--grace-minutes",
+            type=int,
+            default=int(DEFAULT_GRACE.total_seconds() // 60),
+            help="Keeps rows and files changed recently.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only reports (approximately) what would be removed.",
+        )
+
+    def handle(
+        self, *args, batch_size: int, grace_minutes: int, dry_run: bool, **options
+    ):
+        collector = GarbageCollector(
+            batch_size=batch_size,
+            grace=timedelta(minutes=grace_minutes),
+            dry_run=dry_run,
+        )
+        report: CollectionReport = collector.collect()
+
+        for model_name, count in report.items.items():
+            self.stdout.write(f"{model_name} items: {count}")
+        self.stdout.write(f"media blobs: {report.blobs}")
+        self.stdout.write(f"upload sessions: {report.uploads}")
+        self.stdout.write(f"files and directories: {report.files}")
+        self.stdout.write(
+            self.style.SUCCESS(f"reclaimed: {filesizeformat(report.reclaimed_bytes)}")
+        )
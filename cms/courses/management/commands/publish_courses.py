@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from courses.models import CourseSnapshot
+from courses.publishing import publish_course
+
+
+class Command(BaseCommand):
+    help = (
+        "Publishes current version of the courses. "
+        "By default only courses which were never published."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_ids", nargs="*", type=int)
+        parser.add_argument(
+            "--all", action="store_true", help="Republishes all courses."
+        )
+
+    def handle(self, *args, course_ids: list[int], all: bool, **options):
+        courses = Course.objects.all()
+        if course_ids:
+            courses = courses.filter(id__in=course_ids)
+        elif not all:
+            courses = courses.filter(published_snapshot__isnull=True)
+
+        for course_id in courses.values_list(Course.Keys.id, flat=True).iterator():
+            snapshot: CourseSnapshot = publish_course(course_id)
+            self.stdout.write(f"course {course_id}: version {snapshot.version}")
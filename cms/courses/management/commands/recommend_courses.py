@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import RecommendationRun
+from courses.recommendations import DEFAULT_BATCH_SIZE
+from courses.recommendations import DEFAULT_MIN_COMMON_STUDENTS
+from courses.recommendations import DEFAULT_TOP_K
+from courses.recommendations import RecommendationEngine
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes co-enrollment course recommendations. Refreshes only courses "
+        "affected by enrollments since the previous run unless --full is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recomputes all courses, e.g. to account for removed enrollments.",
+        )
+        parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+        parser.add_argument(
+            "--min-common-students", type=int, default=DEFAULT_MIN_COMMON_STUDENTS
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(
+        self,
+        *args,
+        full: bool,
+        top_k: int,
+        min_common_students: int,
+        batch_size: int,
+        **options,
+    ):
+        engine = RecommendationEngine(
+            top_k=top_k, min_common_students=min_common_students, batch_size=batch_size
+        )
+        run: RecommendationRun = engine.run(full=full)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Full' if run.full else 'Incremental'} run: "
+                f"{run.courses} courses refreshed, "
+                f"enrollments up to {run.last_enrollment_id}, "
+                f"{(run.finished - run.started).total_seconds():.1f}s"
+            )
+        )
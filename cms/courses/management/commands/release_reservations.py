@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from courses.checkout import release_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Releases expired product reservations and returns their stock. "
+        "Normally done by `release_expired_reservations` background job."
+    )
+
+    def handle(self, *args, **options):
+        released: int = release_expired()
+        self.stdout.write(f"{released} reservations released")
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from courses.warming import WarmResult
+from courses.warming import WarmTask
+from courses.warming import get_warm_tasks
+
+
+class RateLimiter:
+    """
+    Spaces out starts of tasks (of all threads) to at most `rate` per second.
+    """
+
+    def __init__(self, rate: float):
+        self.interval: float = 1 / rate
+        self.next_start: float = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now: float = time.monotonic()
+            start: float = max(self.next_start, now)
+            self.next_start = start + self.interval
+        time.sleep(start - now)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills catalog, landing page, content fragment (and with --base-url "
+        "sitemap and feed) caches, e.g. after a deploy or a cache restart. "
+        "Entries already cached are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--courses", type=int, default=100, help="Most popular courses warmed."
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--rate", type=float, default=20, help="Tasks started per second."
+        )
+        parser.add_argument(
+            "--base-url",
+            default=None,
+            help="URL of the site (e.g. https://example.com) - sitemaps and feeds "
+            "are cached per host.",
+        )
+
+    def handle(
+        self,
+        *args,
+        courses: int,
+        workers: int,
+        rate: float,
+        base_url: str | None,
+        **options,
+    ):
+        started: float = time.monotonic()
+        tasks: list[WarmTask] = get_warm_tasks(courses, base_url)
+        limiter = RateLimiter(rate)
+
+        def run(task: WarmTask) -> tuple[WarmResult, float]:
+            limiter.wait()
+            task_started: float = time.monotonic()
+            try:
+                return task.run(), time.monotonic() - task_started
+            finally:
+                # connections are per thread
+                connections.close_all()
+
+        # kind -> [tasks, failed, cached, filled, seconds]
+        totals: dict[str, list] = defaultdict(lambda: [0, 0, 0, 0, 0.0])
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run, task): task for task in tasks}
+            for future in as_completed(futures):
+                task: WarmTask = futures[future]
+                kind_totals: list = totals[task.kind]
+                kind_totals[0] += 1
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    kind_totals[1] += 1
+                    self.stderr.write(f"{task.kind} {task.name} failed: {e!r}")
+                    continue
+                kind_totals[2] += result.cached
+                kind_totals[3] += result.filled
+                kind_totals[4] += seconds
+
+        self.stdout.write(
+            f"{'kind':<14} {'tasks':>6} {'failed':>6} {'cached':>7} {'filled':>7} "
+            f"{'coverage':>9} {'task s':>8}"
+        )
+        for kind, (count, failed, cached, filled, seconds) in totals.items():
+            coverage: float = 1 - failed / count
+            self.stdout.write(
+                f"{kind:<14} {count:>6} {failed:>6} {cached:>7} {filled:>7} "
+                f"{coverage:>9.0%} {seconds:>8.2f}"
+            )
+        self.stdout.write(
+            f"{len(tasks)} tasks, {workers} workers, "
+            f"{time.monotonic() - started:.1f}s"
+        )
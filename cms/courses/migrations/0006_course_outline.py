@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:40
+
+from django.db import migrations
+from django.db import models
+from django.db.models import Count
+
+
+def build_outlines(apps, schema_editor):
+    Course = apps.get_model("courses", "Course")
+    Module = apps.get_model("courses", "Module")
+
+    for course in Course.objects.only("id").iterator():
+        modules = (
+            Module.objects.filter(course_id=course.id)
+            .annotate(total_contents=Count("contents"))
+            .order_by("order")
+            .values("id", "title", "order", "total_contents")
+        )
+        outline = [
+            dict(
+                id=module["id"],
+                title=module["title"],
+                order=module["order"],
+                contents=module["total_contents"],
+            )
+            for module in modules
+        ]
+        Course.objects.filter(id=course.id).update(outline=outline)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0005_product"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="outline",
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(build_outlines, migrations.RunPython.noop),
+    ]
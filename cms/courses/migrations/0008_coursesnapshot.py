@@ -0,0 +1,63 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0007_mediablob_chunkedupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField()),
+                ("outline", models.JSONField(default=list)),
+                ("contents", models.JSONField(default=dict)),
+                ("data", models.JSONField(default=dict)),
+                ("published", models.DateTimeField(auto_now_add=True)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshots",
+                        to="courses.course",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-version"],
+            },
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="published_snapshot",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="courses.coursesnapshot",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="coursesnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("course", "version"), name="unique_course_snapshot_version"
+            ),
+        ),
+    ]
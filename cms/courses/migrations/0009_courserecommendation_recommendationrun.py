@@ -0,0 +1,79 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:00
+
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0008_coursesnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecommendationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("full", models.BooleanField()),
+                ("started", models.DateTimeField(auto_now_add=True)),
+                ("finished", models.DateTimeField(blank=True, null=True)),
+                ("last_enrollment_id", models.PositiveBigIntegerField(default=0)),
+                ("courses", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-started"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CourseRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                ("common_students", models.PositiveIntegerField()),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="courses.course",
+                    ),
+                ),
+                (
+                    "recommended",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="courses.course",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["course", "rank"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="courserecommendation",
+            constraint=models.UniqueConstraint(
+                fields=("course", "rank"), name="unique_course_recommendation_rank"
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:02
+
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+from django.db.models import Count
+
+
+def build_summaries(apps, schema_editor):
+    Course = apps.get_model("courses", "Course")
+    CourseSummary = apps.get_model("courses", "CourseSummary")
+
+    courses = (
+        Course.objects.select_related("subject", "owner")
+        .annotate(total_students=Count("students"))
+        .iterator()
+    )
+    CourseSummary.objects.bulk_create(
+        (
+            CourseSummary(
+                course=course,
+                title=course.title,
+                slug=course.slug,
+                overview=course.overview,
+                subject_title=course.subject.title,
+                subject_slug=course.subject.slug,
+                # historical models do not have `get_full_name`
+                instructor_name=(
+                    f"{course.owner.first_name} {course.owner.last_name}".strip()
+                ),
+                total_modules=len(course.outline),
+                total_students=course.total_students,
+            )
+            for course in courses
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0009_courserecommendation_recommendationrun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseSummary",
+            fields=[
+                (
+                    "course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="summary",
+                        serialize=False,
+                        to="courses.course",
+                    ),
+                ),
+                ("title", models.CharField(max_length=256)),
+                ("slug", models.SlugField(max_length=256)),
+                ("overview", models.TextField()),
+                ("subject_title", models.CharField(max_length=256)),
+                ("subject_slug", models.SlugField(max_length=256)),
+                ("instructor_name", models.CharField(max_length=301)),
+                ("total_modules", models.PositiveIntegerField(default=0)),
+                ("total_students", models.PositiveIntegerField(default=0)),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
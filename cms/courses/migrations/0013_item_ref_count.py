@@ -0,0 +1,64 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:18
+
+from django.db import migrations
+from django.db import models
+from django.db.models import Count
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_references(apps, schema_editor):
+    Content = apps.get_model("courses", "Content")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+
+    for model_name in ["text", "video", "image", "file", "quiz"]:
+        model = apps.get_model("courses", model_name)
+        content_type, _ = ContentType.objects.get_or_create(
+            app_label="courses", model=model_name
+        )
+        references = (
+            Content.objects.filter(content_type=content_type, object_id=OuterRef("pk"))
+            .order_by()
+            .values("object_id")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        model.objects.update(ref_count=Coalesce(Subquery(references), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("courses", "0012_reservation_reservationitem_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="file",
+            name="ref_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="image",
+            name="ref_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="quiz",
+            name="ref_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="text",
+            name="ref_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="video",
+            name="ref_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:55
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0013_item_ref_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chunkedupload",
+            name="proof_chunk",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="mediablob",
+            name="path",
+            field=models.CharField(max_length=512, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="mediablob",
+            name="sha256",
+            field=models.CharField(db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.6 on 2026-10-19 16:01
+
+from django.db import migrations
+from django.db import models
+
+
+def set_snapshot_quizzes(apps, schema_editor):
+    # published before questions were stored - current questions are
+    # the closest known version
+    CourseSnapshot = apps.get_model("courses", "CourseSnapshot")
+    QuizQuestion = apps.get_model("courses", "QuizQuestion")
+
+    for snapshot in CourseSnapshot.objects.only("id", "contents").iterator():
+        quizzes = {
+            str(content["item"][1]): []
+            for module_contents in snapshot.contents.values()
+            for content in module_contents
+            if content["item"][0] == "quiz"
+        }
+        if not quizzes:
+            continue
+        questions = (
+            QuizQuestion.objects.filter(quiz_id__in=[int(id) for id in quizzes])
+            .order_by("order")
+            .values_list("quiz", "id", "answer", "points", "choices")
+        )
+        for quiz_id, question_id, answer, points, choices in questions:
+            quizzes[str(quiz_id)].append([question_id, answer, points, len(choices)])
+        CourseSnapshot.objects.filter(id=snapshot.id).update(quizzes=quizzes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0014_mediablob_path_unique_chunkedupload_proof_chunk"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="coursesnapshot",
+            name="quizzes",
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(set_snapshot_quizzes, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.db import models
 from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 
 from courses.fields import OrderField
 
@@ -38,12 +42,15 @@ class Course(models.Model):
         overview = "overview"
         created = "created"
         updated = "updated"
+        outline = "outline"
 
         # relations
         owner = "owner"
         subject = "subject"
         modules = "modules"
         students = "students"
+        snapshots = "snapshots"
+        published_snapshot = "published_snapshot"
 
     title = models.CharField(max_length=256)
     slug = models.SlugField(max_length=256, unique=True)
@@ -51,6 +58,10 @@ class Course(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    # denormalized list of modules (id, title, order, contents count),
+    # maintained by `courses.outline`, used to render course navigation
+    outline = models.JSONField(default=list, blank=True, editable=False)
+
     owner = models.ForeignKey(
         User, related_name="courses_created", on_delete=models.CASCADE
     )
@@ -60,6 +71,15 @@ class Course(models.Model):
     students = models.ManyToManyField(
         User, related_name="courses_joined", blank=True, null=True
     )
+    # what students see - modules and contents are drafts until published
+    published_snapshot = models.ForeignKey(
+        "CourseSnapshot",
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+    )
 
     class Meta:
         ordering = ["-created"]
@@ -67,6 +87,98 @@ class Course(models.Model):
     def __str__(self) -> str:
         return str(self.title)
 
+    @property
+    def total_contents(self) -> int:
+        return sum(module["contents"] for module in self.outline)
+
+
+class CourseSnapshot(models.Model):
+    """
+    Immutable, published version of the course with pre-rendered contents.
+    Students read only published snapshots, see `courses.publishing`.
+    """
+
+    class Keys:
+        id = "id"
+        version = "version"
+        outline = "outline"
+        contents = "contents"
+        quizzes = "quizzes"
+        data = "data"
+        published = "published"
+
+        # relations
+        course = "course"
+
+    version = models.PositiveIntegerField()
+    # same format as `Course.outline`
+    outline = models.JSONField(default=list)
+    # module id -> list of contents (id, title, rendered html)
+    contents = models.JSONField(default=dict)
+    # quiz id -> published questions [id, answer, points, number of choices],
+    # submissions are graded against them - never shown to students
+    quizzes = models.JSONField(default=dict)
+    # API representation of the course with contents
+    data = models.JSONField(default=dict)
+    published = models.DateTimeField(auto_now_add=True)
+
+    course = models.ForeignKey(
+        Course, related_name="snapshots", on_delete=models.CASCADE
+    )
+
+    class Meta:
+        ordering = ["-version"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["course", "version"], name="unique_course_snapshot_version"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.course_id} v{self.version}"
+
+    @property
+    def total_contents(self) -> int:
+        return sum(module["contents"] for module in self.outline)
+
+
+class CourseSummary(models.Model):
+    """
+    Read model of the course landing page - everything it shows in one row,
+    maintained by `courses.summary`.
+    """
+
+    class Keys:
+        title = "title"
+        slug = "slug"
+        overview = "overview"
+        subject_title = "subject_title"
+        subject_slug = "subject_slug"
+        instructor_name = "instructor_name"
+        total_modules = "total_modules"
+        total_students = "total_students"
+        updated = "updated"
+
+        # relations
+        course = "course"
+
+    course = models.OneToOneField(
+        Course, primary_key=True, related_name="summary", on_delete=models.CASCADE
+    )
+    title = models.CharField(max_length=256)
+    # not unique - summaries are refreshed after courses, slugs may be swapped
+    slug = models.SlugField(max_length=256)
+    overview = models.TextField()
+    subject_title = models.CharField(max_length=256)
+    subject_slug = models.SlugField(max_length=256)
+    instructor_name = models.CharField(max_length=301)
+    total_modules = models.PositiveIntegerField(default=0)
+    total_students = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return str(self.title)
+
 
 class Module(models.Model):
 
@@ -113,7 +225,7 @@ class Content(models.Model):
         ContentType,
         on_delete=models.CASCADE,
         limit_choices_to={
-            "model__in": ("text", "video", "image", "file"),
+            "model__in": ("text", "video", "image", "file", "quiz"),
         },
     )
     object_id = models.PositiveIntegerField()
@@ -124,17 +236,27 @@ class Content(models.Model):
 
 
 class ItemBase(models.Model):
+    """
+    Content item, may be shared by many modules (`Content` rows) - `ref_count`
+    is maintained by signals in `courses.signals`. Items no longer referenced
+    are removed by garbage collection.
+    """
+
+    RENDER_CACHE_TIMEOUT_SECONDS = 24 * 60 * 60
+
     class Keys:
         id = "id"
         title = "title"
         created = "created"
         updated = "updated"
+        ref_count = "ref_count"
 
         owner = "owner"
 
     title = models.CharField(max_length=256)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    ref_count = models.PositiveIntegerField(default=0, editable=False)
 
     owner = models.ForeignKey(
         User, related_name="%(class)s_related", on_delete=models.CASCADE
@@ -146,13 +268,26 @@ class ItemBase(models.Model):
     def __str__(self) -> str:
         return str(self.title)
 
+    def get_render_cache_key(self) -> str:
+        # saving the item changes the key, old entries just expire
+        return (
+            f"courses:item_html:{self._meta.model_name}:{self.id}"
+            f":{self.updated.timestamp()}"
+        )
+
     def render(self):
         """
         Returns given item dedicated HTML that should be displayed
         """
-        return render_to_string(
-            f"courses/content/{self._meta.model_name}.html", context=dict(item=self)
-        )
+        key: str = self.get_render_cache_key()
+        html: str | None = cache.get(key)
+        if html is None:
+            html = render_to_string(
+                f"courses/content/{self._meta.model_name}.html",
+                context=dict(item=self),
+            )
+            cache.set(key, html, self.RENDER_CACHE_TIMEOUT_SECONDS)
+        return mark_safe(html)
 
 
 class Text(ItemBase):
@@ -161,6 +296,7 @@ class Text(ItemBase):
         title = "title"
         created = "created"
         updated = "updated"
+        ref_count = "ref_count"
         owner = "owner"
 
         content = "content"
@@ -176,6 +312,7 @@ class File(ItemBase):
         title = "title"
         created = "created"
         updated = "updated"
+        ref_count = "ref_count"
         owner = "owner"
 
         file = "file"
@@ -191,6 +328,7 @@ class Image(ItemBase):
         title = "title"
         created = "created"
         updated = "updated"
+        ref_count = "ref_count"
         owner = "owner"
 
         file = "file"
@@ -205,6 +343,7 @@ class Video(ItemBase):
         title = "title"
         created = "created"
         updated = "updated"
+        ref_count = "ref_count"
         owner = "owner"
 
         url = "url"
@@ -212,7 +351,309 @@ class Video(ItemBase):
     url = models.URLField()
 
 
+class Quiz(ItemBase):
+    class Keys:
+        id = "id"
+        title = "title"
+        created = "created"
+        updated = "updated"
+        ref_count = "ref_count"
+        owner = "owner"
+
+        description = "description"
+
+        # relations
+        questions = "questions"
+        submissions = "submissions"
+
+    description = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name_plural = "quizzes"
+
+
+class QuizQuestion(models.Model):
+    """
+    Single choice question, `answer` is the index of the correct choice.
+    """
+
+    class Keys:
+        id = "id"
+        text = "text"
+        choices = "choices"
+        answer = "answer"
+        points = "points"
+        order = "order"
+
+        # relations
+        quiz = "quiz"
+
+    text = models.TextField()
+    choices = models.JSONField(default=list)
+    answer = models.PositiveSmallIntegerField()
+    points = models.PositiveSmallIntegerField(default=1)
+    order = OrderField(blank=True, for_fields=["quiz"])
+
+    quiz = models.ForeignKey(Quiz, related_name="questions", on_delete=models.CASCADE)
+
+    class Meta:
+        ordering = ["order"]
+
+    def __str__(self) -> str:
+        return f"{self.order}. {self.text}"
+
+
+class MediaBlob(models.Model):
+    """
+    Content addressed media file - identical uploads are stored only once.
+    `path` is a storage name that can be assigned to `File.file` / `Image.file`.
+    """
+
+    class Keys:
+        id = "id"
+        sha256 = "sha256"
+        path = "path"
+        size = "size"
+        created = "created"
+
+    # identical files of different kinds (e.g. image and file) are separate blobs
+    sha256 = models.CharField(max_length=64, db_index=True)
+    path = models.CharField(max_length=512, unique=True)
+    size = models.PositiveBigIntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+
+class ChunkedUpload(models.Model):
+    """
+    Resumable upload session. Received chunks are stored as separate files
+    under `MEDIA_ROOT/uploads/<id>/`, see `courses.uploads`.
+    """
+
+    UPLOAD_DIRS = {
+        "file": File.UPLOAD_DIR,
+        "image": Image.UPLOAD_DIR,
+    }
+
+    class Keys:
+        id = "id"
+        kind = "kind"
+        filename = "filename"
+        size = "size"
+        chunk_size = "chunk_size"
+        sha256 = "sha256"
+        status = "status"
+        proof_chunk = "proof_chunk"
+        created = "created"
+
+        # relations
+        owner = "owner"
+        blob = "blob"
+
+    class Kind(models.TextChoices):
+        FILE = "file"
+        IMAGE = "image"
+
+    class Status(models.TextChoices):
+        UPLOADING = "uploading"
+        COMPLETE = "complete"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    filename = models.CharField(max_length=256)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    # optional, declared by the client - allows skipping upload of known files
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.UPLOADING
+    )
+    # randomly chosen chunk the client has to send to reuse `blob`
+    proof_chunk = models.PositiveIntegerField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    owner = models.ForeignKey(
+        User, related_name="chunked_uploads", on_delete=models.CASCADE
+    )
+    blob = models.ForeignKey(
+        MediaBlob,
+        related_name="uploads",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+
+    @property
+    def total_chunks(self) -> int:
+        return max(1, -(-self.size // self.chunk_size))
+
+    def get_chunk_length(self, index: int) -> int:
+        if index == self.total_chunks - 1:
+            return self.size - index * self.chunk_size
+        return self.chunk_size
+
+
+class CourseRecommendation(models.Model):
+    """
+    "Students who took this course also took" - top co-enrolled courses
+    of the course, computed offline by `manage.py recommend_courses`.
+    """
+
+    class Keys:
+        id = "id"
+        rank = "rank"
+        score = "score"
+        common_students = "common_students"
+
+        # relations
+        course = "course"
+        recommended = "recommended"
+
+    rank = models.PositiveSmallIntegerField()
+    # cosine similarity of enrollments of both courses
+    score = models.FloatField()
+    common_students = models.PositiveIntegerField()
+
+    course = models.ForeignKey(
+        Course, related_name="recommendations", on_delete=models.CASCADE
+    )
+    recommended = models.ForeignKey(Course, related_name="+", on_delete=models.CASCADE)
+
+    class Meta:
+        ordering = ["course", "rank"]
+        constraints = [
+            # also the index used to serve recommendations of a course
+            models.UniqueConstraint(
+                fields=["course", "rank"], name="unique_course_recommendation_rank"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.course_id} -> {self.recommended_id}"
+
+
+class RecommendationRun(models.Model):
+    """
+    Computation of course recommendations. Enrollments up to
+    `last_enrollment_id` are included - the next run refreshes only courses
+    of students enrolled since then.
+    """
+
+    class Keys:
+        id = "id"
+        full = "full"
+        started = "started"
+        finished = "finished"
+        last_enrollment_id = "last_enrollment_id"
+        courses = "courses"
+
+    full = models.BooleanField()
+    started = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    last_enrollment_id = models.PositiveBigIntegerField(default=0)
+    # number of courses with refreshed recommendations
+    courses = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-started"]
+
+    def __str__(self) -> str:
+        return f"{self.started} ({'full' if self.full else 'incremental'})"
+
+
 class Product(models.Model):
+    class Keys:
+        name = "name"
+        price = "price"
+        quantity = "quantity"
+
     name = models.CharField(max_length=15, primary_key=True)
     price = models.IntegerField()
+    # available stock, reserved quantities are already subtracted
     quantity = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(quantity__gte=0), name="product_quantity_non_negative"
+            ),
+        ]
+
+
+class Reservation(models.Model):
+    """
+    Products stock held for the user until `expires`. Purchased reservations
+    keep the stock, released ones (cancelled or expired) return it,
+    see `courses.checkout`.
+    """
+
+    class Keys:
+        id = "id"
+        idempotency_key = "idempotency_key"
+        status = "status"
+        total_price = "total_price"
+        created = "created"
+        expires = "expires"
+
+        # relations
+        user = "user"
+        items = "items"
+
+    class Status(models.TextChoices):
+        RESERVED = "reserved"
+        PURCHASED = "purchased"
+        RELEASED = "released"
+
+    # retried requests with the same key return the same reservation
+    idempotency_key = models.CharField(max_length=64)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.RESERVED
+    )
+    total_price = models.IntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+    expires = models.DateTimeField()
+
+    user = models.ForeignKey(
+        User, related_name="reservations", on_delete=models.CASCADE
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "idempotency_key"],
+                name="unique_reservation_idempotency_key",
+            ),
+        ]
+        indexes = [
+            # expired reservations lookup of the sweeper
+            models.Index(
+                fields=["expires"],
+                condition=models.Q(status="reserved"),
+                name="reservation_reserved_expires",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.created} ({self.status})"
+
+
+class ReservationItem(models.Model):
+    class Keys:
+        id = "id"
+        quantity = "quantity"
+        price = "price"
+
+        # relations
+        reservation = "reservation"
+        product = "product"
+
+    quantity = models.PositiveIntegerField()
+    # unit price at the time of reservation
+    price = models.IntegerField()
+
+    reservation = models.ForeignKey(
+        Reservation, related_name="items", on_delete=models.CASCADE
+    )
+    product = models.ForeignKey(Product, related_name="+", on_delete=models.PROTECT)
@@ -0,0 +1,96 @@
+import threading
+
+from django.db import connection
+from django.db import transaction
+from django.db.models import Count
+
+from courses.dashboard import invalidate_dashboards
+from courses.models import Course
+from courses.models import Module
+from courses.summary import refresh_summaries
+
+_pending = threading.local()
+
+
+def build_outline(course_id: int) -> list[dict]:
+    """
+    Returns compact, JSON serializable list of course modules
+    with number of contents in each of them.
+    """
+    modules = (
+        Module.objects.filter(course_id=course_id)
+        .annotate(total_contents=Count(Module.Keys.contents))
+        .order_by(Module.Keys.order)
+        .values(Module.Keys.id, Module.Keys.title, Module.Keys.order, "total_contents")
+    )
+    return [
+        dict(
+            id=module[Module.Keys.id],
+            title=module[Module.Keys.title],
+            order=module[Module.Keys.order],
+            contents=module["total_contents"],
+        )
+        for module in modules
+    ]
+
+
+def refresh_outlines(course_ids: set[int]) -> None:
+    for course_id in course_ids:
+        # `update` does not touch `Course.updated` and does not send signals
+        Course.objects.filter(id=course_id).update(outline=build_outline(course_id))
+
+    # landing pages show modules count
+    refresh_summaries(course_ids)
+    # dashboards show modules and contents counts from outlines
+    invalidate_dashboards(
+        set(
+            Course.objects.filter(id__in=course_ids).values_list(
+                Course.Keys.owner, flat=True
+            )
+        )
+    )
+
+
+def _refresh_pending_outlines() -> None:
+    course_ids: set[int] = _pending.course_ids
+    module_ids: set[int] = _pending.module_ids
+    del _pending.course_ids, _pending.module_ids
+
+    if module_ids:
+        course_ids |= set(
+            Module.objects.filter(id__in=module_ids).values_list(
+                Module.Keys.course, flat=True
+            )
+        )
+    refresh_outlines(course_ids)
+
+
+def _is_refresh_scheduled() -> bool:
+    # callbacks are dropped when the transaction (or savepoint) is rolled back
+    return hasattr(_pending, "course_ids") and any(
+        func is _refresh_pending_outlines for _, func, _ in connection.run_on_commit
+    )
+
+
+def schedule_outline_refresh(
+    course_id: int | None = None, module_id: int | None = None
+) -> None:
+    """
+    Rebuilds course outline once the current transaction commits.
+    Course can be pointed by its id or by id of one of its modules.
+    Many changes of one course in a single transaction (e.g. cascade delete,
+    modules formset save) result in a single rebuild.
+    """
+    scheduled: bool = _is_refresh_scheduled()
+    if not scheduled:
+        _pending.course_ids = set()
+        _pending.module_ids = set()
+
+    if course_id is not None:
+        _pending.course_ids.add(course_id)
+    if module_id is not None:
+        _pending.module_ids.add(module_id)
+
+    if not scheduled:
+        # called immediately when not in atomic block
+        transaction.on_commit(_refresh_pending_outlines)
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from collections.abc import Iterator
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Max
+
+from courses.api.mixins import get_serializer_prefetches
+from courses.api.serializers import CourseWithContentSerializer
+from courses.dashboard import invalidate_dashboards
+from courses.events import EventType
+from courses.events import publish_event
+from courses.images import generate_derivatives
+from courses.models import Content
+from courses.models import Course
+from courses.models import CourseSnapshot
+from courses.models import File
+from courses.models import Image
+from courses.models import Quiz
+from courses.models import QuizQuestion
+
+
+def _get_snapshot_content(content: Content) -> dict:
+    snapshot_content = dict(
+        id=content.id,
+        title=content.item.title,
+        html=str(content.item.render()),
+        # items referenced by published snapshots are not garbage
+        item=[content.item._meta.model_name, content.item.id],
+    )
+    if isinstance(content.item, (File, Image)):
+        # the item may get another file, rendered html still links to this one
+        snapshot_content["file"] = content.item.file.name
+    return snapshot_content
+
+
+def build_snapshot_contents(course: Course) -> tuple[list[dict], dict[str, list]]:
+    """
+    Returns outline and pre-rendered contents of each module of the course.
+    Course has to have modules, contents and items prefetched.
+    """
+    outline, contents = [], {}
+    for module in course.modules.all():
+        module_contents = [
+            _get_snapshot_content(content)
+            for content in module.contents.all()
+            if content.item is not None
+        ]
+        outline.append(
+            dict(
+                id=module.id,
+                title=module.title,
+                order=module.order,
+                contents=len(module_contents),
+            )
+        )
+        # JSON object keys are always strings
+        contents[str(module.id)] = module_contents
+    return outline, contents
+
+
+def build_snapshot_quizzes(contents: dict[str, list]) -> dict[str, list]:
+    """
+    Returns questions of quizzes in the snapshot contents, with answers,
+    in the format of `CourseSnapshot.quizzes`.
+    """
+    quiz_ids: set[int] = {
+        content["item"][1]
+        for module_contents in contents.values()
+        for content in module_contents
+        if content["item"][0] == Quiz._meta.model_name
+    }
+    quizzes: dict[str, list] = {str(quiz_id): [] for quiz_id in quiz_ids}
+    questions = QuizQuestion.objects.filter(quiz_id__in=quiz_ids).values_list(
+        QuizQuestion.Keys.quiz,
+        QuizQuestion.Keys.id,
+        QuizQuestion.Keys.answer,
+        QuizQuestion.Keys.points,
+        QuizQuestion.Keys.choices,
+    )
+    for quiz_id, question_id, answer, points, choices in questions:
+        quizzes[str(quiz_id)].append([question_id, answer, points, len(choices)])
+    return quizzes
+
+
+def _get_image_names(course_id: int) -> set[str]:
+    image_ids = Content.objects.filter(
+        module__course_id=course_id,
+        content_type=ContentType.objects.get_for_model(Image),
+    ).values(Content.Keys.object_id)
+    return set(
+        Image.objects.filter(id__in=image_ids).values_list(Image.Keys.file, flat=True)
+    )
+
+
+def publish_course(course_id: int) -> CourseSnapshot:
+    """
+    Compiles current state of the course into a new, immutable snapshot
+    and makes it the one students see.
+    """
+    # rendered HTML of the snapshot links created image variants,
+    # not the fallback view
+    for name in _get_image_names(course_id):
+        generate_derivatives(name)
+
+    with transaction.atomic():
+        # serializes concurrent publishing of the same course
+        Course.objects.select_for_update().filter(id=course_id).values("id").get()
+        course: Course = Course.objects.prefetch_related(
+            *get_serializer_prefetches(CourseWithContentSerializer)
+        ).get(id=course_id)
+
+        outline, contents = build_snapshot_contents(course)
+        last_version: int | None = course.snapshots.aggregate(
+            Max(CourseSnapshot.Keys.version)
+        )[f"{CourseSnapshot.Keys.version}__max"]
+        snapshot = CourseSnapshot.objects.create(
+            course=course,
+            version=(last_version or 0) + 1,
+            outline=outline,
+            contents=contents,
+            quizzes=build_snapshot_quizzes(contents),
+            data=CourseWithContentSerializer(course).data,
+        )
+        # `update` does not touch `Course.updated` and does not send signals
+        Course.objects.filter(id=course_id).update(published_snapshot=snapshot)
+        transaction.on_commit(lambda: invalidate_dashboards({course.owner_id}))
+        publish_event(course_id, EventType.COURSE_PUBLISHED, version=snapshot.version)
+    return snapshot
+
+
+def _iter_published_contents() -> Iterator[dict]:
+    snapshots = CourseSnapshot.objects.filter(
+        id__in=Course.objects.values(Course.Keys.published_snapshot)
+    ).values_list(CourseSnapshot.Keys.contents, flat=True)
+    for contents in snapshots.iterator():
+        for module_contents in contents.values():
+            yield from module_contents
+
+
+def get_published_item_ids() -> dict[str, set[int]]:
+    """
+    Returns ids of items (by model name) shown by currently published snapshots.
+    """
+    item_ids: dict[str, set[int]] = defaultdict(set)
+    for content in _iter_published_contents():
+        model_name, item_id = content["item"]
+        item_ids[model_name].add(item_id)
+    return item_ids
+
+
+def get_published_files() -> dict[str, set[str]]:
+    """
+    Returns storage names of files (by model name) linked by currently published
+    snapshots - files replaced since publishing are still shown to students.
+    """
+    files: dict[str, set[str]] = defaultdict(set)
+    for content in _iter_published_contents():
+        if "file" in content:
+            files[content["item"][0]].add(content["file"])
+    return files
@@ -0,0 +1,164 @@
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from scipy import sparse
+
+from courses.dashboard import Enrollment
+from courses.models import CourseRecommendation
+from courses.models import RecommendationRun
+
+DEFAULT_TOP_K = 10
+DEFAULT_MIN_COMMON_STUDENTS = 2
+# courses scored at once, bounds memory of the co-occurrence rows
+DEFAULT_BATCH_SIZE = 1000
+ENROLLMENTS_CHUNK_SIZE = 100_000
+
+
+def load_enrollments(last_enrollment_id: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Streams (student id, course id) pairs of enrollments up to
+    `last_enrollment_id` into two arrays.
+    """
+    pairs = (
+        Enrollment.objects.filter(id__lte=last_enrollment_id)
+        .order_by()
+        .values_list("user_id", "course_id")
+        .iterator(chunk_size=ENROLLMENTS_CHUNK_SIZE)
+    )
+    flat = np.fromiter((id for pair in pairs for id in pair), dtype=np.int64).reshape(
+        -1, 2
+    )
+    return flat[:, 0], flat[:, 1]
+
+
+def get_changed_course_ids(since_enrollment_id: int, last_enrollment_id: int) -> set:
+    """
+    All courses of students enrolled since the previous run - only their
+    co-occurrence counts have changed.
+    """
+    new_enrollments = Enrollment.objects.filter(
+        id__gt=since_enrollment_id, id__lte=last_enrollment_id
+    )
+    return set(
+        Enrollment.objects.filter(
+            user_id__in=new_enrollments.values("user_id")
+        ).values_list("course_id", flat=True)
+    )
+
+
+class RecommendationEngine:
+    """
+    Scores pairs of courses by cosine similarity of their enrollments:
+    `common students / sqrt(students of A * students of B)`.
+    Co-occurrence counts are computed as a sparse matrix product of the
+    course x student enrollment matrix with its transposition, in batches of courses.
+    """
+
+    def __init__(
+        self,
+        top_k: int = DEFAULT_TOP_K,
+        min_common_students: int = DEFAULT_MIN_COMMON_STUDENTS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.top_k = top_k
+        self.min_common_students = min_common_students
+        self.batch_size = batch_size
+
+    def run(self, full: bool = False) -> RecommendationRun:
+        previous: RecommendationRun | None = (
+            RecommendationRun.objects.filter(finished__isnull=False)
+            .order_by(f"-{RecommendationRun.Keys.last_enrollment_id}")
+            .first()
+        )
+        full = full or previous is None
+        run = RecommendationRun.objects.create(
+            full=full,
+            last_enrollment_id=Enrollment.objects.aggregate(Max("id"))["id__max"] or 0,
+        )
+
+        student_ids, course_ids = load_enrollments(run.last_enrollment_id)
+        courses, course_index = np.unique(course_ids, return_inverse=True)
+        students, student_index = np.unique(student_ids, return_inverse=True)
+        # course x student, 1 for enrollment
+        enrollments = sparse.csr_matrix(
+            (
+                np.ones(len(course_index), dtype=np.float32),
+                (course_index, student_index),
+            ),
+            shape=(len(courses), len(students)),
+        )
+        students_per_course = np.asarray(enrollments.sum(axis=1)).ravel()
+
+        if full:
+            rows = np.arange(len(courses))
+        else:
+            changed = get_changed_course_ids(
+                previous.last_enrollment_id, run.last_enrollment_id
+            )
+            rows = np.flatnonzero(np.isin(courses, list(changed)))
+
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start : start + self.batch_size]
+            co_occurrences = (enrollments[batch] @ enrollments.T).tocsr()
+            self.save(courses, batch, co_occurrences, students_per_course)
+
+        if full:
+            # courses without enrollments anymore
+            CourseRecommendation.objects.exclude(
+                course_id__in=courses.tolist()
+            ).delete()
+
+        run.courses = len(rows)
+        run.finished = timezone.now()
+        run.save(
+            update_fields=[
+                RecommendationRun.Keys.courses,
+                RecommendationRun.Keys.finished,
+            ]
+        )
+        return run
+
+    def save(
+        self,
+        courses: np.ndarray,
+        batch: np.ndarray,
+        co_occurrences: sparse.csr_matrix,
+        students_per_course: np.ndarray,
+    ) -> None:
+        recommendations: list[CourseRecommendation] = []
+        for row, course in enumerate(batch):
+            start, end = co_occurrences.indptr[row], co_occurrences.indptr[row + 1]
+            neighbours = co_occurrences.indices[start:end]
+            common = co_occurrences.data[start:end]
+
+            keep = (neighbours != course) & (common >= self.min_common_students)
+            neighbours, common = neighbours[keep], common[keep]
+            scores = common / np.sqrt(
+                students_per_course[course] * students_per_course[neighbours]
+            )
+            if len(scores) > self.top_k:
+                best = np.argpartition(-scores, self.top_k)[: self.top_k]
+                neighbours, common, scores = (
+                    neighbours[best],
+                    common[best],
+                    scores[best],
+                )
+            order = np.lexsort((courses[neighbours], -scores))
+
+            recommendations.extend(
+                CourseRecommendation(
+                    course_id=int(courses[course]),
+                    recommended_id=int(courses[neighbours[i]]),
+                    rank=rank,
+                    score=float(scores[i]),
+                    common_students=int(common[i]),
+                )
+                for rank, i in enumerate(order)
+            )
+
+        with transaction.atomic():
+            CourseRecommendation.objects.filter(
+                course_id__in=courses[batch].tolist()
+            ).delete()
+            CourseRecommendation.objects.bulk_create(recommendations)
@@ -0,0 +1,222 @@
+from collections import Counter
+from collections import defaultdict
+from collections.abc import Iterable
+from functools import partial
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Model
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from courses.cache import delete_cached_subjects
+from courses.catalog import bump_catalog_version
+from courses.dashboard import invalidate_dashboards
+from courses.events import EventType
+from courses.events import publish_event
+from courses.models import Content
+from courses.models import Course
+from courses.models import File
+from courses.models import Image
+from courses.models import ItemBase
+from courses.models import Module
+from courses.models import Quiz
+from courses.models import Subject
+from courses.models import Text
+from courses.models import Video
+from courses.outline import schedule_outline_refresh
+from courses.summary import add_enrollments
+from courses.summary import refresh_summaries
+from courses.tasks import generate_image_derivatives
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance: Course, **kwargs) -> None:
+    invalidate_dashboards({instance.owner_id})
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def catalog_changed(sender, instance, **kwargs) -> None:
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def subjects_changed(sender, instance: Subject, **kwargs) -> None:
+    transaction.on_commit(delete_cached_subjects)
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance: Course, **kwargs) -> None:
+    transaction.on_commit(partial(refresh_summaries, {instance.id}))
+
+
+@receiver(post_save, sender=Subject)
+def subject_saved(sender, instance: Subject, created: bool, **kwargs) -> None:
+    if not created:
+        course_ids = set(instance.courses.values_list(Course.Keys.id, flat=True))
+        transaction.on_commit(partial(refresh_summaries, course_ids))
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def enrollments_changed(
+    sender, instance, action: str, reverse: bool, pk_set: set | None, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        invalidate_dashboards({instance.owner_id})
+        course_ids = {instance.id}
+    elif pk_set:
+        # student side of the relation - `pk_set` holds course ids
+        course_ids = pk_set
+        invalidate_dashboards(
+            set(
+                Course.objects.filter(id__in=pk_set).values_list(
+                    Course.Keys.owner, flat=True
+                )
+            )
+        )
+    else:
+        return
+
+    if action == "post_add":
+        # `pk_set` holds only the new enrollments
+        add_enrollments(course_ids, 1 if reverse else len(pk_set))
+    else:
+        # removed ids may have not been enrolled at all, students are recounted
+        transaction.on_commit(partial(refresh_summaries, course_ids))
+
+
+def _is_cascade(origin, model: type[Model]) -> bool:
+    # `origin` of `post_delete` is the deleted instance or queryset
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is not model
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def module_changed(sender, instance: Module, **kwargs) -> None:
+    schedule_outline_refresh(course_id=instance.course_id)
+
+
+@receiver(post_save, sender=Module)
+def module_saved(sender, instance: Module, created: bool, **kwargs) -> None:
+    event_type: str = EventType.MODULE_ADDED if created else EventType.MODULE_UPDATED
+    publish_event(instance.course_id, event_type, module=instance.id)
+
+
+@receiver(post_delete, sender=Module)
+def module_deleted(sender, instance: Module, origin, **kwargs) -> None:
+    if not _is_cascade(origin, Module):
+        publish_event(instance.course_id, EventType.MODULE_DELETED, module=instance.id)
+
+
+@receiver(post_save, sender=Content)
+@receiver(post_delete, sender=Content)
+def content_changed(sender, instance: Content, created: bool = True, **kwargs):
+    # content counts change only when content is added or removed
+    if created:
+        schedule_outline_refresh(module_id=instance.module_id)
+
+
+def _count_references(items: Iterable[tuple[int, int]], delta: int) -> None:
+    """
+    Changes `ref_count` by `delta` for each reference of `items` (pairs of
+    content type id and item id) - an UPDATE per content type and number
+    of references instead of one per reference.
+    """
+    ids: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for (content_type_id, object_id), references in Counter(items).items():
+        ids[(content_type_id, references)].append(object_id)
+    for (content_type_id, references), object_ids in ids.items():
+        model: type[ItemBase] = ContentType.objects.get_for_id(
+            content_type_id
+        ).model_class()
+        change: int = delta * references
+        items = model.objects.filter(id__in=object_ids)
+        if change < 0:
+            items = items.filter(ref_count__gte=-change)
+        # `update` keeps `updated` (and rendered HTML cached by it)
+        items.update(ref_count=F(ItemBase.Keys.ref_count) + change)
+
+
+def _release_references(contents: QuerySet[Content]) -> None:
+    _count_references(
+        contents.values_list(f"{Content.Keys.content_type}_id", Content.Keys.object_id),
+        -1,
+    )
+
+
+# Contents deleted by cascade are released at once before they are deleted,
+# `content_deleted` handles only contents deleted directly.
+@receiver(pre_delete, sender=Course)
+def course_deleting(sender, instance: Course, **kwargs) -> None:
+    _release_references(Content.objects.filter(module__course=instance))
+
+
+@receiver(pre_delete, sender=Module)
+def module_deleting(sender, instance: Module, origin, **kwargs) -> None:
+    # modules deleted with their course are covered by `course_deleting`
+    if not _is_cascade(origin, Module):
+        _release_references(Content.objects.filter(module=instance))
+
+
+@receiver(post_save, sender=Content)
+def content_saved(sender, instance: Content, created: bool, **kwargs) -> None:
+    if created:
+        _count_references([(instance.content_type_id, instance.object_id)], 1)
+        publish_event(
+            instance.module.course_id,
+            EventType.CONTENT_ADDED,
+            module=instance.module_id,
+            content=instance.id,
+        )
+
+
+@receiver(post_delete, sender=Content)
+def content_deleted(sender, instance: Content, origin, **kwargs) -> None:
+    # contents of deleted modules are covered by `module_deleting`
+    # and `module_deleted`
+    if not _is_cascade(origin, Content):
+        _count_references([(instance.content_type_id, instance.object_id)], -1)
+        publish_event(
+            instance.module.course_id,
+            EventType.CONTENT_DELETED,
+            module=instance.module_id,
+            content=instance.id,
+        )
+
+
+@receiver(post_save, sender=Text)
+@receiver(post_save, sender=File)
+@receiver(post_save, sender=Image)
+@receiver(post_save, sender=Video)
+@receiver(post_save, sender=Quiz)
+def item_saved(sender, instance, created: bool, **kwargs) -> None:
+    if created:
+        return
+    contents = Content.objects.filter(
+        content_type=ContentType.objects.get_for_model(sender), object_id=instance.id
+    ).values_list(Content.Keys.id, Content.Keys.module, "module__course")
+    for content_id, module_id, course_id in contents:
+        publish_event(
+            course_id, EventType.ITEM_UPDATED, module=module_id, content=content_id
+        )
+
+
+@receiver(post_save, sender=Image)
+def image_saved(sender, instance: Image, **kwargs) -> None:
+    if instance.file:
+        # enqueued in the same transaction, resized by background workers
+        generate_image_derivatives.enqueue(instance.file.name, unique=True)
@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models import F
+
+from courses.models import Course
+from courses.models import CourseSummary
+
+LANDING_PAGE_CACHE_KEY = "courses:landing_page:{slug}"
+# enrollment counts of cached pages may be that much behind
+LANDING_PAGE_CACHE_TIMEOUT_SECONDS = 60
+
+
+def get_landing_page_cache_key(slug: str) -> str:
+    return LANDING_PAGE_CACHE_KEY.format(slug=slug)
+
+
+def refresh_summaries(course_ids: set[int]) -> None:
+    """
+    Rebuilds summaries of the courses and drops their cached landing pages.
+    """
+    # pages of changed slugs are dropped too
+    slugs: set[str] = set(
+        CourseSummary.objects.filter(course_id__in=course_ids).values_list(
+            CourseSummary.Keys.slug, flat=True
+        )
+    )
+    courses = (
+        Course.objects.filter(id__in=course_ids)
+        .select_related(Course.Keys.subject, Course.Keys.owner)
+        .annotate(total_students=Count(Course.Keys.students))
+    )
+    summaries = [
+        CourseSummary(
+            course=course,
+            title=course.title,
+            slug=course.slug,
+            overview=course.overview,
+            subject_title=course.subject.title,
+            subject_slug=course.subject.slug,
+            instructor_name=course.owner.get_full_name(),
+            total_modules=len(course.outline),
+            total_students=course.total_students,
+        )
+        for course in courses
+    ]
+    CourseSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=[CourseSummary.Keys.course],
+        update_fields=[
+            CourseSummary.Keys.title,
+            CourseSummary.Keys.slug,
+            CourseSummary.Keys.overview,
+            CourseSummary.Keys.subject_title,
+            CourseSummary.Keys.subject_slug,
+            CourseSummary.Keys.instructor_name,
+            CourseSummary.Keys.total_modules,
+            CourseSummary.Keys.total_students,
+            CourseSummary.Keys.updated,
+        ],
+    )
+    slugs.update(summary.slug for summary in summaries)
+    cache.delete_many([get_landing_page_cache_key(slug) for slug in slugs])
+
+
+def add_enrollments(course_ids: set[int], count: int) -> None:
+    """
+    Counts new students of the courses without recounting all enrollments.
+    """
+    if count:
+        CourseSummary.objects.filter(course_id__in=course_ids).update(
+            total_students=F(CourseSummary.Keys.total_students) + count
+        )
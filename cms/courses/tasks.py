@@ -0,0 +1,23 @@
+from courses.checkout import get_next_expiry
+from courses.checkout import release_expired
+from courses.garbage import GarbageCollector
+from courses.images import generate_derivatives
+from jobs.queue import task
+
+
+@task(priority=10)
+def generate_image_derivatives(name: str) -> None:
+    generate_derivatives(name)
+
+
+@task(priority=-10)
+def collect_garbage() -> None:
+    GarbageCollector().collect()
+
+
+@task(priority=5)
+def release_expired_reservations() -> None:
+    release_expired()
+    # the queued job may have been scheduled for earlier reservations
+    if (next_expiry := get_next_expiry()) is not None:
+        release_expired_reservations.enqueue(run_after=next_expiry, unique=True)
@@ -1,4 +1,11 @@
 from django import template
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from courses.images import derivative_exists
+from courses.images import get_derivative_name
+from courses.models import Image
 
 register = template.Library()
 
@@ -9,3 +16,19 @@ def model_name(obj):
         return obj._meta.model_name
     except AttributeError:
         return None
+
+
+@register.simple_tag
+def image_srcset(image: Image) -> str:
+    """
+    Returns `srcset` of resized image variants. Variants not created yet point at
+    the view which creates them on first request.
+    """
+    candidates = []
+    for width in settings.IMAGE_DERIVATIVE_WIDTHS:
+        if derivative_exists(image.file.name, width):
+            url = default_storage.url(get_derivative_name(image.file.name, width))
+        else:
+            url = reverse("image_derivative", args=[image.id, width])
+        candidates.append(f"{url} {width}w")
+    return ", ".join(candidates)
@@ -1,3 +1,755 @@
+import hashlib
+import os
+import tempfile
+import warnings
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.db import connection
 from django.test import TestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image as PILImage
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.exceptions import Throttled
+from rest_framework.test import APIClient
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+from students.models import QuizSubmission
+
+from common.cache import local_cache
+from courses.api.authentication import CachedBasicAuthentication
+from courses.api.mixins import LazyLoadError
+from courses.api.serializers import CourseSerializer
+from courses.api.throttling import TokenBucketThrottle
+from courses.api.views import CourseViewSet
+from courses.cache import SUBJECTS_KEY
+from courses.checkout import OutOfStock
+from courses.checkout import purchase
+from courses.checkout import release
+from courses.checkout import release_expired
+from courses.checkout import reserve
+from courses.cloning import clone_course
+from courses.cloning import get_clone_slug
+from courses.dashboard import get_dashboard_page_cache_key
+from courses.garbage import GarbageCollector
+from courses.images import generate_derivatives
+from courses.images import get_derivative_name
+from courses.models import ChunkedUpload
+from courses.models import Content
+from courses.models import Course
+from courses.models import CourseSummary
+from courses.models import File
+from courses.models import Image
+from courses.models import MediaBlob
+from courses.models import Module
+from courses.models import Product
+from courses.models import Quiz
+from courses.models import QuizQuestion
+from courses.models import Reservation
+from courses.models import Subject
+from courses.models import Text
+from courses.publishing import publish_course
+from courses.uploads import get_upload_dir
+
+User = get_user_model()
+
+
+@override_settings(API_ASSERT_NO_LAZY_LOADS=True)
+class CourseViewSetQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user("owner")
+        students = [User.objects.create_user(f"student-{i}") for i in range(3)]
+        subject = Subject.objects.create(title="Math", slug="math")
+        for i in range(5):
+            course = Course.objects.create(
+                owner=owner, subject=subject, title=f"Course {i}", slug=f"course-{i}"
+            )
+            course.students.add(*students)
+            for order in range(3):
+                Module.objects.create(course=course, title=f"Module {order}")
+        cls.course = course
+
+    def test_list(self):
+        view = CourseViewSet.as_view({"get": "list"})
+        request = APIRequestFactory().get(reverse("api:course-list"))
+        # count, courses and modules - independent of number of courses
+        with self.assertNumQueries(3):
+            response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(len(response.data["results"][0]["modules"]), 3)
+
+    def test_retrieve(self):
+        view = CourseViewSet.as_view({"get": "retrieve"})
+        request = APIRequestFactory().get(
+            reverse("api:course-detail", args=[self.course.id])
+        )
+        with self.assertNumQueries(2):
+            response = view(request, pk=self.course.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["modules"]), 3)
+        self.assertNotIn("students", response.data)
+
+    def test_enroll(self):
+        view = CourseViewSet.as_view({"post": "enroll"}, **CourseViewSet.enroll.kwargs)
+        request = APIRequestFactory().post(
+            reverse("api:course-enroll", args=[self.course.id])
+        )
+        student = User.objects.create_user("student")
+        force_authenticate(request, user=student)
+        with CaptureQueriesContext(connection) as queries:
+            response = view(request, pk=self.course.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.course.students.filter(id=student.id).exists())
+        # modules are not prefetched for the lookup of the course
+        self.assertFalse(
+            [
+                query["sql"]
+                for query in queries.captured_queries
+                if Module._meta.db_table in query["sql"]
+            ]
+        )
+
+    def test_lazy_load(self):
+        # serializing without prefetches would query modules of each course
+        serializer = CourseSerializer(list(Course.objects.all()), many=True)
+        with self.assertRaises(LazyLoadError):
+            CourseViewSet().serialize(serializer)
+
+
+class CheckoutTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("buyer")
+        Product.objects.bulk_create(
+            [
+                Product(name="book", price=10, quantity=5),
+                Product(name="pen", price=2, quantity=1),
+            ]
+        )
+
+    def get_stock(self) -> dict[str, int]:
+        return dict(
+            Product.objects.values_list(Product.Keys.name, Product.Keys.quantity)
+        )
+
+    def test_reserve(self):
+        reservation, created = reserve(self.user, {"book": 2, "pen": 1}, "key-1")
+        self.assertTrue(created)
+        self.assertEqual(reservation.total_price, 22)
+        self.assertEqual(self.get_stock(), {"book": 3, "pen": 0})
+
+        # retried request returns the same reservation
+        retried, created = reserve(self.user, {"book": 2, "pen": 1}, "key-1")
+        self.assertFalse(created)
+        self.assertEqual(retried.id, reservation.id)
+        self.assertEqual(self.get_stock(), {"book": 3, "pen": 0})
+
+    def test_reserve_out_of_stock(self):
+        with self.assertRaises(OutOfStock) as raised:
+            reserve(self.user, {"book": 2, "pen": 2}, "key-1")
+        self.assertEqual(raised.exception.products, {"pen": 1})
+        # stock of all products is untouched
+        self.assertEqual(self.get_stock(), {"book": 5, "pen": 1})
+        self.assertFalse(Reservation.objects.exists())
+
+        with self.assertRaises(OutOfStock) as raised:
+            reserve(self.user, {"book": 1, "ink": 1}, "key-2")
+        self.assertEqual(raised.exception.products, {"ink": 0})
+
+    def test_purchase_and_release(self):
+        purchased, _ = reserve(self.user, {"book": 1}, "key-1")
+        released, _ = reserve(self.user, {"book": 2, "pen": 1}, "key-2")
+        self.assertTrue(purchase(purchased))
+        self.assertTrue(purchase(purchased))
+
+        self.assertEqual(release(Reservation.objects.all()), 1)
+        self.assertEqual(self.get_stock(), {"book": 4, "pen": 1})
+        self.assertFalse(purchase(released))
+
+    def test_release_expired(self):
+        expired, _ = reserve(self.user, {"book": 2}, "key-1")
+        reserve(self.user, {"pen": 1}, "key-2")
+        Reservation.objects.filter(id=expired.id).update(
+            expires=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(release_expired(), 1)
+        self.assertEqual(self.get_stock(), {"book": 5, "pen": 0})
+        self.assertFalse(purchase(expired))
+
+
+class GarbageCollectorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner")
+        subject = Subject.objects.create(title="Math", slug="math")
+        course = Course.objects.create(
+            owner=cls.owner, subject=subject, title="Course", slug="course"
+        )
+        cls.module = Module.objects.create(course=course, title="Module")
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = Path(media_root.name)
+        settings = override_settings(MEDIA_ROOT=media_root.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def collect(self, grace: timedelta = timedelta(0)):
+        return GarbageCollector(grace=grace).collect()
+
+    def create_file(self, name: str, age: timedelta = timedelta(hours=1)) -> Path:
+        path: Path = self.media_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"data")
+        modified: float = (timezone.now() - age).timestamp()
+        os.utime(path, (modified, modified))
+        return path
+
+    def test_items(self):
+        used = Text.objects.create(owner=self.owner, title="used", content="a")
+        Content.objects.create(module=self.module, item=used)
+        Text.objects.create(owner=self.owner, title="orphan", content="b")
+
+        report = self.collect()
+        self.assertEqual(report.items["text"], 1)
+        self.assertQuerySetEqual(Text.objects.all(), [used])
+
+    def test_quiz_with_submissions(self):
+        graded = Quiz.objects.create(owner=self.owner, title="graded")
+        QuizSubmission.objects.create(quiz=graded, student=self.owner, score=1)
+        Quiz.objects.create(owner=self.owner, title="orphan")
+
+        report = self.collect()
+        self.assertEqual(report.items["quiz"], 1)
+        self.assertQuerySetEqual(Quiz.objects.all(), [graded])
+        self.assertEqual(QuizSubmission.objects.get().score, 1)
+
+    def test_uploads(self):
+        upload = ChunkedUpload.objects.create(
+            owner=self.owner, kind="file", filename="a.txt", size=4, chunk_size=4
+        )
+        chunk: Path = self.create_file(f"uploads/{upload.id}/0")
+        orphan_chunk: Path = self.create_file("uploads/unknown/0")
+        self.collect()
+        self.assertTrue(chunk.exists())
+        self.assertFalse(orphan_chunk.exists())
+
+        ChunkedUpload.objects.update(created=timezone.now() - timedelta(days=2))
+        report = self.collect()
+        self.assertEqual(report.uploads, 1)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertFalse(get_upload_dir(upload).exists())
+
+    def test_blobs_and_files(self):
+        blobs: dict[str, MediaBlob] = {
+            name: MediaBlob.objects.create(
+                sha256=name * 64, path=f"files/{name}.txt", size=4
+            )
+            for name in "abc"
+        }
+        MediaBlob.objects.update(created=timezone.now() - timedelta(hours=1))
+        for blob in blobs.values():
+            self.create_file(blob.path)
+        item = File.objects.create(owner=self.owner, title="a", file=blobs["a"].path)
+        Content.objects.create(module=self.module, item=item)
+        # blob of an upload session may still be added to a module
+        ChunkedUpload.objects.create(
+            owner=self.owner,
+            kind="file",
+            filename="b.txt",
+            size=4,
+            chunk_size=4,
+            blob=blobs["b"],
+        )
+        unknown: Path = self.create_file("files/unknown.txt")
+        recent: Path = self.create_file("files/recent.txt", age=timedelta(0))
+
+        report = self.collect(grace=timedelta(minutes=30))
+        self.assertEqual(report.blobs, 1)
+        self.assertEqual(
+            set(MediaBlob.objects.values_list(MediaBlob.Keys.path, flat=True)),
+            {"files/a.txt", "files/b.txt"},
+        )
+        self.assertEqual(
+            {path.name for path in (self.media_root / "files").iterdir()},
+            {"a.txt", "b.txt", recent.name},
+        )
+        self.assertFalse(unknown.exists())
+
+
+@override_settings(CHUNKED_UPLOAD_CHUNK_SIZE=4)
+class ChunkedUploadTest(TestCase):
+    DATA = b"0123456789"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("instructor")
+        cls.instructor.user_permissions.add(
+            Permission.objects.get(codename="add_content")
+        )
+        subject = Subject.objects.create(title="Math", slug="math")
+        course = Course.objects.create(
+            owner=cls.instructor, subject=subject, title="Course", slug="course"
+        )
+        cls.module = Module.objects.create(course=course, title="Module")
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = Path(media_root.name)
+        settings = override_settings(MEDIA_ROOT=media_root.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.instructor)
+
+    def start(self, kind: str = "file", sha256: str = "") -> dict:
+        response = self.client.post(
+            reverse("api:upload-list"),
+            dict(kind=kind, filename="notes.txt", size=len(self.DATA), sha256=sha256),
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def get_chunk(self, index: int) -> bytes:
+        return self.DATA[index * 4 : (index + 1) * 4]
+
+    def send(self, upload: dict, index: int, data: bytes | None = None) -> None:
+        if data is None:
+            data = self.get_chunk(index)
+        response = self.client.put(
+            reverse("api:upload-chunk", args=[upload["id"], index]),
+            data,
+            content_type="application/octet-stream",
+        )
+        self.assertEqual(response.status_code, 204)
+
+    def get(self, upload: dict) -> dict:
+        return self.client.get(reverse("api:upload-detail", args=[upload["id"]])).data
+
+    def complete(self, upload: dict) -> dict:
+        response = self.client.post(
+            reverse("api:upload-complete", args=[upload["id"]]),
+            dict(module=self.module.id, title="Notes"),
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def store_blob(self, upload_dir: str) -> MediaBlob:
+        sha256: str = hashlib.sha256(self.DATA).hexdigest()
+        path = f"{upload_dir}/{sha256}.txt"
+        (self.media_root / upload_dir).mkdir()
+        (self.media_root / path).write_bytes(self.DATA)
+        return MediaBlob.objects.create(sha256=sha256, path=path, size=len(self.DATA))
+
+    def test_upload_and_resume(self):
+        upload: dict = self.start()
+        self.assertEqual(upload["total_chunks"], 3)
+        self.assertIsNone(upload["proof_chunk"])
+        self.send(upload, 2)
+        self.send(upload, 0)
+        self.assertEqual(self.get(upload)["received_chunks"], [0, 2])
+
+        self.send(upload, 1)
+        data: dict = self.complete(upload)
+        item: File = File.objects.get(id=data["item"])
+        self.assertEqual((self.media_root / item.file.name).read_bytes(), self.DATA)
+        self.assertEqual(
+            MediaBlob.objects.get().sha256, hashlib.sha256(self.DATA).hexdigest()
+        )
+        self.assertTrue(Content.objects.filter(id=data["content"]).exists())
+
+    def test_missing_chunks(self):
+        upload: dict = self.start()
+        self.send(upload, 0)
+        response = self.client.post(
+            reverse("api:upload-complete", args=[upload["id"]]),
+            dict(module=self.module.id, title="Notes"),
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_dedup(self):
+        blob: MediaBlob = self.store_blob(File.UPLOAD_DIR)
+
+        # checksum alone is not enough
+        upload: dict = self.start(sha256=blob.sha256)
+        index: int = upload["proof_chunk"]
+        self.send(upload, index, bytes(len(self.get_chunk(index))))
+        self.assertEqual(self.get(upload)["status"], ChunkedUpload.Status.UPLOADING)
+
+        upload = self.start(sha256=blob.sha256)
+        self.send(upload, upload["proof_chunk"])
+        self.assertEqual(self.get(upload)["status"], ChunkedUpload.Status.COMPLETE)
+        data: dict = self.complete(upload)
+        self.assertEqual(File.objects.get(id=data["item"]).file.name, blob.path)
+        self.assertEqual(MediaBlob.objects.count(), 1)
+
+    def test_dedup_of_other_kind(self):
+        blob: MediaBlob = self.store_blob(Image.UPLOAD_DIR)
+        upload: dict = self.start(sha256=blob.sha256)
+        self.assertIsNone(upload["proof_chunk"])
+
+        for index in range(upload["total_chunks"]):
+            self.send(upload, index)
+        data: dict = self.complete(upload)
+        # same contents, separate blob of files
+        name: str = File.objects.get(id=data["item"]).file.name
+        self.assertTrue(name.startswith(f"{File.UPLOAD_DIR}/"))
+        self.assertEqual(MediaBlob.objects.count(), 2)
+
+
+class ImageDerivativesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner")
+        subject = Subject.objects.create(title="Math", slug="math")
+        cls.course = Course.objects.create(
+            owner=cls.owner, subject=subject, title="Course", slug="course"
+        )
+        cls.module = Module.objects.create(course=cls.course, title="Module")
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings = override_settings(MEDIA_ROOT=media_root.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        (Path(media_root.name) / Image.UPLOAD_DIR).mkdir()
+        PILImage.new("RGB", (2000, 1000)).save(
+            Path(media_root.name) / Image.UPLOAD_DIR / "photo.png"
+        )
+        self.image = Image.objects.create(
+            owner=self.owner, title="Photo", file=f"{Image.UPLOAD_DIR}/photo.png"
+        )
+        Content.objects.create(module=self.module, item=self.image)
+        self.fallback_url: str = reverse("image_derivative", args=[self.image.id, 640])
+
+    def test_derivative_name(self):
+        self.assertNotEqual(
+            get_derivative_name("images/photo.jpg", 640),
+            get_derivative_name("images/photo.png", 640),
+        )
+
+    def test_render_cache(self):
+        self.assertIn(self.fallback_url, self.image.render())
+
+        generate_derivatives(self.image.file.name)
+        self.image.refresh_from_db()
+        html: str = self.image.render()
+        self.assertNotIn(self.fallback_url, html)
+        self.assertIn(get_derivative_name(self.image.file.name, 640), html)
+
+    def test_publish(self):
+        snapshot = publish_course(self.course.id)
+        html: str = snapshot.contents[str(self.module.id)][0]["html"]
+        self.assertNotIn(self.fallback_url, html)
+        self.assertIn(get_derivative_name(self.image.file.name, 640), html)
+
+
+@mock.patch.object(
+    TokenBucketThrottle,
+    "THROTTLE_RATES",
+    {"authentication": "2/min", "authentication_ip": "5/min"},
+)
+class AuthenticationThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+
+    def authenticate(self, username: str) -> None:
+        with self.assertRaises(AuthenticationFailed):
+            CachedBasicAuthentication().authenticate_credentials(
+                username, "wrong", self.request
+            )
+
+    def test_per_username(self):
+        for _ in range(2):
+            self.authenticate("student")
+        with self.assertRaises(Throttled):
+            CachedBasicAuthentication().authenticate_credentials(
+                "student", "wrong", self.request
+            )
+        # other students behind the same IP
+        self.authenticate("other student")
+
+    @override_settings(API_THROTTLING_ENABLED=False)
+    def test_disabled(self):
+        for _ in range(3):
+            self.authenticate("student")
+
+    def test_per_ip(self):
+        for i in range(5):
+            self.authenticate(f"student-{i}")
+        with self.assertRaises(Throttled):
+            CachedBasicAuthentication().authenticate_credentials(
+                "student-5", "wrong", self.request
+            )
+
+
+class CourseSummaryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", first_name="Ada")
+        cls.subject = Subject.objects.create(title="Math", slug="math")
+
+    def create_course(self, slug: str) -> Course:
+        with self.captureOnCommitCallbacks(execute=True):
+            course = Course.objects.create(
+                owner=self.owner, subject=self.subject, title=slug, slug=slug
+            )
+        return course
+
+    def test_refresh(self):
+        course: Course = self.create_course("algebra")
+        with self.captureOnCommitCallbacks(execute=True):
+            Module.objects.create(course=course, title="Basics")
+        summary: CourseSummary = CourseSummary.objects.get(course=course)
+        self.assertEqual(summary.slug, "algebra")
+        self.assertEqual(summary.subject_title, "Math")
+        self.assertEqual(summary.instructor_name, "Ada")
+        self.assertEqual(summary.total_modules, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subject.title = "Mathematics"
+            self.subject.save()
+        summary.refresh_from_db()
+        self.assertEqual(summary.subject_title, "Mathematics")
+
+    def test_enrollments(self):
+        course: Course = self.create_course("algebra")
+        students = [User.objects.create_user(f"student-{i}") for i in range(3)]
+        course.students.add(*students[:2])
+        students[2].courses_joined.add(course)
+        self.assertEqual(CourseSummary.objects.get(course=course).total_students, 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            course.students.remove(students[0], User.objects.create_user("other"))
+        self.assertEqual(CourseSummary.objects.get(course=course).total_students, 2)
+
+    def test_landing_page(self):
+        algebra: Course = self.create_course("algebra")
+        geometry: Course = self.create_course("geometry")
+        # summary not refreshed yet after the slug of the course changed
+        CourseSummary.objects.filter(course=geometry).update(slug="algebra")
+
+        response = self.client.get(reverse("course_detail", args=["algebra"]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["object"].course_id, algebra.id)
+
+
+class CourseCloneTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner")
+        subject = Subject.objects.create(title="Math", slug="math")
+        cls.course = Course.objects.create(
+            owner=cls.owner, subject=subject, title="Algebra", slug="algebra"
+        )
+        first = Module.objects.create(course=cls.course, title="Basics", order=0)
+        second = Module.objects.create(course=cls.course, title="Advanced", order=1)
+        cls.text = Text.objects.create(owner=cls.owner, title="Intro", content="a")
+        cls.quiz = Quiz.objects.create(owner=cls.owner, title="Quiz")
+        # the text is shared by both modules
+        for module, item in [(first, cls.text), (first, cls.quiz), (second, cls.text)]:
+            Content.objects.create(module=module, item=item)
+        QuizQuestion.objects.create(
+            quiz=cls.quiz, text="2 + 2", choices=["3", "4"], answer=1, points=2
+        )
+
+    def test_clone(self):
+        clone: Course = clone_course(self.course, self.owner, "Algebra (copy)")
+        self.assertEqual(clone.slug, "algebra-copy")
+        self.assertEqual(
+            list(clone.modules.order_by("order").values_list("title", flat=True)),
+            ["Basics", "Advanced"],
+        )
+
+        [text] = Text.objects.exclude(id=self.text.id)
+        self.assertEqual((text.content, text.ref_count), ("a", 2))
+        self.assertEqual(
+            Content.objects.filter(
+                module__course=clone,
+                content_type=ContentType.objects.get_for_model(Text),
+                object_id=text.id,
+            ).count(),
+            2,
+        )
+        [quiz] = Quiz.objects.exclude(id=self.quiz.id)
+        self.assertEqual(quiz.ref_count, 1)
+        self.assertEqual(
+            list(quiz.questions.values_list("text", "choices", "answer", "points")),
+            [("2 + 2", ["3", "4"], 1, 2)],
+        )
+        # originals are not changed
+        self.text.refresh_from_db()
+        self.assertEqual(self.text.ref_count, 2)
+        self.assertEqual(self.quiz.questions.count(), 1)
+
+    def test_clone_slug(self):
+        self.assertEqual(get_clone_slug("algebra"), "algebra-copy")
+        Course.objects.create(
+            owner=self.owner, subject=self.course.subject, slug="algebra-copy"
+        )
+        Course.objects.create(
+            owner=self.owner, subject=self.course.subject, slug="algebra-copy-2"
+        )
+        self.assertEqual(get_clone_slug("algebra"), "algebra-copy-3")
+
+        slug: str = get_clone_slug("a" * 256)
+        self.assertEqual(slug, "a" * 251 + "-copy")
+
+    def test_taken_clone_slug(self):
+        Course.objects.create(
+            owner=self.owner, subject=self.course.subject, slug="algebra-copy"
+        )
+        # a concurrent clone created the row after the lookup
+        with mock.patch(
+            "courses.cloning.get_clone_slug",
+            side_effect=["algebra-copy", "algebra-copy-2"],
+        ):
+            clone: Course = clone_course(self.course, self.owner, "Algebra (copy)")
+        self.assertEqual(clone.slug, "algebra-copy-2")
+
+
+class CatalogCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.subject = Subject.objects.create(title="Math", slug="m" * 256)
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(ALLOWED_HOSTS=["*"])
+    def test_long_output_key(self):
+        url: str = reverse("subject_feed_json", args=[self.subject.slug])
+        host: str = "h" * 200 + ".example.com"
+        with warnings.catch_warnings():
+            # memcached rejects keys over 250 characters
+            warnings.simplefilter("error", CacheKeyWarning)
+            first = self.client.get(url, HTTP_HOST=host)
+            first_content: bytes = first.getvalue()
+            # the subject only, courses are read from the cache
+            with self.assertNumQueries(1):
+                second = self.client.get(url, HTTP_HOST=host)
+                self.assertEqual(second.getvalue(), first_content)
+        self.assertIn(host.encode(), first_content)
+
+
+class CourseListViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user("owner")
+        cls.subject = Subject.objects.create(title="Math", slug="math")
+        Course.objects.create(
+            owner=owner, subject=cls.subject, title="Algebra", slug="algebra"
+        )
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_cached_lists(self):
+        url: str = reverse("course_list_subject", args=[self.subject.slug])
+        self.assertContains(self.client.get(url), "Algebra")
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(url), "Algebra")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Subject.objects.create(title="Physics", slug="physics")
+        self.assertIsNone(cache.get(SUBJECTS_KEY))
+        self.assertContains(self.client.get(reverse("course_list")), "Physics")
+
+
+class ContentReferencesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner")
+        subject = Subject.objects.create(title="Math", slug="math")
+        cls.course = Course.objects.create(
+            owner=cls.owner, subject=subject, title="Algebra", slug="algebra"
+        )
+        cls.other_module = Module.objects.create(course=cls.course, title="Other")
+
+    def create_module(self, texts: int) -> tuple[Module, list[Text]]:
+        module = Module.objects.create(course=self.course, title="Basics")
+        items = [
+            Text.objects.create(owner=self.owner, title=f"Text {i}", content="a")
+            for i in range(texts)
+        ]
+        for item in items:
+            Content.objects.create(module=module, item=item)
+        return module, items
+
+    def get_ref_counts(self, items: list[Text]) -> list[int]:
+        return [Text.objects.get(id=item.id).ref_count for item in items]
+
+    def test_module_deleted(self):
+        module, items = self.create_module(texts=3)
+        # shared by another module and twice by the deleted one
+        Content.objects.create(module=self.other_module, item=items[0])
+        Content.objects.create(module=module, item=items[1])
+        self.assertEqual(self.get_ref_counts(items), [2, 2, 1])
+
+        with CaptureQueriesContext(connection) as queries:
+            module.delete()
+        updates: list[str] = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('UPDATE "courses_text"')
+        ]
+        # by number of references, not per deleted content
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.get_ref_counts(items), [1, 0, 0])
+
+    def test_course_deleted(self):
+        _, items = self.create_module(texts=2)
+        Content.objects.create(module=self.other_module, item=items[0])
+        self.course.delete()
+        self.assertEqual(self.get_ref_counts(items), [0, 0])
+
+    def test_content_deleted(self):
+        module, [item] = self.create_module(texts=1)
+        module.contents.get().delete()
+        self.assertEqual(self.get_ref_counts([item]), [0])
+
+
+class ManageCourseListViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner")
+        cls.owner.user_permissions.add(Permission.objects.get(codename="view_course"))
+        subject = Subject.objects.create(title="Math", slug="math")
+        course = Course.objects.create(
+            owner=cls.owner, subject=subject, title="Algebra", slug="algebra"
+        )
+        course.students.add(
+            User.objects.create_user("ada", first_name="Ada", last_name="Lovelace"),
+            User.objects.create_user("student", password="secret"),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def test_latest_enrollments(self):
+        response = self.client.get(reverse("manage_course_list"))
+        self.assertContains(response, "Ada Lovelace")
 
-# Create your tests here.
+        [course] = cache.get(get_dashboard_page_cache_key(self.owner.id, 1))[1]
+        # users (with password hashes) are not cached
+        self.assertEqual(course.latest_students, ["student", "Ada Lovelace"])
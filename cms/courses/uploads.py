@@ -0,0 +1,246 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image as PILImage
+
+from courses.models import ChunkedUpload
+from courses.models import File
+from courses.models import Image
+from courses.models import MediaBlob
+
+User = get_user_model()
+
+UPLOADS_DIR = "uploads"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def get_upload_dir(upload: ChunkedUpload) -> Path:
+    return Path(settings.MEDIA_ROOT) / UPLOADS_DIR / str(upload.id)
+
+
+def get_blob_name(upload_dir: str, filename: str, sha256: str) -> str:
+    """
+    Deterministic, content addressed storage name of the uploaded file.
+    """
+    extension: str = Path(filename).suffix.lower()
+    return f"{upload_dir}/{sha256[:2]}/{sha256}{extension}"
+
+
+def find_blob(sha256: str, upload_dir: str) -> MediaBlob | None:
+    """
+    Returns stored file of given contents and kind (`upload_dir`).
+    """
+    return MediaBlob.objects.filter(
+        sha256=sha256, path__startswith=f"{upload_dir}/"
+    ).first()
+
+
+def get_received_chunks(upload: ChunkedUpload) -> list[int]:
+    upload_dir: Path = get_upload_dir(upload)
+    if not upload_dir.is_dir():
+        return []
+    return sorted(int(path.stem) for path in upload_dir.glob("*.part"))
+
+
+def write_chunk(upload: ChunkedUpload, index: int, stream: BinaryIO) -> None:
+    """
+    Streams request body into chunk file. Chunk is written to a temporary file
+    and renamed, so only complete chunks are visible as received.
+    """
+    if not 0 <= index < upload.total_chunks:
+        raise ValidationError(f"Chunk index out of range: {index}.")
+
+    expected_length: int = upload.get_chunk_length(index)
+    upload_dir: Path = get_upload_dir(upload)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    tmp_path: Path = upload_dir / f"{index}.tmp-{os.getpid()}"
+    written = 0
+    try:
+        with open(tmp_path, "wb") as chunk_file:
+            while written <= expected_length:
+                data: bytes = stream.read(
+                    min(COPY_BUFFER_SIZE, expected_length - written + 1)
+                )
+                if not data:
+                    break
+                chunk_file.write(data)
+                written += len(data)
+
+        if written != expected_length:
+            raise ValidationError(
+                f"Chunk {index} has {written} bytes, expected {expected_length}."
+            )
+        os.replace(tmp_path, upload_dir / f"{index}.part")
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _truncated(copied: int, length: int) -> ValidationError:
+    return ValidationError(f"Chunk file ended after {copied} of {length} bytes.")
+
+
+def _copy_file(source_fd: int, target_fd: int, length: int) -> None:
+    """
+    Appends source file to the target one in kernel space, without
+    copying data through Python buffers when the platform allows that.
+    """
+    copied = 0
+    try:
+        while copied < length:
+            sent: int = os.copy_file_range(source_fd, target_fd, length - copied)
+            if not sent:
+                raise _truncated(copied, length)
+            copied += sent
+        return
+    except (AttributeError, OSError):
+        if copied:
+            raise
+
+    try:
+        while copied < length:
+            sent: int = os.sendfile(target_fd, source_fd, copied, length - copied)
+            if not sent:
+                raise _truncated(copied, length)
+            copied += sent
+        return
+    except (AttributeError, OSError):
+        if copied:
+            raise
+
+    with open(source_fd, "rb", closefd=False) as source:
+        with open(target_fd, "wb", closefd=False) as target:
+            while copied < length:
+                data: bytes = source.read(min(COPY_BUFFER_SIZE, length - copied))
+                if not data:
+                    raise _truncated(copied, length)
+                target.write(data)
+                copied += len(data)
+
+
+def matches_blob(upload: ChunkedUpload, blob: MediaBlob) -> bool:
+    """
+    Whether the received `proof_chunk` of the upload is the same part
+    of the stored file. The chunk is chosen by the server at random,
+    so the client proves it has the file, not only its checksum.
+    """
+    index: int = upload.proof_chunk
+    length: int = upload.get_chunk_length(index)
+    try:
+        with open(get_upload_dir(upload) / f"{index}.part", "rb") as chunk:
+            with open(Path(settings.MEDIA_ROOT) / blob.path, "rb") as stored:
+                stored.seek(index * upload.chunk_size)
+                while length > 0:
+                    size: int = min(COPY_BUFFER_SIZE, length)
+                    data: bytes = chunk.read(size)
+                    if not data or data != stored.read(size):
+                        return False
+                    length -= len(data)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _validate_image(path: Path) -> None:
+    try:
+        with PILImage.open(path) as image:
+            image.verify()
+    except Exception as e:
+        raise ValidationError("Uploaded file is not a valid image.") from e
+
+
+def assemble(upload: ChunkedUpload) -> MediaBlob:
+    """
+    Concatenates received chunks into the final file and stores it
+    under content addressed name. Returns existing blob for known contents.
+    Caller is responsible for locking the upload row.
+    """
+    missing: set[int] = set(range(upload.total_chunks)) - set(
+        get_received_chunks(upload)
+    )
+    if missing:
+        raise ValidationError(f"Missing chunks: {sorted(missing)[:10]}.")
+
+    upload_dir: Path = get_upload_dir(upload)
+    assembled_path: Path = upload_dir / "assembled"
+    with open(assembled_path, "wb") as target:
+        for index in range(upload.total_chunks):
+            with open(upload_dir / f"{index}.part", "rb") as source:
+                _copy_file(
+                    source.fileno(), target.fileno(), upload.get_chunk_length(index)
+                )
+
+    with open(assembled_path, "rb") as assembled:
+        sha256: str = hashlib.file_digest(assembled, "sha256").hexdigest()
+    if upload.sha256 and upload.sha256 != sha256:
+        raise ValidationError("Checksum of the uploaded file does not match.")
+    if upload.kind == ChunkedUpload.Kind.IMAGE:
+        _validate_image(assembled_path)
+
+    blob_dir: str = ChunkedUpload.UPLOAD_DIRS[upload.kind]
+    blob: MediaBlob | None = find_blob(sha256, blob_dir)
+    if blob is None:
+        name: str = get_blob_name(blob_dir, upload.filename, sha256)
+        target_path = Path(settings.MEDIA_ROOT) / name
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        # rename within the same filesystem - no data copy, content addressed
+        # name makes concurrent uploads of the same file harmless
+        os.replace(assembled_path, target_path)
+        blob, _ = MediaBlob.objects.get_or_create(
+            path=name, defaults=dict(sha256=sha256, size=upload.size)
+        )
+
+    shutil.rmtree(upload_dir, ignore_errors=True)
+    return blob
+
+
+def store_file(file: UploadedFile, upload_dir: str) -> MediaBlob:
+    """
+    Stores file uploaded with a form under content addressed name.
+    Returns existing blob (and does not store the file again) for known contents.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks(COPY_BUFFER_SIZE):
+        digest.update(chunk)
+    sha256: str = digest.hexdigest()
+
+    blob: MediaBlob | None = find_blob(sha256, upload_dir)
+    if blob is not None:
+        return blob
+
+    name: str = get_blob_name(upload_dir, file.name, sha256)
+    if not default_storage.exists(name):
+        file.seek(0)
+        name = default_storage.save(name, file)
+    blob, _ = MediaBlob.objects.get_or_create(
+        path=name, defaults=dict(sha256=sha256, size=file.size)
+    )
+    return blob
+
+
+def get_or_create_file_item(
+    model: type[File | Image], owner: User, title: str, blob: MediaBlob
+) -> tuple[File | Image, bool]:
+    """
+    Returns owner's item of the same title and contents when there is one,
+    so a file uploaded again is shared instead of copied. Has to be called
+    in a transaction - the item is locked, so garbage collection does not
+    remove it before it is added to a module.
+    """
+    item: File | Image | None = (
+        model.objects.select_for_update()
+        .filter(owner=owner, title=title, file=blob.path)
+        .order_by(model.Keys.id)
+        .first()
+    )
+    if item is not None:
+        return item, False
+    return model.objects.create(owner=owner, title=title, file=blob.path), True
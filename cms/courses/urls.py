@@ -4,10 +4,18 @@ from courses import views
 
 urlpatterns = [
     path("shopping/", views.shopping, name="shopping"),
+    path(
+        "image/<int:id>/<int:width>/",
+        views.image_derivative,
+        name="image_derivative",
+    ),
     path("mine/", views.ManageCourseListView.as_view(), name="manage_course_list"),
     path("create/", views.CourseCreateView.as_view(), name="course_create"),
     path("<int:pk>/edit/", views.CourseUpdateView.as_view(), name="course_edit"),
     path("<int:pk>/delete/", views.CourseDeleteView.as_view(), name="course_delete"),
+    path("<int:pk>/publish/", views.CoursePublishView.as_view(), name="course_publish"),
+    path("<int:pk>/clone/", views.CourseCloneView.as_view(), name="course_clone"),
+    path("<int:pk>/events/", views.CourseEventsView.as_view(), name="course_events"),
     path(
         "<int:pk>/module/",
         views.CourseModuleUpdateView.as_view(),
@@ -23,6 +31,16 @@ urlpatterns = [
         views.ContentCreateUpdateView.as_view(),
         name="module_content_update",
     ),
+    path(
+        "module/<int:module_id>/library/",
+        views.ModuleLibraryView.as_view(),
+        name="module_library",
+    ),
+    path(
+        "module/<int:module_id>/library/<str:model_name>/<int:id>/",
+        views.ContentAddView.as_view(),
+        name="module_content_add",
+    ),
     path(
         "content/<int:id>/delete/",
         views.ContentDeleteView.as_view(),
@@ -35,10 +53,22 @@ urlpatterns = [
     ),
     path("module/order/", views.ModuleOrderView.as_view(), name="module_order"),
     path("content/order/", views.ContentOrderView.as_view(), name="content_order"),
+    path(
+        "subject/<slug:slug>/feed.atom",
+        views.subject_feed,
+        {"feed_format": "atom"},
+        name="subject_feed_atom",
+    ),
+    path(
+        "subject/<slug:slug>/feed.json",
+        views.subject_feed,
+        {"feed_format": "json"},
+        name="subject_feed_json",
+    ),
     path(
         "subject/<slug:subject>/",
         views.CourseListView.as_view(),
         name="course_list_subject",
     ),
-    # path("<slug:slug>/", views.CourseDetailView.as_view(), name="course_detail"),
+    path("<slug:slug>/", views.CourseDetailView.as_view(), name="course_detail"),
 ]
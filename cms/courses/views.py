@@ -1,13 +1,21 @@
 import contextlib
 import json
+from collections.abc import Iterator
 
+from asgiref.sync import sync_to_async
 from braces.views import CsrfExemptMixin
 from braces.views import JsonRequestResponseMixin
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.files.storage import default_storage
+from django.core.paginator import Page
+from django.core.paginator import Paginator
 from django.db import models
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Q
 from django.db.models import QuerySet
 from django.forms import Form
 from django.forms import modelform_factory
@@ -15,29 +23,73 @@ from django.http import Http404
 from django.http import HttpRequest
 from django.http import HttpResponse
 from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_safe
 from django.views.generic import CreateView
 from django.views.generic import DeleteView
+from django.views.generic import DetailView
 from django.views.generic import ListView
 from django.views.generic import UpdateView
 from django.views.generic.base import TemplateResponseMixin
 from django.views.generic.base import View
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
 from students.forms import CourseEnrollForm
 
+from common.cache import CacheLoader
+from common.cache import get_cache_loader
+from courses.api.authentication import CachedBasicAuthentication
+from courses.cache import register_courses
+from courses.cache import register_subjects
+from courses.catalog import get_catalog_version
+from courses.catalog import get_sitemap_pages
+from courses.catalog import iter_atom_feed
+from courses.catalog import iter_json_feed
+from courses.catalog import iter_sitemap_index
+from courses.catalog import iter_sitemap_page
+from courses.catalog import stream_cached
+from courses.cloning import clone_course
+from courses.dashboard import DASHBOARD_CACHE_TIMEOUT_SECONDS
+from courses.dashboard import annotate_dashboard
+from courses.dashboard import attach_latest_enrollments
+from courses.dashboard import get_dashboard_page_cache_key
+from courses.events import EventType
+from courses.events import publish_event
+from courses.events import stream_events
 from courses.forms import ModuleFormSet
+from courses.forms import QuizQuestionFormSet
+from courses.garbage import DEFAULT_GRACE
+from courses.images import generate_derivative
+from courses.images import get_derivative_name
 from courses.models import Content
 from courses.models import Course
+from courses.models import CourseRecommendation
+from courses.models import CourseSummary
 from courses.models import File
 from courses.models import Image
+from courses.models import ItemBase
+from courses.models import MediaBlob
 from courses.models import Module
 from courses.models import Product
+from courses.models import Quiz
 from courses.models import Subject
 from courses.models import Text
 from courses.models import Video
+from courses.outline import schedule_outline_refresh
+from courses.publishing import publish_course
+from courses.summary import LANDING_PAGE_CACHE_TIMEOUT_SECONDS
+from courses.summary import get_landing_page_cache_key
+from courses.tasks import collect_garbage
+from courses.uploads import get_or_create_file_item
+from courses.uploads import store_file
 
 
 class OwnerMixin:
@@ -68,14 +120,51 @@ class OwnerCourseEditMixin(OwnerCourseMixin, OwnerEditMixin):
 
 
 class ManageCourseListView(OwnerCourseMixin, ListView):
+    """
+    Instructor dashboard. Each page is built with one annotated query
+    (plus one for the latest enrollments) and cached per owner.
+    """
+
     template_name = "courses/manage/course/list.html"
     permission_required = ["courses.view_course"]
+    paginate_by = 20
 
     def get_queryset(self) -> QuerySet[Course]:
         queryset = super().get_queryset()
+        return annotate_dashboard(
+            queryset.select_related(Course.Keys.subject).order_by(
+                f"-{Course.Keys.updated}"
+            )
+        )
 
-        raise Http404
-        return queryset.filter(owner=self.request.user)
+    def paginate_queryset(self, queryset: QuerySet[Course], page_size: int) -> tuple:
+        page_number: str = str(self.request.GET.get(self.page_kwarg) or 1)
+        # pages are cached by number, `last` (and invalid values) are resolved
+        # by `MultipleObjectMixin` first
+        cached: tuple[int, list[Course]] | None = None
+        if page_number.isdecimal():
+            cached = cache.get(self.get_page_cache_key(int(page_number)))
+        if cached is None:
+            paginator, page, courses, is_paginated = super().paginate_queryset(
+                queryset, page_size
+            )
+            courses = attach_latest_enrollments(list(courses))
+            cache.set(
+                self.get_page_cache_key(page.number),
+                (paginator.count, courses),
+                DASHBOARD_CACHE_TIMEOUT_SECONDS,
+            )
+        else:
+            count, courses = cached
+            paginator = self.get_paginator(queryset, page_size)
+            paginator.count = count  # skip COUNT query
+            page = paginator.page(page_number)
+
+        page.object_list = courses
+        return paginator, page, courses, page.has_other_pages()
+
+    def get_page_cache_key(self, page: int) -> str:
+        return get_dashboard_page_cache_key(owner_id=self.request.user.id, page=page)
 
 
 class CourseCreateView(OwnerCourseEditMixin, CreateView):
@@ -91,8 +180,86 @@ class CourseDeleteView(OwnerCourseMixin, DeleteView):
     permission_required = ["courses.delete_course"]
 
 
+class CoursePublishView(OwnerCourseMixin, View):
+    """
+    Makes current modules and contents of the course visible to students.
+    """
+
+    permission_required = ["courses.change_course"]
+
+    def post(self, request, pk: int) -> HttpResponse:
+        course: Course = get_object_or_404(self.get_queryset(), id=pk)
+        publish_course(course.id)
+        return redirect(self.success_url)
+
+    def get_queryset(self) -> QuerySet[Course]:
+        return Course.objects.filter(owner=self.request.user)
+
+
+class CourseCloneView(OwnerCourseMixin, View):
+    """
+    Copies the course with its modules and contents, e.g. for the next term.
+    """
+
+    permission_required = ["courses.add_course"]
+
+    def post(self, request, pk: int) -> HttpResponse:
+        course: Course = get_object_or_404(self.get_queryset(), id=pk)
+        clone: Course = clone_course(
+            course, owner=request.user, title=f"{course.title} (copy)"
+        )
+        return redirect("course_edit", clone.id)
+
+    def get_queryset(self) -> QuerySet[Course]:
+        return Course.objects.filter(owner=self.request.user)
+
+
+class CourseEventsView(View):
+    """
+    Server-sent events of changes of the course (see `courses.events.EventType`),
+    for its owner and students, API clients authenticate with Basic auth.
+    Students see changes only when the course is published (`course_published`).
+    Long-lived streams need an ASGI server (`cms.asgi`), see
+    `settings.COURSE_EVENTS_ENABLED`.
+    """
+
+    async def get(self, request, pk: int) -> StreamingHttpResponse:
+        if not settings.COURSE_EVENTS_ENABLED:
+            raise Http404
+        user = await self.get_user(request)
+        if not user.is_authenticated:
+            raise PermissionDenied
+        has_access: bool = await Course.objects.filter(
+            Q(owner=user) | Q(students=user), id=pk
+        ).aexists()
+        if not has_access:
+            raise Http404
+
+        response = StreamingHttpResponse(
+            stream_events(pk), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # disables response buffering of nginx
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def get_user(self, request):
+        user = await request.auser()
+        if not user.is_authenticated and "HTTP_AUTHORIZATION" in request.META:
+            try:
+                authenticated: tuple | None = await sync_to_async(
+                    CachedBasicAuthentication().authenticate
+                )(Request(request))
+            except APIException:
+                authenticated = None
+            if authenticated is not None:
+                user = authenticated[0]
+        return user
+
+
 class CourseModuleUpdateView(TemplateResponseMixin, View):
     template_name = "courses/manage/module/formset.html"
+    paginate_by = 20
     course = None
 
     def dispatch(self, request, *args, **kwargs):
@@ -106,19 +273,34 @@ class CourseModuleUpdateView(TemplateResponseMixin, View):
         )
         return super().dispatch(request=request, pk=pk)
 
-    def get_formset(self, data: dict | None = None):
-        return ModuleFormSet(instance=self.course, data=data)
+    def get_page(self) -> Page:
+        # large courses are edited page by page
+        module_ids = self.course.modules.values_list(Module.Keys.id, flat=True)
+        paginator = Paginator(module_ids, self.paginate_by)
+        return paginator.get_page(self.request.GET.get("page"))
+
+    def get_formset(self, page: Page, data: dict | None = None) -> ModuleFormSet:
+        return ModuleFormSet(
+            instance=self.course,
+            queryset=Module.objects.filter(id__in=list(page)),
+            data=data,
+        )
+
+    def get_context_data(self, formset: ModuleFormSet, page: Page) -> dict:
+        return dict(course=self.course, formset=formset, page_obj=page)
 
     def get(self, request, *args, **kwargs):
-        formset = self.get_formset()
-        return self.render_to_response(dict(course=self.course, formset=formset))
+        page: Page = self.get_page()
+        formset = self.get_formset(page)
+        return self.render_to_response(self.get_context_data(formset, page))
 
     def post(self, request, *args, **kwargs):
-        formset = self.get_formset(data=request.POST)
+        page: Page = self.get_page()
+        formset = self.get_formset(page, data=request.POST)
         if formset.is_valid():
             formset.save()
             return redirect("manage_course_list")
-        return self.render_to_response(dict(course=self.course, formset=formset))
+        return self.render_to_response(self.get_context_data(formset, page))
 
 
 class ContentCreateUpdateView(TemplateResponseMixin, View):
@@ -131,6 +313,7 @@ class ContentCreateUpdateView(TemplateResponseMixin, View):
         "video": Video,
         "image": Image,
         "file": File,
+        "quiz": Quiz,
     }
 
     # Used between methods - each request makes new instance of the view so it's fine (None is non mutable)
@@ -149,6 +332,12 @@ class ContentCreateUpdateView(TemplateResponseMixin, View):
         )
         return form(*args, **kwargs)
 
+    def get_formset(self, *args, **kwargs) -> QuizQuestionFormSet | None:
+        # questions are edited together with the quiz
+        if self.model is Quiz:
+            return QuizQuestionFormSet(*args, instance=self.obj, **kwargs)
+        return None
+
     def dispatch(
         self, request, module_id: int, model_name: str, *args, id: int = None, **kwargs
     ) -> TemplateResponse:
@@ -175,29 +364,94 @@ class ContentCreateUpdateView(TemplateResponseMixin, View):
             model=self.model,
             instance=self.obj,
         )
-        return self.render_to_response(context=dict(form=form, object=self.obj))
+        formset = self.get_formset()
+        return self.render_to_response(
+            context=dict(form=form, formset=formset, object=self.obj)
+        )
 
     def post(self, request, module_id: int, model_name: str, id: int | None = None):
         form = self.get_form(
             model=self.model, instance=self.obj, data=request.POST, files=request.FILES
         )
-        if form.is_valid():
-            obj = form.save(commit=False)
-            obj.owner = request.user
-            obj.save()
-            if not id:  # new content is created
-                Content.objects.create(module=self.module, item=obj)
+        formset = self.get_formset(data=request.POST)
+        if form.is_valid() and (formset is None or formset.is_valid()):
+            with transaction.atomic():
+                obj = form.save(commit=False)
+                obj.owner = request.user
+                if self.model in (File, Image) and "file" in form.changed_data:
+                    blob: MediaBlob = store_file(
+                        form.cleaned_data["file"], self.model.UPLOAD_DIR
+                    )
+                    obj.file = blob.path
+                if self.model in (File, Image) and not id:
+                    # the same file uploaded again is shared, not copied
+                    obj, _ = get_or_create_file_item(
+                        self.model, request.user, obj.title, blob
+                    )
+                else:
+                    obj.save()
+                if formset is not None:
+                    # submissions are graded against the published questions,
+                    # changes apply once the course is published again
+                    formset.instance = obj
+                    formset.save()
+                if not id:  # new content is created
+                    Content.objects.create(module=self.module, item=obj)
             return redirect("module_content_list", self.module.id)
-        return self.render_to_response(context=dict(form=form, object=self.obj))
+        return self.render_to_response(
+            context=dict(form=form, formset=formset, object=self.obj)
+        )
+
+
+class ModuleLibraryView(LoginRequiredMixin, TemplateResponseMixin, View):
+    """
+    Items of the owner which can be added to the module - shared, not copied.
+    """
+
+    template_name = "courses/manage/module/library.html"
+    items_per_type = 50
+
+    def get(self, request, module_id: int):
+        module = get_object_or_404(Module, id=module_id, course__owner=request.user)
+        items = {
+            model_name: model.objects.filter(owner=request.user).order_by(
+                f"-{ItemBase.Keys.updated}"
+            )[: self.items_per_type]
+            for model_name, model in (
+                ContentCreateUpdateView.SUPPORTED_CONTENT_TYPES.items()
+            )
+        }
+        return self.render_to_response(context=dict(module=module, items=items))
+
+
+class ContentAddView(LoginRequiredMixin, View):
+    def post(self, request, module_id: int, model_name: str, id: int):
+        module = get_object_or_404(Module, id=module_id, course__owner=request.user)
+        model = ContentCreateUpdateView.SUPPORTED_CONTENT_TYPES.get(model_name)
+        if model is None:
+            raise Http404
+        with transaction.atomic():
+            # locked, so garbage collection does not remove an unused item
+            item = get_object_or_404(
+                model.objects.select_for_update(), id=id, owner=request.user
+            )
+            Content.objects.create(module=module, item=item)
+        return redirect("module_content_list", module.id)
 
 
 class ContentDeleteView(View):
     def post(self, request, id: int):
-        content = get_object_or_404(Content, id=id, module__course__owner=request.user)
-        module = content.module
-        content.item.delete()
+        content = get_object_or_404(
+            Content.objects.select_related(Content.Keys.module),
+            id=id,
+            module__course__owner=request.user,
+        )
+        # the module is read by signals of the deleted content
         content.delete()
-        return redirect("module_content_list", module.id)
+        # items no longer used by any module and their files are removed later
+        # by background garbage collection
+        collect_garbage.enqueue(run_after=timezone.now() + DEFAULT_GRACE, unique=True)
+        return redirect("module_content_list", content.module_id)
 
 
 class ModuleContentListView(TemplateResponseMixin, View):
@@ -214,8 +468,23 @@ class ModuleOrderView(CsrfExemptMixin, JsonRequestResponseMixin, View):
     """
 
     def post(self, request):
-        for id, order in self.request_json.items():
-            Module.objects.filter(id=id, course__owner=request.user).update(order=order)
+        with transaction.atomic():
+            for id, order in self.request_json.items():
+                Module.objects.filter(id=id, course__owner=request.user).update(
+                    order=order
+                )
+                # `update` does not send signals, refreshed once on commit
+                schedule_outline_refresh(module_id=id)
+            course_ids = (
+                Module.objects.filter(
+                    id__in=self.request_json.keys(), course__owner=request.user
+                )
+                .order_by()
+                .values_list(Module.Keys.course, flat=True)
+                .distinct()
+            )
+            for course_id in course_ids:
+                publish_event(course_id, EventType.MODULES_REORDERED)
         return self.render_json_response(context_dict=dict(saved="OK"))
 
 
@@ -225,70 +494,160 @@ class ContentOrderView(CsrfExemptMixin, JsonRequestResponseMixin, View):
     """
 
     def post(self, request):
-        for id, order in self.request_json.items():
-            Content.objects.filter(id=id, module__course__owner=request.user).update(
-                order=order
+        with transaction.atomic():
+            for id, order in self.request_json.items():
+                Content.objects.filter(
+                    id=id, module__course__owner=request.user
+                ).update(order=order)
+            modules = (
+                Content.objects.filter(
+                    id__in=self.request_json.keys(), module__course__owner=request.user
+                )
+                .order_by()
+                .values_list(Content.Keys.module, "module__course")
+                .distinct()
             )
+            for module_id, course_id in modules:
+                publish_event(course_id, EventType.CONTENTS_REORDERED, module=module_id)
         return self.render_json_response(context_dict=dict(saved="OK"))
 
 
 class CourseListView(TemplateResponseMixin, View):
-    CACHE_SUBJECTS_KEY = "courses:all_subjects"
-    CACHE_SUBJECTS_TIMEOUT_SECONDS = 60 * 60
-
-    CACHE_SUBJECT_COURSES_KEY = "courses:subject:{subject_id}"
-    CACHE_SUBJECTS_COURSES_TIMEOUT_SECONDS = 60
-
-    CACHE_ALL_COURSES_KEY = "courses:all_courses"
-    CACHE_ALL_COURSES_TIMEOUT_SECONDS = 60
+    """
+    Catalog page, subjects and courses lists are read from the cache
+    in a single round trip (subjects usually from the process memory).
+    """
 
     model = Course
     template_name = "courses/course/list.html"
 
     def get(self, request, subject: str | None = None) -> TemplateResponse:
-        subjects = cache.get(self.CACHE_SUBJECTS_KEY)
-        if not subjects:
-            subjects = Subject.objects.annotate(
-                total_courses=Count(Subject.Keys.courses)
-            )
-            cache.set(
-                self.CACHE_SUBJECTS_KEY, subjects, self.CACHE_SUBJECTS_TIMEOUT_SECONDS
-            )
-
-        all_courses = Course.objects.annotate(total_modules=Count(Course.Keys.modules))
+        loader: CacheLoader = get_cache_loader(request)
+        subjects = register_subjects(loader)
         if subject:
-            subject = get_object_or_404(Subject, slug=subject)
-            subject_key: str = self.CACHE_SUBJECT_COURSES_KEY.format(
-                subject_id=subject.id
-            )
-            courses = cache.get(subject_key)
-            if not courses:
-                courses = all_courses.filter(subject=subject)
-                cache.set(self.CACHE_SUBJECT_COURSES_KEY, courses)
+            slug: str = subject
+            subject = next((s for s in subjects if s.slug == slug), None)
+            if subject is None:
+                # created after the (local) subjects list has been cached
+                subject = get_object_or_404(Subject, slug=slug)
+            courses = register_courses(loader, subject.id)
         else:
-            courses = cache.get(self.CACHE_ALL_COURSES_KEY)
-            if not courses:
-                courses = all_courses
-                cache.set(
-                    self.CACHE_ALL_COURSES_KEY,
-                    courses,
-                    self.CACHE_ALL_COURSES_TIMEOUT_SECONDS,
-                )
+            courses = register_courses(loader)
         return self.render_to_response(
             context=dict(subjects=subjects, courses=courses, subject=subject)
         )
 
 
-class CourseDetailView(DeleteView):
-    model = Course
+class CourseDetailView(DetailView):
+    """
+    Course landing page, rendered from the precomputed `CourseSummary`.
+    Pages of anonymous visitors are cached as a whole.
+    """
+
+    model = CourseSummary
     template_name = "courses/course/detail.html"
+    # unique, slugs of summaries may be (briefly) duplicated
+    slug_field = f"{CourseSummary.Keys.course}__{Course.Keys.slug}"
+
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        cache_key: str = get_landing_page_cache_key(kwargs["slug"])
+        content: bytes | None = cache.get(cache_key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = super().get(request, *args, **kwargs)
+        response.render()
+        cache.set(cache_key, response.content, LANDING_PAGE_CACHE_TIMEOUT_SECONDS)
+        return response
 
     def get_context_data(self, **kwargs) -> dict:
         context: dict = super().get_context_data(**kwargs)
-        context["enroll_form"] = CourseEnrollForm(initial=dict(course=self.object))
+        if self.request.user.is_authenticated:
+            context["enroll_form"] = CourseEnrollForm(
+                initial=dict(course=self.object.course_id)
+            )
+        context["recommendations"] = CourseRecommendation.objects.filter(
+            course_id=self.object.course_id
+        ).select_related(CourseRecommendation.Keys.recommended)
         return context
 
 
+def image_derivative(request: HttpRequest, id: int, width: int) -> HttpResponse:
+    """
+    Fallback for image variants not created yet by background workers.
+    Creates the variant and redirects to it (or to the original image on failure).
+    """
+    if width not in settings.IMAGE_DERIVATIVE_WIDTHS:
+        raise Http404
+    image: Image = get_object_or_404(Image, id=id)
+    if generate_derivative(image.file.name, width):
+        return redirect(
+            default_storage.url(get_derivative_name(image.file.name, width))
+        )
+    return redirect(image.file.url)
+
+
+def _catalog_etag(request: HttpRequest, *args, **kwargs) -> str:
+    return str(get_catalog_version())
+
+
+def _stream_catalog(
+    request: HttpRequest, name: str, chunks: Iterator[str], content_type: str
+) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        stream_cached(f"{request.scheme}://{request.get_host()}", name, chunks),
+        content_type=content_type,
+    )
+    # shared caches revalidate with the ETag of catalog version
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+@condition(etag_func=_catalog_etag)
+def sitemap_index(request: HttpRequest) -> StreamingHttpResponse:
+    base_url: str = request.build_absolute_uri("/")[:-1]
+    return _stream_catalog(
+        request, "sitemap", iter_sitemap_index(base_url), "application/xml"
+    )
+
+
+@require_safe
+@condition(etag_func=_catalog_etag)
+def sitemap_page(request: HttpRequest, page: int) -> StreamingHttpResponse:
+    if not 1 <= page <= get_sitemap_pages():
+        raise Http404
+    base_url: str = request.build_absolute_uri("/")[:-1]
+    return _stream_catalog(
+        request,
+        f"sitemap-{page}",
+        iter_sitemap_page(base_url, page),
+        "application/xml",
+    )
+
+
+@require_safe
+@condition(etag_func=_catalog_etag)
+def subject_feed(
+    request: HttpRequest, slug: str, feed_format: str
+) -> StreamingHttpResponse:
+    subject: Subject = get_object_or_404(
+        Subject.objects.only(Subject.Keys.title, Subject.Keys.slug), slug=slug
+    )
+    base_url: str = request.build_absolute_uri("/")[:-1]
+    feed_url: str = request.build_absolute_uri(request.path)
+    if feed_format == "atom":
+        chunks = iter_atom_feed(base_url, subject, feed_url)
+        content_type = "application/atom+xml"
+    else:
+        chunks = iter_json_feed(base_url, subject, feed_url)
+        content_type = "application/feed+json"
+    return _stream_catalog(request, f"feed-{slug}.{feed_format}", chunks, content_type)
+
+
 def validate_budget(budget):
     with contextlib.suppress(ValueError, TypeError):
         return int(budget)
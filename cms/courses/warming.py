@@ -0,0 +1,201 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from common.cache import CacheLoader
+from courses.cache import get_courses
+from courses.cache import get_subjects
+from courses.cache import register_courses
+from courses.cache import register_subjects
+from courses.catalog import get_output_cache_key
+from courses.catalog import get_sitemap_pages
+from courses.models import Content
+from courses.models import CourseSummary
+from courses.models import ItemBase
+from courses.models import Subject
+from courses.summary import get_landing_page_cache_key
+from courses.views import CourseDetailView
+from courses.views import sitemap_index
+from courses.views import sitemap_page
+from courses.views import subject_feed
+
+
+@dataclass
+class WarmResult:
+    # cache entries found and computed by the task
+    cached: int = 0
+    filled: int = 0
+
+
+@dataclass
+class WarmTask:
+    kind: str
+    name: str
+    run: Callable[[], WarmResult]
+
+
+def _anonymous_get(path: str, base_url: str | None = None) -> HttpRequest:
+    if base_url:
+        url = urlsplit(base_url)
+        request = RequestFactory().get(
+            path, secure=url.scheme == "https", HTTP_HOST=url.netloc
+        )
+    else:
+        request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    return request
+
+
+def warm_catalog_lists(subject_id: int | None = None) -> WarmResult:
+    """
+    Lists of the catalog page - subjects with all courses, or courses of a subject.
+    """
+    result = WarmResult()
+
+    def counted(fill: Callable) -> Callable:
+        def wrapper(*args):
+            result.filled += 1
+            return fill(*args)
+
+        return wrapper
+
+    loader = CacheLoader()
+    if subject_id is None:
+        entries = [
+            register_subjects(loader, fill=counted(get_subjects)),
+            register_courses(loader, fill=counted(get_courses)),
+        ]
+    else:
+        entries = [register_courses(loader, subject_id, fill=counted(get_courses))]
+    loader.load()
+    result.cached = len(entries) - result.filled
+    return result
+
+
+def warm_landing_page(slug: str) -> WarmResult:
+    if cache.get(get_landing_page_cache_key(slug)) is not None:
+        return WarmResult(cached=1)
+    # the view caches pages of anonymous visitors
+    response: HttpResponse = CourseDetailView.as_view()(
+        _anonymous_get(reverse("course_detail", args=[slug])), slug=slug
+    )
+    return WarmResult(filled=int(response.status_code == 200))
+
+
+def warm_item_fragments(course_id: int) -> WarmResult:
+    """
+    Rendered HTML of items of all modules of the course.
+    """
+    contents = Content.objects.filter(module__course_id=course_id).prefetch_related(
+        Content.Keys.item
+    )
+    items: dict[str, ItemBase] = {
+        content.item.get_render_cache_key(): content.item
+        for content in contents
+        if content.item is not None
+    }
+    cached: dict = cache.get_many(list(items))
+    for key, item in items.items():
+        if key not in cached:
+            item.render()
+    return WarmResult(cached=len(cached), filled=len(items) - len(cached))
+
+
+def warm_catalog_output(
+    base_url: str, name: str, view: Callable, path: str, **kwargs
+) -> WarmResult:
+    """
+    Sitemap or feed, cached by `courses.catalog.stream_cached` while streamed.
+    """
+    url = urlsplit(base_url)
+    if (
+        cache.get(get_output_cache_key(f"{url.scheme}://{url.netloc}", name))
+        is not None
+    ):
+        return WarmResult(cached=1)
+    response = view(_anonymous_get(path, base_url), **kwargs)
+    for _ in response.streaming_content:
+        pass
+    return WarmResult(filled=1)
+
+
+def get_warm_tasks(courses: int, base_url: str | None = None) -> list[WarmTask]:
+    """
+    Catalog lists, landing pages and item fragments of the most popular courses
+    and (with `base_url` of the site) sitemaps and subject feeds.
+    """
+    tasks: list[WarmTask] = [WarmTask("catalog", "all", warm_catalog_lists)]
+    subjects = list(
+        Subject.objects.order_by(Subject.Keys.id).values_list(
+            Subject.Keys.id, Subject.Keys.slug
+        )
+    )
+    tasks += [
+        WarmTask("catalog", slug, partial(warm_catalog_lists, subject_id))
+        for subject_id, slug in subjects
+    ]
+
+    popular = CourseSummary.objects.order_by(
+        f"-{CourseSummary.Keys.total_students}"
+    ).values_list(CourseSummary.Keys.course, CourseSummary.Keys.slug)[:courses]
+    for course_id, slug in popular:
+        tasks.append(WarmTask("landing page", slug, partial(warm_landing_page, slug)))
+        tasks.append(
+            WarmTask("fragments", slug, partial(warm_item_fragments, course_id))
+        )
+
+    if base_url:
+        tasks.append(
+            WarmTask(
+                "sitemap",
+                "index",
+                partial(
+                    warm_catalog_output,
+                    base_url,
+                    "sitemap",
+                    sitemap_index,
+                    reverse("sitemap"),
+                ),
+            )
+        )
+        for page in range(1, get_sitemap_pages() + 1):
+            tasks.append(
+                WarmTask(
+                    "sitemap",
+                    str(page),
+                    partial(
+                        warm_catalog_output,
+                        base_url,
+                        f"sitemap-{page}",
+                        sitemap_page,
+                        reverse("sitemap_page", args=[page]),
+                        page=page,
+                    ),
+                )
+            )
+        for _, slug in subjects:
+            for feed_format in ["atom", "json"]:
+                tasks.append(
+                    WarmTask(
+                        "feed",
+                        f"{slug}.{feed_format}",
+                        partial(
+                            warm_catalog_output,
+                            base_url,
+                            f"feed-{slug}.{feed_format}",
+                            subject_feed,
+                            reverse(f"subject_feed_{feed_format}", args=[slug]),
+                            slug=slug,
+                            feed_format=feed_format,
+                        ),
+                    )
+                )
+    return tasks
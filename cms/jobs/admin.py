@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        Job.Keys.id,
+        Job.Keys.name,
+        Job.Keys.status,
+        Job.Keys.priority,
+        Job.Keys.attempts,
+        Job.Keys.created,
+        "wait_ms",
+        Job.Keys.duration_ms,
+    ]
+    list_filter = [Job.Keys.status, Job.Keys.name]
+    readonly_fields = [
+        Job.Keys.created,
+        Job.Keys.started,
+        Job.Keys.finished,
+        Job.Keys.heartbeat,
+        Job.Keys.duration_ms,
+        Job.Keys.last_error,
+    ]
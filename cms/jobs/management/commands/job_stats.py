@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import Max
+from django.db.models import Q
+from django.utils import timezone
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Shows per task timing metrics of background jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+
+    def handle(self, *args, hours: int, **options):
+        stats = (
+            Job.objects.filter(created__gte=timezone.now() - timedelta(hours=hours))
+            .values(Job.Keys.name)
+            .annotate(
+                total=Count(Job.Keys.id),
+                queued=Count(Job.Keys.id, filter=Q(status=Job.Status.QUEUED)),
+                failed=Count(Job.Keys.id, filter=Q(status=Job.Status.FAILED)),
+                avg_wait=Avg(F(Job.Keys.started) - F(Job.Keys.created)),
+                avg_duration_ms=Avg(Job.Keys.duration_ms),
+                max_duration_ms=Max(Job.Keys.duration_ms),
+            )
+            .order_by(Job.Keys.name)
+        )
+
+        self.stdout.write(
+            f"{'task':<60} {'total':>7} {'queued':>7} {'failed':>7} "
+            f"{'avg wait s':>10} {'avg ms':>8} {'max ms':>8}"
+        )
+        for row in stats:
+            avg_wait: float = (
+                row["avg_wait"].total_seconds() if row["avg_wait"] else 0.0
+            )
+            self.stdout.write(
+                f"{row[Job.Keys.name]:<60} {row['total']:>7} {row['queued']:>7} "
+                f"{row['failed']:>7} {avg_wait:>10.2f} "
+                f"{row['avg_duration_ms'] or 0:>8.0f} {row['max_duration_ms'] or 0:>8}"
+            )
@@ -0,0 +1,76 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db import connections
+
+from jobs.queue import claim_job
+from jobs.queue import requeue_stale_jobs
+from jobs.queue import run_job
+
+
+def work(stop: multiprocessing.Event, burst: bool) -> None:
+    """
+    Worker process loop - executes due jobs until stopped
+    (or, in `burst` mode, until the queue is empty).
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while not stop.is_set():
+        close_old_connections()
+        job = claim_job()
+        if job is not None:
+            run_job(job)
+            continue
+        if burst:
+            break
+        stop.wait(settings.JOBS_POLL_INTERVAL_SECONDS)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Runs pool of background job worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=multiprocessing.cpu_count()
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exits when there are no due jobs left.",
+        )
+
+    def handle(self, *args, processes: int, burst: bool, **options):
+        requeued: int = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs.")
+
+        # forked workers must not share parent's database connections
+        connections.close_all()
+        stop = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(target=work, args=(stop, burst), daemon=True)
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {processes} workers.")
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping workers after current jobs.")
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        last_requeue: float = time.monotonic()
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=settings.JOBS_POLL_INTERVAL_SECONDS)
+            if time.monotonic() - last_requeue > settings.JOBS_STALE_AFTER_SECONDS:
+                close_old_connections()
+                requeue_stale_jobs()
+                last_requeue = time.monotonic()
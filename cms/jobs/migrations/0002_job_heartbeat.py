@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:39
+
+from django.db import migrations
+from django.db import models
+from django.db.models import F
+
+
+def set_running_heartbeats(apps, schema_editor):
+    # running jobs without heartbeat would never be considered stale
+    Job = apps.get_model("jobs", "Job")
+    Job.objects.filter(status="running").update(heartbeat=F("started"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="heartbeat",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(set_running_heartbeats, migrations.RunPython.noop),
+    ]
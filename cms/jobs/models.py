@@ -0,0 +1,71 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Background job stored in the database, executed by `manage.py run_workers`.
+    """
+
+    class Keys:
+        id = "id"
+        name = "name"
+        args = "args"
+        kwargs = "kwargs"
+        priority = "priority"
+        status = "status"
+        attempts = "attempts"
+        max_attempts = "max_attempts"
+        run_after = "run_after"
+        created = "created"
+        started = "started"
+        finished = "finished"
+        heartbeat = "heartbeat"
+        duration_ms = "duration_ms"
+        last_error = "last_error"
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=256)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # higher priority jobs are executed first
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    # timing metrics, of the last attempt
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    # refreshed by the worker while the job runs, see `jobs.queue.requeue_stale_jobs`
+    heartbeat = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created"]
+        indexes = [
+            models.Index(
+                fields=["-priority", "run_after"],
+                condition=models.Q(status="queued"),
+                name="jobs_job_queued_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.id} ({self.status})"
+
+    @property
+    def wait_ms(self) -> int | None:
+        if self.started is None:
+            return None
+        return int((self.started - self.created).total_seconds() * 1000)
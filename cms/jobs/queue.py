@@ -0,0 +1,203 @@
+import contextlib
+import logging
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+_tasks: dict[str, "Task"] = {}
+
+
+class Task:
+    """
+    Function which can be executed in background by workers, see `task`.
+    """
+
+    def __init__(self, func: Callable, name: str, priority: int, max_attempts: int):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(
+        self,
+        *args,
+        priority: int | None = None,
+        run_after: datetime | None = None,
+        unique: bool = False,
+        **kwargs,
+    ) -> Job | None:
+        """
+        Stores the job - in the current transaction, so it is visible
+        to workers only when the transaction commits.
+        With `unique` the job is not added when the same one is already queued.
+        """
+        if (
+            unique
+            and Job.objects.filter(
+                name=self.name, args=list(args), kwargs=kwargs, status=Job.Status.QUEUED
+            ).exists()
+        ):
+            return None
+
+        return Job.objects.create(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs,
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_after=run_after or timezone.now(),
+        )
+
+
+def task(
+    func: Callable | None = None,
+    *,
+    name: str | None = None,
+    priority: int = 0,
+    max_attempts: int = 3,
+):
+    """
+    Registers function as a background task, use `func.enqueue(*args, **kwargs)`
+    to run it by workers. Arguments have to be JSON serializable.
+    """
+
+    def register(func: Callable) -> Task:
+        task_name: str = name or f"{func.__module__}.{func.__qualname__}"
+        _tasks[task_name] = Task(
+            func, name=task_name, priority=priority, max_attempts=max_attempts
+        )
+        return _tasks[task_name]
+
+    if func is not None:
+        return register(func)
+    return register
+
+
+def claim_job() -> Job | None:
+    """
+    Takes the next due job. Concurrent workers skip rows locked by others
+    (`SELECT ... FOR UPDATE SKIP LOCKED`), so they never wait for each other.
+    """
+    with transaction.atomic():
+        job: Job | None = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=timezone.now())
+            .order_by(f"-{Job.Keys.priority}", Job.Keys.run_after, Job.Keys.id)
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = Job.Status.RUNNING
+        job.attempts += 1
+        job.started = job.heartbeat = timezone.now()
+        job.save(
+            update_fields=[
+                Job.Keys.status,
+                Job.Keys.attempts,
+                Job.Keys.started,
+                Job.Keys.heartbeat,
+            ]
+        )
+    return job
+
+
+def _beat(job: Job, stop: threading.Event) -> None:
+    try:
+        while not stop.wait(settings.JOBS_HEARTBEAT_INTERVAL_SECONDS):
+            # stops when the job was taken away as stale
+            if not Job.objects.filter(
+                id=job.id, status=Job.Status.RUNNING, attempts=job.attempts
+            ).update(heartbeat=timezone.now()):
+                logger.warning("Job %s is no longer owned by this worker.", job)
+                return
+    finally:
+        # thread's own connection
+        connection.close()
+
+
+@contextlib.contextmanager
+def heartbeat(job: Job) -> Iterator[None]:
+    """
+    Refreshes `Job.heartbeat` from a background thread while the job runs,
+    so long running jobs are not considered stale.
+    """
+    stop = threading.Event()
+    thread = threading.Thread(target=_beat, args=(job, stop), daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job: Job) -> None:
+    start: float = time.perf_counter()
+    try:
+        registered_task: Task = _tasks[job.name]
+        with heartbeat(job):
+            registered_task(*job.args, **job.kwargs)
+    except Exception:
+        logger.exception("Job %s failed.", job)
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            # exponential backoff
+            job.status = Job.Status.QUEUED
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.Status.FAILED
+    else:
+        job.status = Job.Status.SUCCEEDED
+        job.last_error = ""
+
+    job.finished = timezone.now()
+    job.duration_ms = int((time.perf_counter() - start) * 1000)
+    job.save(
+        update_fields=[
+            Job.Keys.status,
+            Job.Keys.run_after,
+            Job.Keys.finished,
+            Job.Keys.duration_ms,
+            Job.Keys.last_error,
+        ]
+    )
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Returns jobs of killed workers (without recent heartbeat) back to the queue,
+    jobs out of attempts fail - they may be the ones killing workers.
+    Returns number of requeued jobs.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        heartbeat__lt=now - timedelta(seconds=settings.JOBS_STALE_AFTER_SECONDS),
+    )
+    with transaction.atomic():
+        stale.filter(attempts__gte=F(Job.Keys.max_attempts)).update(
+            status=Job.Status.FAILED,
+            finished=now,
+            last_error="Worker stopped without finishing the job.",
+        )
+        return stale.update(status=Job.Status.QUEUED, run_after=now)
@@ -0,0 +1,108 @@
+import time
+from datetime import timedelta
+
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.test import override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import claim_job
+from jobs.queue import requeue_stale_jobs
+from jobs.queue import run_job
+from jobs.queue import task
+
+calls: list = []
+
+
+@task(name="jobs.tests.record", max_attempts=2)
+def record(value: int) -> None:
+    calls.append(value)
+
+
+@task(name="jobs.tests.fail", max_attempts=2)
+def fail() -> None:
+    raise ValueError("failed")
+
+
+@task(name="jobs.tests.sleep")
+def sleep() -> None:
+    time.sleep(0.3)
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_job(self):
+        low = record.enqueue(1)
+        high = record.enqueue(2, priority=10)
+        record.enqueue(3, run_after=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(claim_job().id, high.id)
+        job: Job = claim_job()
+        self.assertEqual(job.id, low.id)
+        self.assertEqual(job.status, Job.Status.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.heartbeat)
+        # running and not yet due jobs are not claimed
+        self.assertIsNone(claim_job())
+
+    def test_unique(self):
+        self.assertIsNotNone(record.enqueue(1, unique=True))
+        self.assertIsNone(record.enqueue(1, unique=True))
+        self.assertIsNotNone(record.enqueue(2, unique=True))
+
+    def test_run_job(self):
+        record.enqueue(1)
+        run_job(claim_job())
+        self.assertEqual(calls, [1])
+        self.assertEqual(Job.objects.get().status, Job.Status.SUCCEEDED)
+
+    def test_retry(self):
+        fail.enqueue()
+        with self.assertLogs("jobs.queue", "ERROR"):
+            run_job(claim_job())
+        job: Job = Job.objects.get()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertIn("ValueError", job.last_error)
+
+        Job.objects.update(run_after=timezone.now())
+        with self.assertLogs("jobs.queue", "ERROR"):
+            run_job(claim_job())
+        self.assertEqual(Job.objects.get().status, Job.Status.FAILED)
+
+    def test_requeue_stale_jobs(self):
+        for value in range(3):
+            record.enqueue(value)
+        alive, stale, exhausted = claim_job(), claim_job(), claim_job()
+        long_ago = timezone.now() - timedelta(hours=1)
+        # started long ago, but still beating
+        Job.objects.filter(id=alive.id).update(started=long_ago)
+        Job.objects.filter(id__in=[stale.id, exhausted.id]).update(
+            started=long_ago, heartbeat=long_ago
+        )
+        Job.objects.filter(id=exhausted.id).update(attempts=2)
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        statuses = dict(Job.objects.values_list(Job.Keys.id, Job.Keys.status))
+        self.assertEqual(
+            statuses,
+            {
+                alive.id: Job.Status.RUNNING,
+                stale.id: Job.Status.QUEUED,
+                exhausted.id: Job.Status.FAILED,
+            },
+        )
+
+
+class HeartbeatTest(TransactionTestCase):
+    @override_settings(JOBS_HEARTBEAT_INTERVAL_SECONDS=0.05)
+    def test_heartbeat(self):
+        sleep.enqueue()
+        job: Job = claim_job()
+        claimed = job.heartbeat
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertGreater(job.heartbeat, claimed)
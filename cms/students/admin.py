@@ -1,3 +1,38 @@
 from django.contrib import admin
+from students.models import ContentCompletion
+from students.models import CourseProgress
 
-# Register your models here.
+
+@admin.register(CourseProgress)
+class CourseProgressAdmin(admin.ModelAdmin):
+    list_display = [
+        CourseProgress.Keys.student,
+        CourseProgress.Keys.course,
+        CourseProgress.Keys.completed_contents,
+        CourseProgress.Keys.last_viewed,
+    ]
+    list_select_related = [CourseProgress.Keys.student, CourseProgress.Keys.course]
+    raw_id_fields = [
+        CourseProgress.Keys.student,
+        CourseProgress.Keys.course,
+        CourseProgress.Keys.last_module,
+    ]
+
+
+@admin.register(ContentCompletion)
+class ContentCompletionAdmin(admin.ModelAdmin):
+    list_display = [
+        ContentCompletion.Keys.student,
+        ContentCompletion.Keys.course,
+        ContentCompletion.Keys.content,
+        ContentCompletion.Keys.completed,
+    ]
+    list_select_related = [
+        ContentCompletion.Keys.student,
+        ContentCompletion.Keys.course,
+    ]
+    raw_id_fields = [
+        ContentCompletion.Keys.student,
+        ContentCompletion.Keys.course,
+        ContentCompletion.Keys.content,
+    ]
@@ -4,12 +4,15 @@ from courses.models import Course
 
 
 class CourseEnrollForm(forms.Form):
-    course = forms.ModelChoiceField(
-        queryset=Course.objects.none(),  # fetch available choices later
-        widget=forms.HiddenInput,
-    )
+    course = forms.IntegerField(widget=forms.HiddenInput)
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        self.fields["course"].queryset = Course.objects.all()
+    def clean_course(self) -> Course:
+        # single primary key lookup, owner is used by enrollment signals
+        course: Course | None = (
+            Course.objects.only(Course.Keys.id, Course.Keys.owner)
+            .filter(id=self.cleaned_data["course"])
+            .first()
+        )
+        if course is None:
+            raise forms.ValidationError("Course does not exist.")
+        return course
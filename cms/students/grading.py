@@ -0,0 +1,135 @@
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from students.models import QuizSubmission
+
+from courses.models import CourseSnapshot
+from courses.models import QuizQuestion
+
+# submissions scored (and updated) at once
+DEFAULT_BATCH_SIZE = 5000
+
+
+def get_live_questions(quiz_id: int) -> list[list[int]]:
+    """
+    Current questions of the quiz, in the format of `CourseSnapshot.quizzes`.
+    """
+    questions = QuizQuestion.objects.filter(quiz_id=quiz_id).values_list(
+        QuizQuestion.Keys.id,
+        QuizQuestion.Keys.answer,
+        QuizQuestion.Keys.points,
+        QuizQuestion.Keys.choices,
+    )
+    return [
+        [question_id, answer, points, len(choices)]
+        for question_id, answer, points, choices in questions
+    ]
+
+
+class AnswerKey:
+    """
+    Correct choices and points of quiz questions as arrays,
+    `columns` maps question ids to their positions and `choices`
+    holds numbers of choices of the questions.
+    Questions are the published ones (`CourseSnapshot.quizzes`)
+    or, when not given, the current ones.
+    """
+
+    def __init__(self, quiz_id: int, questions: list[list[int]] | None = None):
+        if questions is None:
+            questions = get_live_questions(quiz_id)
+        self.columns: dict[int, int] = {}
+        self.choices: list[int] = []
+        answers, points = [], []
+        for column, (question_id, answer, question_points, choices) in enumerate(
+            questions
+        ):
+            self.columns[question_id] = column
+            self.choices.append(choices)
+            answers.append(answer)
+            points.append(question_points)
+        self.answers = np.array(answers, dtype=np.int32)
+        self.points = np.array(points, dtype=np.int64)
+        self.max_score = int(self.points.sum())
+
+    def score(self, submissions: list[dict]) -> np.ndarray:
+        """
+        Scores answers of many submissions at once - they form
+        a submissions x questions matrix compared with the key.
+        Choices out of range of the question count as unanswered.
+        """
+        # -1 for unanswered questions, never equal to the key
+        matrix = np.full((len(submissions), len(self.answers)), -1, dtype=np.int32)
+        cells = [
+            (row, column, choice)
+            for row, answers in enumerate(submissions)
+            for question_id, choice in answers.items()
+            if (column := self.columns.get(int(question_id))) is not None
+            and type(choice) is int
+            and 0 <= choice < self.choices[column]
+        ]
+        if cells:
+            rows, columns, choices = np.array(cells, dtype=np.int64).T
+            matrix[rows, columns] = choices
+        return (matrix == self.answers) @ self.points
+
+
+class QuizGrader:
+    """
+    Scores quiz submissions in id ordered batches, each batch with array
+    operations and written back in a single transaction.
+    Each submission is scored against questions of the published version
+    of the quiz the student answered. Only ungraded submissions are scored
+    unless `regrade` is set.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def grade(self, quiz_id: int, regrade: bool = False) -> int:
+        submissions = QuizSubmission.objects.filter(quiz_id=quiz_id)
+        if not regrade:
+            submissions = submissions.filter(score__isnull=True)
+
+        graded = 0
+        # submissions answered different published versions of the quiz
+        snapshot_ids = (
+            submissions.order_by()
+            .values_list(QuizSubmission.Keys.snapshot, flat=True)
+            .distinct()
+        )
+        for snapshot_id in list(snapshot_ids):
+            questions: list[list[int]] | None = None
+            if snapshot_id is not None:
+                quizzes: dict = CourseSnapshot.objects.values_list(
+                    CourseSnapshot.Keys.quizzes, flat=True
+                ).get(id=snapshot_id)
+                questions = quizzes.get(str(quiz_id), [])
+            graded += self.grade_batches(
+                submissions.filter(snapshot_id=snapshot_id),
+                AnswerKey(quiz_id, questions),
+            )
+        return graded
+
+    def grade_batches(self, submissions, key: AnswerKey) -> int:
+        submissions = submissions.order_by(QuizSubmission.Keys.id).values_list(
+            QuizSubmission.Keys.id, QuizSubmission.Keys.answers
+        )
+        graded, last_id = 0, 0
+        while batch := list(submissions.filter(id__gt=last_id)[: self.batch_size]):
+            last_id = batch[-1][0]
+            ids = np.array([id for id, _ in batch], dtype=np.int64)
+            scores: np.ndarray = key.score([answers for _, answers in batch])
+            self.save(ids, scores, key.max_score)
+            graded += len(batch)
+        return graded
+
+    def save(self, ids: np.ndarray, scores: np.ndarray, max_score: int) -> None:
+        # scores take few distinct values - one UPDATE per value, `bulk_update`
+        # CASE expressions are slow to build (and execute) for many rows
+        graded = timezone.now()
+        with transaction.atomic():
+            for score in np.unique(scores).tolist():
+                QuizSubmission.objects.filter(
+                    id__in=ids[scores == score].tolist()
+                ).update(score=score, max_score=max_score, graded=graded)
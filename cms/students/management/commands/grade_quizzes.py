@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from students.grading import DEFAULT_BATCH_SIZE
+from students.grading import QuizGrader
+from students.models import QuizSubmission
+
+from courses.models import Quiz
+
+
+class Command(BaseCommand):
+    help = (
+        "Scores quiz submissions in batches. "
+        "By default ungraded submissions of all quizzes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_ids", nargs="*", type=int)
+        parser.add_argument(
+            "--regrade",
+            action="store_true",
+            help="Scores graded submissions again, e.g. after answer keys changed.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(
+        self, *args, quiz_ids: list[int], regrade: bool, batch_size: int, **options
+    ):
+        if not quiz_ids:
+            submissions = QuizSubmission.objects.all()
+            if not regrade:
+                submissions = submissions.filter(score__isnull=True)
+            quiz_ids = list(
+                submissions.order_by()
+                .values_list(QuizSubmission.Keys.quiz, flat=True)
+                .distinct()
+            )
+
+        grader = QuizGrader(batch_size=batch_size)
+        for quiz_id in Quiz.objects.filter(id__in=quiz_ids).values_list(
+            Quiz.Keys.id, flat=True
+        ):
+            started: float = time.monotonic()
+            graded: int = grader.grade(quiz_id, regrade=regrade)
+            self.stdout.write(
+                f"quiz {quiz_id}: {graded} submissions graded, "
+                f"{time.monotonic() - started:.1f}s"
+            )
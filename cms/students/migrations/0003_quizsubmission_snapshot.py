@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-19 16:01
+
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0015_coursesnapshot_quizzes"),
+        ("students", "0002_quizsubmission_quizsubmission_unique_quiz_student"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quizsubmission",
+            name="snapshot",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="quiz_submissions",
+                to="courses.coursesnapshot",
+            ),
+        ),
+    ]
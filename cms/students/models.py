@@ -1,3 +1,137 @@
+from django.contrib.auth import get_user_model
 from django.db import models
 
-# Create your models here.
+from courses.models import Content
+from courses.models import Course
+from courses.models import CourseSnapshot
+from courses.models import Module
+from courses.models import Quiz
+
+User = get_user_model()
+
+
+class ContentCompletion(models.Model):
+    class Keys:
+        id = "id"
+        completed = "completed"
+
+        # relations
+        student = "student"
+        course = "course"
+        content = "content"
+
+    completed = models.DateTimeField()
+
+    student = models.ForeignKey(
+        User, related_name="completed_contents", on_delete=models.CASCADE
+    )
+    # denormalized from `content.module.course`, used to maintain course progress
+    course = models.ForeignKey(
+        Course, related_name="completions", on_delete=models.CASCADE
+    )
+    content = models.ForeignKey(
+        Content, related_name="completions", on_delete=models.CASCADE
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "content"], name="unique_student_content"
+            ),
+        ]
+        indexes = [models.Index(fields=["student", "course"])]
+
+
+class CourseProgress(models.Model):
+    """
+    Maintained aggregate of student progress in the course.
+    """
+
+    class Keys:
+        id = "id"
+        last_viewed = "last_viewed"
+        completed_contents = "completed_contents"
+
+        # relations
+        student = "student"
+        course = "course"
+        last_module = "last_module"
+
+    last_viewed = models.DateTimeField(null=True, blank=True)
+    completed_contents = models.PositiveIntegerField(default=0)
+
+    student = models.ForeignKey(
+        User, related_name="course_progress", on_delete=models.CASCADE
+    )
+    course = models.ForeignKey(
+        Course, related_name="progress", on_delete=models.CASCADE
+    )
+    last_module = models.ForeignKey(
+        Module, related_name="+", null=True, blank=True, on_delete=models.SET_NULL
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "course"], name="unique_student_course_progress"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.student} - {self.course}"
+
+    def get_percent(self, total_contents: int) -> int:
+        if not total_contents:
+            return 0
+        return min(100, round(100 * self.completed_contents / total_contents))
+
+
+class QuizSubmission(models.Model):
+    """
+    Answers of the student - question id to index of the chosen choice.
+    Scored in batches by `students.grading.QuizGrader` against questions
+    published by `snapshot`, each quiz can be submitted once.
+    """
+
+    class Keys:
+        id = "id"
+        answers = "answers"
+        submitted = "submitted"
+        score = "score"
+        max_score = "max_score"
+        graded = "graded"
+
+        # relations
+        quiz = "quiz"
+        student = "student"
+        snapshot = "snapshot"
+
+    answers = models.JSONField(default=dict)
+    submitted = models.DateTimeField(auto_now_add=True)
+    # `None` until graded
+    score = models.PositiveIntegerField(null=True, blank=True)
+    max_score = models.PositiveIntegerField(null=True, blank=True)
+    graded = models.DateTimeField(null=True, blank=True)
+
+    quiz = models.ForeignKey(Quiz, related_name="submissions", on_delete=models.CASCADE)
+    student = models.ForeignKey(
+        User, related_name="quiz_submissions", on_delete=models.CASCADE
+    )
+    # version of the quiz the student answered, see `CourseSnapshot.quizzes`
+    snapshot = models.ForeignKey(
+        CourseSnapshot,
+        related_name="quiz_submissions",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["quiz", "student"], name="unique_quiz_student"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.student} - {self.quiz}"
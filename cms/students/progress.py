@@ -0,0 +1,227 @@
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db import close_old_connections
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from students.models import ContentCompletion
+from students.models import CourseProgress
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBuffer:
+    """
+    Per-process buffer of student progress events.
+
+    Requests only append events in memory. Background thread writes them
+    in bulk every `STUDENT_PROGRESS_FLUSH_INTERVAL_SECONDS` or as soon as
+    `STUDENT_PROGRESS_FLUSH_MAX_EVENTS` events are buffered.
+    Repeated module views of the same student in the same course are coalesced.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+        # (student_id, content_id) -> (course_id, completed)
+        self._completions: dict[tuple[int, int], tuple] = {}
+        # (student_id, course_id) -> (module_id, viewed)
+        self._views: dict[tuple[int, int], tuple] = {}
+
+    def record_view(self, student_id: int, course_id: int, module_id: int) -> None:
+        with self._lock:
+            self._views[(student_id, course_id)] = (module_id, timezone.now())
+        self._on_event()
+
+    def record_completion(
+        self, student_id: int, course_id: int, content_id: int
+    ) -> None:
+        with self._lock:
+            self._completions.setdefault(
+                (student_id, content_id), (course_id, timezone.now())
+            )
+        self._on_event()
+
+    def flush(self) -> int:
+        """
+        Writes all buffered events, returns number of written events.
+        """
+        with self._lock:
+            completions, self._completions = self._completions, {}
+            views, self._views = self._views, {}
+
+        if completions or views:
+            write_progress(completions, views)
+        return len(completions) + len(views)
+
+    def _on_event(self) -> None:
+        self._ensure_thread()
+        if len(self._completions) + len(self._views) >= self._max_events:
+            self._wakeup.set()
+
+    @property
+    def _max_events(self) -> int:
+        return settings.STUDENT_PROGRESS_FLUSH_MAX_EVENTS
+
+    def _ensure_thread(self) -> None:
+        # thread has to be (re)started in each (forked) worker process
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="student-progress-flush", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(settings.STUDENT_PROGRESS_FLUSH_INTERVAL_SECONDS)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush student progress events.")
+            finally:
+                close_old_connections()
+
+
+def write_progress(completions: dict, views: dict) -> None:
+    """
+    Writes events of all students at once. When the batch references rows
+    deleted in the meantime (content, module, course or student), events
+    are written again for each student separately, so only events
+    of the affected students are lost.
+    """
+    try:
+        _write_progress(completions, views)
+    except IntegrityError:
+        # (student_id, ...) -> event, grouped by student
+        students: dict[int, tuple[dict, dict]] = defaultdict(lambda: ({}, {}))
+        for key, event in completions.items():
+            students[key[0]][0][key] = event
+        for key, event in views.items():
+            students[key[0]][1][key] = event
+
+        for student_id, (student_completions, student_views) in students.items():
+            try:
+                _write_progress(student_completions, student_views)
+            except IntegrityError:
+                logger.warning(
+                    "Dropped progress events of student %s referencing deleted rows.",
+                    student_id,
+                )
+
+
+def _write_progress(completions: dict, views: dict) -> None:
+    with transaction.atomic():
+        if completions:
+            ContentCompletion.objects.bulk_create(
+                [
+                    ContentCompletion(
+                        student_id=student_id,
+                        content_id=content_id,
+                        course_id=course_id,
+                        completed=completed,
+                    )
+                    for (student_id, content_id), (
+                        course_id,
+                        completed,
+                    ) in completions.items()
+                ],
+                ignore_conflicts=True,
+            )
+
+        if views:
+            CourseProgress.objects.bulk_create(
+                [
+                    CourseProgress(
+                        student_id=student_id,
+                        course_id=course_id,
+                        last_module_id=module_id,
+                        last_viewed=viewed,
+                    )
+                    for (student_id, course_id), (module_id, viewed) in views.items()
+                ],
+                update_conflicts=True,
+                unique_fields=[CourseProgress.Keys.student, CourseProgress.Keys.course],
+                update_fields=[
+                    CourseProgress.Keys.last_module,
+                    CourseProgress.Keys.last_viewed,
+                ],
+            )
+
+        if completions:
+            course_students: dict[int, set[int]] = defaultdict(set)
+            for (student_id, _), (course_id, _) in completions.items():
+                course_students[course_id].add(student_id)
+            refresh_completed_contents(course_students)
+
+
+def refresh_completed_contents(course_students: dict[int, set[int]]) -> None:
+    """
+    Recounts completed contents of given students in given courses.
+    Recounting (instead of incrementing) keeps aggregate correct
+    for duplicated events ignored on insert.
+    """
+    query = Q()
+    for course_id, student_ids in course_students.items():
+        query |= Q(course_id=course_id, student_id__in=student_ids)
+
+    totals = (
+        ContentCompletion.objects.filter(query)
+        .values(ContentCompletion.Keys.student, ContentCompletion.Keys.course)
+        .annotate(total=Count(ContentCompletion.Keys.id))
+        .order_by()
+    )
+    CourseProgress.objects.bulk_create(
+        [
+            CourseProgress(
+                student_id=total[ContentCompletion.Keys.student],
+                course_id=total[ContentCompletion.Keys.course],
+                completed_contents=total["total"],
+            )
+            for total in totals
+        ],
+        update_conflicts=True,
+        unique_fields=[CourseProgress.Keys.student, CourseProgress.Keys.course],
+        update_fields=[CourseProgress.Keys.completed_contents],
+    )
+
+
+def recount_course_progress(course_id: int) -> None:
+    """
+    Recounts completed contents of all students of the course - completions
+    of removed contents are deleted with them.
+    """
+    completed = (
+        ContentCompletion.objects.filter(
+            course_id=course_id, student_id=OuterRef(CourseProgress.Keys.student)
+        )
+        .values(ContentCompletion.Keys.student)
+        .annotate(total=Count(ContentCompletion.Keys.id))
+        .values("total")
+    )
+    CourseProgress.objects.filter(course_id=course_id).update(
+        completed_contents=Coalesce(Subquery(completed), 0)
+    )
+
+
+progress_buffer = ProgressBuffer()
+atexit.register(progress_buffer.flush)
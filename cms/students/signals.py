@@ -0,0 +1,27 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from students.tasks import refresh_course_progress
+
+from courses.models import Content
+from courses.models import Module
+
+
+def _is_deleted_directly(origin, model: type) -> bool:
+    # `origin` of `post_delete` is the deleted instance or queryset
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is model
+
+
+@receiver(post_delete, sender=Module)
+def module_deleted(sender, instance: Module, origin, **kwargs) -> None:
+    # progress of deleted courses is deleted with them
+    if _is_deleted_directly(origin, Module):
+        refresh_course_progress.enqueue(instance.course_id, unique=True)
+
+
+@receiver(post_delete, sender=Content)
+def content_deleted(sender, instance: Content, origin, **kwargs) -> None:
+    # contents of deleted modules are covered by `module_deleted`
+    if _is_deleted_directly(origin, Content):
+        refresh_course_progress.enqueue(instance.module.course_id, unique=True)
@@ -0,0 +1,14 @@
+from students.grading import QuizGrader
+from students.progress import recount_course_progress
+
+from jobs.queue import task
+
+
+@task
+def grade_quiz(quiz_id: int, regrade: bool = False) -> None:
+    QuizGrader().grade(quiz_id, regrade=regrade)
+
+
+@task
+def refresh_course_progress(course_id: int) -> None:
+    recount_course_progress(course_id)
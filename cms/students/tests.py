@@ -1,3 +1,261 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from students.grading import AnswerKey
+from students.grading import QuizGrader
+from students.models import ContentCompletion
+from students.models import CourseProgress
+from students.models import QuizSubmission
+from students.progress import write_progress
 
-# Create your tests here.
+from courses.models import Content
+from courses.models import Course
+from courses.models import Module
+from courses.models import Quiz
+from courses.models import QuizQuestion
+from courses.models import Subject
+from courses.models import Text
+from courses.publishing import publish_course
+from jobs.queue import claim_job
+from jobs.queue import run_job
+
+User = get_user_model()
+
+
+class QuizTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner")
+        cls.student = User.objects.create_user("student")
+        subject = Subject.objects.create(title="Math", slug="math")
+        cls.course = Course.objects.create(
+            owner=cls.owner, subject=subject, title="Algebra", slug="algebra"
+        )
+        cls.course.students.add(cls.student)
+        module = Module.objects.create(course=cls.course, title="Basics")
+        cls.quiz = Quiz.objects.create(owner=cls.owner, title="Quiz")
+        Content.objects.create(module=module, item=cls.quiz)
+        cls.first = QuizQuestion.objects.create(
+            quiz=cls.quiz, text="2 + 2", choices=["3", "4", "5"], answer=1, points=1
+        )
+        cls.second = QuizQuestion.objects.create(
+            quiz=cls.quiz, text="Capital", choices=["Paris", "Rome"], answer=0, points=3
+        )
+
+    def submit(self, student: User, answers: dict) -> QuizSubmission:
+        return QuizSubmission.objects.create(
+            quiz=self.quiz, student=student, answers=answers
+        )
+
+
+class QuizGraderTest(QuizTestCase):
+    def test_score(self):
+        key = AnswerKey(self.quiz.id)
+        scores = key.score(
+            [
+                {str(self.first.id): 1, str(self.second.id): 0},
+                {str(self.first.id): 1, str(self.second.id): 1},
+                {str(self.second.id): 0},
+                {},
+            ]
+        )
+        self.assertEqual(scores.tolist(), [4, 1, 3, 0])
+        self.assertEqual(key.max_score, 4)
+
+    def test_score_ignores_out_of_range_choices(self):
+        key = AnswerKey(self.quiz.id)
+        scores = key.score(
+            [
+                # wraps to 1 in the int32 matrix when not skipped
+                {str(self.first.id): 2**32 + 1},
+                # does not fit int64
+                {str(self.first.id): 10**20},
+                {str(self.first.id): -1, str(self.second.id): "0"},
+            ]
+        )
+        self.assertEqual(scores.tolist(), [0, 0, 0])
+
+    def test_grade(self):
+        students = [User.objects.create_user(f"student-{i}") for i in range(3)]
+        self.submit(students[0], {str(self.first.id): 1, str(self.second.id): 0})
+        self.submit(students[1], {str(self.first.id): 10**20})
+        self.submit(students[2], {str(self.second.id): 0})
+
+        self.assertEqual(QuizGrader(batch_size=2).grade(self.quiz.id), 3)
+        self.assertEqual(
+            list(
+                QuizSubmission.objects.order_by("id").values_list(
+                    QuizSubmission.Keys.score, QuizSubmission.Keys.max_score
+                )
+            ),
+            [(4, 4), (0, 4), (3, 4)],
+        )
+        # graded submissions are not scored again
+        self.assertEqual(QuizGrader().grade(self.quiz.id), 0)
+
+
+class StudentQuizSubmitViewTest(QuizTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.snapshot = publish_course(cls.course.id)
+
+    def setUp(self):
+        self.client.force_login(self.student)
+        self.url = reverse("student_quiz_submit", args=[self.quiz.id])
+
+    def test_submit(self):
+        response = self.client.post(
+            self.url,
+            {
+                f"question-{self.first.id}": "1",
+                # superscript two is a digit `int` does not parse
+                f"question-{self.second.id}": "²",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        submission = QuizSubmission.objects.get(student=self.student)
+        self.assertEqual(submission.answers, {str(self.first.id): 1})
+
+        response = self.client.post(self.url, {f"question-{self.first.id}": "0"})
+        self.assertEqual(response.status_code, 409)
+
+    def test_submit_skips_out_of_range_choices(self):
+        response = self.client.post(
+            self.url,
+            {
+                f"question-{self.first.id}": "99999999999999999999",
+                f"question-{self.second.id}": "2",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        submission = QuizSubmission.objects.get(student=self.student)
+        self.assertEqual(submission.answers, {})
+
+    def test_submit_not_enrolled(self):
+        self.client.force_login(self.owner)
+        response = self.client.post(self.url, {f"question-{self.first.id}": "1"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_submit_not_published(self):
+        quiz = Quiz.objects.create(owner=self.owner, title="Draft")
+        Content.objects.create(module=self.course.modules.get(), item=quiz)
+        response = self.client.post(reverse("student_quiz_submit", args=[quiz.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_graded_against_published_questions(self):
+        # edited after publishing, not seen by students yet
+        QuizQuestion.objects.filter(id=self.first.id).update(answer=0, points=5)
+        added = QuizQuestion.objects.create(
+            quiz=self.quiz, text="1 + 1", choices=["2"], answer=0
+        )
+        response = self.client.post(
+            self.url,
+            {f"question-{self.first.id}": "1", f"question-{added.id}": "0"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        QuizGrader().grade(self.quiz.id)
+        submission = QuizSubmission.objects.get(student=self.student)
+        self.assertEqual(submission.snapshot_id, self.snapshot.id)
+        self.assertEqual(submission.answers, {str(self.first.id): 1})
+        self.assertEqual((submission.score, submission.max_score), (1, 4))
+
+
+class ProgressTestCase(TransactionTestCase):
+    def setUp(self):
+        owner = User.objects.create_user("owner")
+        self.students = [User.objects.create_user(f"student-{i}") for i in range(2)]
+        subject = Subject.objects.create(title="Math", slug="math")
+        self.course = Course.objects.create(
+            owner=owner, subject=subject, title="Algebra", slug="algebra"
+        )
+        self.module = Module.objects.create(course=self.course, title="Basics")
+        self.contents = [
+            Content.objects.create(
+                module=self.module,
+                item=Text.objects.create(owner=owner, title=f"Text {i}", content="a"),
+            )
+            for i in range(3)
+        ]
+
+    def complete(self, student: User, *contents: Content) -> dict:
+        return {
+            (student.id, content.id): (self.course.id, timezone.now())
+            for content in contents
+        }
+
+    def get_completed_contents(self) -> dict[int, int]:
+        return dict(
+            CourseProgress.objects.values_list(
+                CourseProgress.Keys.student, CourseProgress.Keys.completed_contents
+            )
+        )
+
+
+class WriteProgressTest(ProgressTestCase):
+    def test_write_progress(self):
+        first, second = self.students
+        views = {(first.id, self.course.id): (self.module.id, timezone.now())}
+        write_progress(
+            self.complete(first, *self.contents[:2])
+            | self.complete(second, self.contents[0]),
+            views,
+        )
+        # repeated events are ignored
+        write_progress(self.complete(first, self.contents[0]), views)
+
+        self.assertEqual(ContentCompletion.objects.count(), 3)
+        self.assertEqual(self.get_completed_contents(), {first.id: 2, second.id: 1})
+        self.assertEqual(
+            CourseProgress.objects.get(student=first).last_module_id, self.module.id
+        )
+
+    def test_deleted_rows(self):
+        first, second = self.students
+        deleted: Content = self.contents[2]
+        completions = self.complete(first, self.contents[0]) | self.complete(
+            second, self.contents[0], deleted
+        )
+        Content.objects.filter(id=deleted.id).delete()
+
+        with self.assertLogs("students.progress", "WARNING"):
+            write_progress(completions, {})
+        # events of other students are kept
+        self.assertEqual(self.get_completed_contents(), {first.id: 1})
+
+
+class RecountProgressTest(ProgressTestCase):
+    def test_content_deleted(self):
+        first, second = self.students
+        write_progress(
+            self.complete(first, *self.contents)
+            | self.complete(second, self.contents[0]),
+            {},
+        )
+
+        self.contents[0].delete()
+        run_job(claim_job())
+        self.assertEqual(self.get_completed_contents(), {first.id: 2, second.id: 0})
+
+        self.module.delete()
+        run_job(claim_job())
+        self.assertEqual(self.get_completed_contents(), {first.id: 0, second.id: 0})
+
+
+class StudentRegistrationViewTest(TestCase):
+    def test_register(self):
+        response = self.client.post(
+            reverse("student_registration"),
+            dict(
+                username="student",
+                password1="Pa55word-of-student",
+                password2="Pa55word-of-student",
+            ),
+        )
+        self.assertRedirects(response, reverse("student_course_list"))
+        # logged in
+        user = User.objects.get(username="student")
+        self.assertEqual(self.client.session["_auth_user_id"], str(user.id))
@@ -23,4 +23,14 @@ urlpatterns = [
         views.StudentCourseDetailView.as_view(),
         name="student_course_detail_module",
     ),
+    path(
+        "content/<int:content_id>/complete/",
+        views.StudentContentCompleteView.as_view(),
+        name="student_content_complete",
+    ),
+    path(
+        "quiz/<int:quiz_id>/submit/",
+        views.StudentQuizSubmitView.as_view(),
+        name="student_quiz_submit",
+    ),
 ]
@@ -1,18 +1,33 @@
+from datetime import timedelta
+
+from braces.views import JSONResponseMixin
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 from django.contrib.auth import login
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import Http404
 from django.http import HttpResponse
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.views.generic import CreateView
 from django.views.generic import DetailView
 from django.views.generic import FormView
 from django.views.generic import ListView
+from django.views.generic.base import View
 from students.forms import CourseEnrollForm
+from students.models import CourseProgress
+from students.models import QuizSubmission
+from students.progress import progress_buffer
+from students.tasks import grade_quiz
 
+from courses.models import Content
 from courses.models import Course
+from courses.models import CourseSnapshot
+from courses.models import Quiz
 
 User = get_user_model()
 
@@ -26,7 +41,9 @@ class StudentRegistrationView(CreateView):
         is_valid: HttpResponse = super().form_valid(form)
         cleaned_data: dict = form.cleaned_data
         user: User = authenticate(
-            cleaned_data.get("username"), password=cleaned_data.get("password")
+            self.request,
+            username=cleaned_data.get("username"),
+            password=cleaned_data.get("password1"),
         )
         login(self.request, user)
         return is_valid
@@ -41,6 +58,10 @@ class StudentEnrollCourseView(LoginRequiredMixin, FormView):
         self.course.students.add(self.request.user)
         return super().form_valid(form)
 
+    def form_invalid(self, form) -> HttpResponse:
+        # posted from course pages, there is no form page to show errors on
+        raise Http404
+
     def get_success_url(self) -> str:
         return reverse_lazy("student_course_detail", args=[self.course.id])
 
@@ -55,18 +76,153 @@ class StudentCourseListView(LoginRequiredMixin, ListView):
 
 
 class StudentCourseDetailView(LoginRequiredMixin, DetailView):
+    """
+    Course page is rendered only from the published snapshot of the course,
+    fetched together with the course.
+    """
+
     model = Course
     template_name = "students/course/detail.html"
 
     def get_queryset(self) -> QuerySet[Course]:
         queryset: QuerySet[Course] = super().get_queryset()
-        return queryset.filter(students__in=[self.request.user])
+        return (
+            queryset.filter(students__in=[self.request.user])
+            .select_related(Course.Keys.published_snapshot)
+            .defer(
+                Course.Keys.outline,
+                f"{Course.Keys.published_snapshot}__{CourseSnapshot.Keys.data}",
+            )
+        )
 
     def get_context_data(self, **kwargs) -> dict:
         context: dict = super().get_context_data(**kwargs)
-        course: Course = self.get_object()
+        snapshot: CourseSnapshot | None = self.object.published_snapshot
+        outline: list[dict] = snapshot.outline if snapshot else []
         if "module_id" in self.kwargs:
-            context["module"] = course.modules.get(id=self.kwargs["module_id"])
+            module = next(
+                (m for m in outline if m["id"] == self.kwargs["module_id"]), None
+            )
+            if module is None:
+                raise Http404
         else:
-            context["module"] = course.modules.first()
+            module = outline[0] if outline else None
+
+        context["snapshot"] = snapshot
+        context["outline"] = outline
+        context["events_enabled"] = settings.COURSE_EVENTS_ENABLED
+        context["module"] = module
+        if module:
+            context["contents"] = self.attach_quiz_submissions(
+                snapshot.contents.get(str(module["id"]), [])
+            )
+            # buffered, written in bulk outside of the request
+            progress_buffer.record_view(
+                student_id=self.request.user.id,
+                course_id=self.object.id,
+                module_id=module["id"],
+            )
+
+        progress = CourseProgress.objects.filter(
+            student=self.request.user, course=self.object
+        ).first()
+        context["progress_percent"] = (
+            progress.get_percent(snapshot.total_contents)
+            if progress and snapshot
+            else 0
+        )
         return context
+
+    def attach_quiz_submissions(self, contents: list[dict]) -> list[dict]:
+        # submitted quizzes show the score instead of the questions
+        quiz_ids: list[int] = [
+            item_id
+            for model_name, item_id in (content["item"] for content in contents)
+            if model_name == Quiz._meta.model_name
+        ]
+        if quiz_ids:
+            submissions: dict[int, QuizSubmission] = {
+                submission.quiz_id: submission
+                for submission in QuizSubmission.objects.filter(
+                    student=self.request.user, quiz_id__in=quiz_ids
+                ).defer(QuizSubmission.Keys.answers)
+            }
+            for content in contents:
+                model_name, item_id = content["item"]
+                if model_name == Quiz._meta.model_name:
+                    content["submission"] = submissions.get(item_id)
+        return contents
+
+
+class StudentContentCompleteView(LoginRequiredMixin, JSONResponseMixin, View):
+    """
+    Marks content as completed by the student. Used by "Mark as completed" buttons.
+    """
+
+    def post(self, request, content_id: int) -> HttpResponse:
+        course_id: int | None = (
+            Content.objects.filter(
+                id=content_id, module__course__students__in=[request.user]
+            )
+            .values_list("module__course", flat=True)
+            .first()
+        )
+        if course_id is None:
+            raise Http404
+
+        progress_buffer.record_completion(
+            student_id=request.user.id, course_id=course_id, content_id=content_id
+        )
+        return self.render_json_response(context_dict=dict(saved="OK"))
+
+
+class StudentQuizSubmitView(LoginRequiredMixin, JSONResponseMixin, View):
+    """
+    Stores answers of the student, scored in batches by the `grade_quiz` job
+    which is delayed to collect submissions of many students.
+    """
+
+    def post(self, request, quiz_id: int) -> HttpResponse:
+        # the quiz as published in a course of the student
+        snapshot: CourseSnapshot | None = (
+            CourseSnapshot.objects.filter(
+                id__in=Course.objects.filter(students=request.user).values(
+                    Course.Keys.published_snapshot
+                ),
+                quizzes__has_key=str(quiz_id),
+            )
+            .only(CourseSnapshot.Keys.id, CourseSnapshot.Keys.quizzes)
+            .first()
+        )
+        if snapshot is None:
+            raise Http404
+
+        answers: dict[str, int] = {}
+        for question_id, _, _, choices in snapshot.quizzes[str(quiz_id)]:
+            try:
+                choice = int(request.POST.get(f"question-{question_id}", ""))
+            except ValueError:
+                continue
+            # out of range choices would not fit arrays of the grader
+            if 0 <= choice < choices:
+                answers[str(question_id)] = choice
+
+        with transaction.atomic():
+            submission, created = QuizSubmission.objects.get_or_create(
+                quiz_id=quiz_id,
+                student=request.user,
+                defaults=dict(answers=answers, snapshot=snapshot),
+            )
+            if created:
+                grade_quiz.enqueue(
+                    quiz_id,
+                    run_after=timezone.now()
+                    + timedelta(seconds=settings.QUIZ_GRADING_DELAY_SECONDS),
+                    unique=True,
+                )
+        if not created:
+            return self.render_json_response(
+                context_dict=dict(error="Quiz has been already submitted."),
+                status=409,
+            )
+        return self.render_json_response(context_dict=dict(saved="OK"))